@@ -0,0 +1,285 @@
+"""
+Per-client rate limiting and upstream admission control
+Token buckets keyed by client (a configured API key, else the client IP) stop
+one client from monopolizing the service. The admission controller caps concurrent OpenRouter
+calls and bounds how many requests may wait for a slot - everything beyond
+that is turned away at once instead of queueing without limit.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional, Tuple
+
+from rec_cache import SQLiteBackend, default_backend, run_blocking
+
+
+def _digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class OverloadedError(Exception):
+    """No upstream slot available (queue full or wait timed out)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+def _short(tokens: float, burst: float, cost: float) -> float:
+    """Tokens missing before `cost` may be spent
+
+    A cost above the burst (a large batch) needs a full bucket and then leaves
+    it in debt, so it is charged in full without being refused forever.
+    """
+    return max(0.0, min(cost, burst) - tokens)
+
+
+# --- Token bucket backends ---
+
+class MemoryBucketBackend:
+    """Per-process buckets (LRU-bounded so one-off clients don't accumulate)"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        """Spend `cost` tokens if available; returns the tokens short (0 when allowed)"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = _refill(tokens, updated, now, rate, burst)
+        short = _short(tokens, burst, cost)
+        if not short:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return short
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketBackend(SQLiteBackend):
+    """Buckets shared by every worker on the host (WAL, one write transaction per take)"""
+
+    def __init__(self, path: str, prune_every: int = 1000):
+        super().__init__(path)
+        self.prune_every = prune_every
+        self._takes = 0
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        # Wall clock - monotonic clocks aren't comparable across processes
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = _refill(row[0], row[1], now, rate, burst) if row else burst
+            short = _short(tokens, burst, cost)
+            if not short:
+                tokens -= cost
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now)
+            )
+            self._takes += 1
+            if self._takes % self.prune_every == 0 and rate > 0:
+                # Buckets idle long enough to be full again (debt included) carry no state
+                self._conn.execute("DELETE FROM rate_buckets WHERE updated + (? - tokens) / ? < ?", (burst, rate, now))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return short
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+
+
+# --- Rate limiter ---
+
+class RateLimiter:
+    """Token bucket per client: `rate` requests/second sustained, bursts up to `burst`"""
+
+    def __init__(self, backend, rate: float = 0.0, burst: float = 10.0, api_keys: Iterable[str] = (),
+                 trust_forwarded: bool = False, proxy_hops: int = 1):
+        self.backend = backend
+        self.rate = rate
+        self.burst = burst
+        # Only keys issued to clients get their own bucket - hashes, so keys aren't kept in memory
+        self._api_keys = {_digest(key) for key in api_keys if key}
+        self.trust_forwarded = trust_forwarded
+        self.proxy_hops = max(1, proxy_hops)
+        self.allowed = 0
+        self.limited = 0
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build from RATE_LIMIT_* environment variables (off unless RATE_LIMIT_RPS is set)
+
+        Off by default: classrooms and career fairs put many users behind one
+        NAT address, where a per-IP bucket would turn a cohort into 429s.
+        """
+        if os.getenv("RATE_LIMIT_BACKEND", default_backend()).lower() == "sqlite":
+            backend = SQLiteBucketBackend(os.getenv("RATE_LIMIT_PATH", "cache/ratelimit.db"))
+        else:
+            backend = MemoryBucketBackend()
+        return cls(
+            backend,
+            rate=float(os.getenv("RATE_LIMIT_RPS", 0)),
+            burst=float(os.getenv("RATE_LIMIT_BURST", 10)),
+            api_keys=[key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",")],
+            # Only behind a proxy that appends the client address (Render does) - clients can forge the header
+            trust_forwarded=os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0").lower() in ("1", "true", "yes", "on"),
+            proxy_hops=int(os.getenv("RATE_LIMIT_PROXY_HOPS", 1)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def client_key(self, request) -> str:
+        """Configured API key (hashed) if the client sent one, else the client IP
+
+        Unknown keys are ignored, so sending a fresh key per request doesn't get
+        a fresh bucket. With trust_forwarded, the address is the X-Forwarded-For
+        entry appended by the outermost of `proxy_hops` trusted proxies - entries
+        to its left came from the client and can say anything.
+        """
+        api_key = request.headers.get("x-api-key")
+        if api_key:
+            digest = _digest(api_key)
+            if digest in self._api_keys:
+                return "key:" + digest[:16]
+        if self.trust_forwarded:
+            hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+            if len(hops) >= self.proxy_hops:
+                return "ip:" + hops[-self.proxy_hops]
+        return "ip:" + (request.client.host if request.client else "unknown")
+
+    async def check(self, key: str, cost: float = 1.0) -> Optional[int]:
+        """None if the request may proceed, else seconds until it would be allowed"""
+        if not self.enabled:
+            return None
+        short = await run_blocking(self.backend, "take", key, self.rate, self.burst, cost)
+        if not short:
+            self.allowed += 1
+            return None
+        self.limited += 1
+        return max(1, math.ceil(short / self.rate))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "api_keys": len(self._api_keys),
+            "trust_forwarded": self.trust_forwarded,
+            "backend": type(self.backend).__name__,
+            "clients": len(self.backend),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+# --- Upstream admission control ---
+
+class AdmissionController:
+    """Caps concurrent upstream calls; a bounded number of callers may wait for a slot
+
+    Callers beyond `max_queue`, or waiting longer than `queue_timeout`, get
+    OverloadedError right away - so under overload latency stays bounded and
+    the excess is shed (fallback or 429) rather than piling up on OpenRouter.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64, queue_timeout: float = 10.0,
+                 overflow: str = "fallback"):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.overflow = overflow  # "fallback" or "reject" (429)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self._avg_hold = 1.0  # EWMA of slot hold time, for Retry-After estimates
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build from UPSTREAM_MAX_CONCURRENT / UPSTREAM_MAX_QUEUE / UPSTREAM_QUEUE_TIMEOUT / ADMISSION_OVERFLOW"""
+        return cls(
+            max_concurrent=int(os.getenv("UPSTREAM_MAX_CONCURRENT", 16)),
+            max_queue=int(os.getenv("UPSTREAM_MAX_QUEUE", 64)),
+            queue_timeout=float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", 10.0)),
+            overflow=os.getenv("ADMISSION_OVERFLOW", "fallback").lower(),
+        )
+
+    def retry_after(self) -> int:
+        """Rough seconds until the current queue drains"""
+        return max(1, math.ceil(self._avg_hold * (self.waiting + 1) / self.max_concurrent))
+
+    async def acquire(self):
+        """Take a slot, waiting in the bounded queue if needed (raises OverloadedError)"""
+        if self.active >= self.max_concurrent and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedError("Upstream queue is full", self.retry_after())
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            # asyncio.timeout (not wait_for) so a wake-up racing the deadline can't leak a slot
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.timed_out += 1
+            raise OverloadedError("Timed out waiting for an upstream slot", self.retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.total_wait += time.monotonic() - start
+        self.admitted += 1
+        self.active += 1
+        return time.monotonic()
+
+    def release(self, acquired_at: Optional[float] = None):
+        self.active -= 1
+        self._semaphore.release()
+        if acquired_at is not None:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - acquired_at)
+
+    @asynccontextmanager
+    async def slot(self):
+        acquired_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "overflow": self.overflow,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+        }
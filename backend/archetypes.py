@@ -0,0 +1,470 @@
+"""
+Precomputed recommendations for popular profile archetypes
+Most traffic comes from a handful of profile shapes (CS student into AI, design
+student, business graduate). Every analysis logs its normalized profile; a
+background task clusters the recent log, generates recommendations for the
+most common archetypes while the service is quiet, and requests that land
+close enough to an archetype are answered from that store without a model
+call. Entries go stale after a TTL or when the market snapshot changes and are
+regenerated in the background; past ARCHETYPE_MAX_AGE they are not served.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rec_cache import SQLiteBackend, default_backend, normalize_profile, personalize, run_blocking
+
+# Archetypes are generated under this name; personalize() swaps in the requester's
+ARCHETYPE_NAME = "Candidate"
+
+
+def experience_band(years) -> str:
+    """Archetypes never mix experience bands - a senior engineer is not a student"""
+    try:
+        years = float(years or 0)
+    except ValueError:
+        years = 0
+    if years <= 1:
+        return "entry"
+    if years <= 4:
+        return "early"
+    if years <= 9:
+        return "mid"
+    return "senior"
+
+
+class Archetype:
+    """One precomputed archetype: its representative (normalized) profile and recommendations"""
+
+    def __init__(self, key: str, profile: dict, support: int, recommendations: List[dict],
+                 generated_at: float, market_version: Optional[str] = None, hits: int = 0):
+        self.key = key
+        self.profile = profile
+        self.support = support    # Logged requests in its cluster
+        self.recommendations = recommendations
+        self.generated_at = generated_at
+        self.market_version = market_version
+        self.hits = hits
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Archetype":
+        return cls(**json.loads(raw))
+
+
+# --- Backends (request log + stored archetypes) ---
+
+class MemoryArchetypeBackend:
+    """Per-process log and archetypes"""
+
+    def __init__(self, max_log: int = 5000):
+        self._log: deque = deque(maxlen=max_log)
+        self._archetypes: List[str] = []
+        self.version = 0
+
+    def record(self, ts: float, key: str, profile: dict):
+        self._log.append((ts, key, profile))
+
+    def recent(self, since: float) -> List[Tuple[str, dict]]:
+        return [(key, profile) for ts, key, profile in self._log if ts >= since]
+
+    def count_since(self, since: float) -> int:
+        count = 0
+        for ts, _, _ in reversed(self._log):
+            if ts < since:
+                break
+            count += 1
+        return count
+
+    def save(self, archetypes: Sequence[Archetype]):
+        self._archetypes = [archetype.to_json() for archetype in archetypes]
+        self.version += 1
+
+    def load(self) -> Tuple[int, List[Archetype]]:
+        return self.version, [Archetype.from_json(raw) for raw in self._archetypes]
+
+    def acquire(self, owner: str, ttl: float) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        return len(self._log)
+
+
+class SQLiteArchetypeBackend(SQLiteBackend):
+    """Log and archetypes shared by every worker on the host
+
+    One worker at a time holds the refresh lease; the others load what it saved.
+    """
+
+    def __init__(self, path: str, max_log: int = 5000, prune_every: int = 100):
+        super().__init__(path)
+        self.max_log = max_log
+        self.prune_every = prune_every
+        self._records = 0
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS archetype_log ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, key TEXT NOT NULL, profile TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_archetype_log_ts ON archetype_log(ts)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS archetypes (key TEXT PRIMARY KEY, archetype TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS archetype_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def record(self, ts: float, key: str, profile: dict):
+        self._conn.execute("INSERT INTO archetype_log (ts, key, profile) VALUES (?, ?, ?)",
+                           (ts, key, json.dumps(profile)))
+        self._records += 1
+        if self._records % self.prune_every == 0:
+            self._conn.execute("DELETE FROM archetype_log WHERE id <= (SELECT MAX(id) FROM archetype_log) - ?",
+                               (self.max_log,))
+
+    def recent(self, since: float) -> List[Tuple[str, dict]]:
+        rows = self._conn.execute("SELECT key, profile FROM archetype_log WHERE ts >= ?", (since,)).fetchall()
+        return [(key, json.loads(profile)) for key, profile in rows]
+
+    def count_since(self, since: float) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM archetype_log WHERE ts >= ?", (since,)).fetchone()[0]
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM archetype_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, archetypes: Sequence[Archetype]):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM archetypes")
+            self._conn.executemany("INSERT INTO archetypes (key, archetype) VALUES (?, ?)",
+                                   [(archetype.key, archetype.to_json()) for archetype in archetypes])
+            version = int(self._meta("version") or 0) + 1
+            self._conn.execute("INSERT OR REPLACE INTO archetype_meta (name, value) VALUES ('version', ?)",
+                               (str(version),))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def load(self) -> Tuple[int, List[Archetype]]:
+        version = int(self._meta("version") or 0)
+        rows = self._conn.execute("SELECT archetype FROM archetypes").fetchall()
+        return version, [Archetype.from_json(raw) for (raw,) in rows]
+
+    def acquire(self, owner: str, ttl: float) -> bool:
+        """Take or extend the refresh lease (held by `owner` until ttl seconds from now)"""
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            lease = self._meta("lease")
+            holder, expires = json.loads(lease) if lease else (None, 0.0)
+            acquired = holder == owner or expires < now
+            if acquired:
+                self._conn.execute("INSERT OR REPLACE INTO archetype_meta (name, value) VALUES ('lease', ?)",
+                                   (json.dumps([owner, now + ttl]),))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return acquired
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM archetype_log").fetchone()[0]
+
+
+# --- Store ---
+
+class ArchetypeStore:
+    """Clusters the profile log, precomputes the top archetypes and serves close matches
+
+    `embed(profile)` returns a unit-length vector for anything with the UserProfile
+    fields; `generate(profile_fields)` produces recommendation models for one profile.
+    """
+
+    def __init__(
+        self,
+        backend,
+        embed: Callable[[object], np.ndarray],
+        generate: Callable[[dict], Awaitable[Sequence]],
+        is_busy: Callable[[], bool] = lambda: False,
+        market_version: Callable[[], Optional[str]] = lambda: None,
+        count: int = 20,
+        min_support: int = 3,
+        cluster_similarity: float = 0.8,
+        match_similarity: float = 0.9,
+        ttl: float = 6 * 3600,
+        max_age: float = 24 * 3600,
+        window: float = 7 * 86400,
+        max_candidates: int = 500,
+        refresh_interval: float = 3600,
+        check_interval: float = 60,
+        quiet_rpm: int = 30,
+    ):
+        self.backend = backend
+        self.embed = embed
+        self.generate = generate
+        self.is_busy = is_busy
+        self.market_version = market_version
+        self.count = count
+        self.min_support = min_support
+        self.cluster_similarity = cluster_similarity
+        self.match_similarity = match_similarity
+        self.ttl = ttl
+        self.max_age = max_age
+        self.window = window
+        self.max_candidates = max_candidates
+        self.refresh_interval = refresh_interval
+        self.check_interval = check_interval
+        self.quiet_rpm = quiet_rpm
+        self.owner = uuid.uuid4().hex
+        self._entries: List[Archetype] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._bands = np.array([], dtype=object)
+        self._generated_at = np.array([], dtype=np.float64)
+        self._version = -1
+        self._task: Optional[asyncio.Task] = None
+        self.last_refresh = 0.0
+        self.last_refresh_ms = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.generated = 0
+        self.deferred = 0
+
+    @classmethod
+    def from_env(cls, embed, generate, is_busy=lambda: False, market_version=lambda: None) -> "ArchetypeStore":
+        """Build from ARCHETYPE_* environment variables (ARCHETYPE_COUNT=0 disables the store)"""
+        max_log = int(os.getenv("ARCHETYPE_LOG_SIZE", 5000))
+        if os.getenv("ARCHETYPE_BACKEND", default_backend()).lower() == "sqlite":
+            backend = SQLiteArchetypeBackend(os.getenv("ARCHETYPE_PATH", "cache/archetypes.db"), max_log=max_log)
+        else:
+            backend = MemoryArchetypeBackend(max_log=max_log)
+        return cls(
+            backend, embed, generate, is_busy, market_version,
+            count=int(os.getenv("ARCHETYPE_COUNT", 0)),
+            min_support=int(os.getenv("ARCHETYPE_MIN_SUPPORT", 3)),
+            cluster_similarity=float(os.getenv("ARCHETYPE_CLUSTER_SIMILARITY", 0.8)),
+            match_similarity=float(os.getenv("ARCHETYPE_MATCH_SIMILARITY", 0.9)),
+            ttl=float(os.getenv("ARCHETYPE_TTL", 6 * 3600)),
+            max_age=float(os.getenv("ARCHETYPE_MAX_AGE", 24 * 3600)),
+            window=float(os.getenv("ARCHETYPE_WINDOW", 7 * 86400)),
+            refresh_interval=float(os.getenv("ARCHETYPE_REFRESH_INTERVAL", 3600)),
+            check_interval=float(os.getenv("ARCHETYPE_CHECK_INTERVAL", 60)),
+            quiet_rpm=int(os.getenv("ARCHETYPE_QUIET_RPM", 30)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 0
+
+    def _vector(self, profile: dict) -> np.ndarray:
+        return self.embed(SimpleNamespace(**profile))
+
+    def _set_entries(self, entries: List[Archetype]):
+        self._entries = entries
+        self._matrix = np.stack([self._vector(entry.profile) for entry in entries]) if entries else None
+        self._bands = np.array([experience_band(entry.profile.get("experience_years")) for entry in entries],
+                               dtype=object)
+        self._generated_at = np.array([entry.generated_at for entry in entries], dtype=np.float64)
+
+    def _stale(self, entry: Archetype, now: float, market_version: Optional[str]) -> bool:
+        return now - entry.generated_at > self.ttl or (
+            market_version is not None and entry.market_version != market_version)
+
+    # --- Request path ---
+
+    async def record(self, profile, key: str) -> Optional[dict]:
+        """Log one analysis request; returns the normalized profile (None when the store is disabled)"""
+        if not self.enabled:
+            return None
+        normalized = normalize_profile(profile)
+        await run_blocking(self.backend, "record", time.time(), key, normalized)
+        return normalized
+
+    def match(self, profile, normalized: dict) -> Optional[List[dict]]:
+        """The closest archetype's recommendations (personalized), if one is close enough"""
+        if self._matrix is None:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        similarity = self._matrix @ self._vector(normalized)
+        # Other experience bands and entries past max age never match
+        similarity[(self._bands != experience_band(normalized["experience_years"]))
+                   | (now - self._generated_at > self.max_age)] = -1.0
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.match_similarity:
+            self.misses += 1
+            return None
+        entry = self._entries[best]
+        entry.hits += 1
+        self.hits += 1
+        return personalize(entry.recommendations, ARCHETYPE_NAME, profile.name)
+
+    # --- Precompute ---
+
+    def cluster(self, now: Optional[float] = None,
+                log: Optional[List[Tuple[str, dict]]] = None) -> List[Tuple[str, dict, int]]:
+        """(key, representative profile, support) of the top archetypes in the log window
+
+        Greedy leader clustering over the distinct profiles, most frequent first: each
+        joins the first leader in its experience band within cluster_similarity, so
+        every archetype is represented by its most requested real profile. `log` is
+        the window's (key, profile) entries, read from the backend when omitted.
+        """
+        now = now or time.time()
+        if log is None:
+            log = self.backend.recent(now - self.window)
+        counts: Counter = Counter()
+        profiles: Dict[str, dict] = {}
+        for key, profile in log:
+            counts[key] += 1
+            profiles[key] = profile
+        candidates = [key for key, _ in counts.most_common(self.max_candidates)]
+        if not candidates:
+            return []
+
+        vectors = np.stack([self._vector(profiles[key]) for key in candidates])
+        bands = np.array([experience_band(profiles[key].get("experience_years")) for key in candidates], dtype=object)
+        leaders: List[int] = []
+        support: List[int] = []
+        for i, key in enumerate(candidates):
+            if leaders:
+                similarity = vectors[leaders] @ vectors[i]
+                similarity[bands[leaders] != bands[i]] = -1.0
+                best = int(np.argmax(similarity))
+                if similarity[best] >= self.cluster_similarity:
+                    support[best] += counts[key]
+                    continue
+            leaders.append(i)
+            support.append(counts[key])
+
+        ranked = sorted(zip(support, leaders), key=lambda item: -item[0])
+        return [(candidates[leader], profiles[candidates[leader]], size)
+                for size, leader in ranked if size >= self.min_support][:self.count]
+
+    async def refresh(self, force: bool = False) -> int:
+        """Re-cluster the log and generate missing or stale archetypes; returns how many were generated
+
+        Without force, generation stops (keeping the previous entries) as soon as
+        upstream traffic picks up, and only the worker holding the lease refreshes.
+        """
+        if not force and not await run_blocking(self.backend, "acquire", self.owner, self.refresh_interval):
+            return 0
+        start = time.perf_counter()
+        now = time.time()
+        market_version = self.market_version()
+        current = {entry.key: entry for entry in self._entries}
+        entries = []
+        generated = 0
+        log = await run_blocking(self.backend, "recent", now - self.window)
+        for key, profile, support in self.cluster(now, log):
+            entry = current.get(key)
+            if entry is None or self._stale(entry, now, market_version):
+                if not force and self.is_busy():
+                    self.deferred += 1
+                else:
+                    fresh = await self._generate(key, profile, support, market_version, entry)
+                    if fresh is not None:
+                        entry = fresh
+                        generated += 1
+            if entry is not None:
+                entry.support = support
+                entries.append(entry)
+
+        self._set_entries(entries)
+        await run_blocking(self.backend, "save", entries)
+        self._version = (await run_blocking(self.backend, "load"))[0]
+        self.refreshes += 1
+        self.generated += generated
+        self.last_refresh = now
+        self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 1)
+        return generated
+
+    async def _generate(self, key: str, profile: dict, support: int, market_version: Optional[str],
+                        previous: Optional[Archetype]) -> Optional[Archetype]:
+        try:
+            years = int(float(profile.get("experience_years") or 0))
+            recommendations = await self.generate(dict(profile, name=ARCHETYPE_NAME, experience_years=years))
+        except Exception as e:
+            # Keep serving the previous entry (until max age) and retry on the next refresh
+            print(f"Archetype generation failed: {e}")
+            return None
+        return Archetype(
+            key, profile, support, [rec.model_dump() for rec in recommendations], time.time(), market_version,
+            hits=previous.hits if previous else 0,
+        )
+
+    # --- Background refresh ---
+
+    async def _sync(self):
+        """Adopt archetypes saved by another worker"""
+        version, entries = await run_blocking(self.backend, "load")
+        if version != self._version:
+            self._version = version
+            self._set_entries(entries)
+
+    def _due(self, now: float) -> bool:
+        if now - self.last_refresh >= self.refresh_interval:
+            return True
+        market_version = self.market_version()
+        return any(self._stale(entry, now, market_version) for entry in self._entries)
+
+    async def _quiet(self, now: float) -> bool:
+        """Off-peak: no upstream calls in flight and few analyses in the last minute"""
+        if self.is_busy():
+            return False
+        return await run_blocking(self.backend, "count_since", now - 60) <= self.quiet_rpm
+
+    async def start(self):
+        """Load stored archetypes, then keep them fresh in a background task"""
+        if not self.enabled:
+            return
+        await self._sync()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self._sync()
+                now = time.time()
+                if self._due(now) and await self._quiet(now):
+                    await self.refresh()
+            except Exception as e:
+                print(f"Archetype refresh error: {e}")
+
+    def stats(self) -> dict:
+        now = time.time()
+        market_version = self.market_version()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "archetypes": len(self._entries),
+            "stale": sum(self._stale(entry, now, market_version) for entry in self._entries),
+            "logged_profiles": len(self.backend) if self.enabled else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "generated": self.generated,
+            "deferred": self.deferred,
+            "last_refresh_ms": self.last_refresh_ms,
+        }
@@ -0,0 +1,88 @@
+"""
+Batch profile analysis
+Deduplicates a list of profiles, fans the unique ones out to the advisor under
+a concurrency bound with per-item timeouts, and yields results as they finish
+"""
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from admission import OverloadedError
+from circuit_breaker import CircuitOpenError
+from rec_cache import personalize, profile_cache_key
+
+BATCH_MAX_PROFILES = int(os.getenv("BATCH_MAX_PROFILES", 500))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 32))
+BATCH_ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT", 45.0))
+
+
+def group_profiles(profiles: Sequence) -> List[List[int]]:
+    """Indices of profiles grouped by normalized profile (first index leads each group)"""
+    groups: Dict[str, List[int]] = {}
+    for index, profile in enumerate(profiles):
+        groups.setdefault(profile_cache_key(profile), []).append(index)
+    return list(groups.values())
+
+
+async def analyze_batch(
+    profiles: Sequence,
+    analyze: Optional[Callable[[object], Awaitable[List]]],
+    fallback: Callable[[object, str], List],
+    concurrency: int = BATCH_CONCURRENCY,
+    item_timeout: float = BATCH_ITEM_TIMEOUT,
+) -> AsyncIterator[dict]:
+    """Yield one result dict per input profile, in completion order
+
+    `analyze` must raise rather than fall back itself (None when no model is
+    configured): a timeout or error on one profile yields that profile's
+    fallback recommendations with an `error` note - it never fails the batch,
+    and every degraded item says so.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_group(indices: List[int]):
+        leader = profiles[indices[0]]
+        async with semaphore:
+            start = time.monotonic()
+            error = None
+            try:
+                if analyze is None:
+                    error = "AI analysis unavailable - fallback recommendations returned"
+                    recommendations = fallback(leader, "no_api_key")
+                else:
+                    recommendations = await asyncio.wait_for(analyze(leader), item_timeout)
+            except asyncio.TimeoutError:
+                error = f"Timed out after {item_timeout:g}s - fallback recommendations returned"
+                recommendations = fallback(leader, "batch_timeout")
+            except OverloadedError as e:
+                error = f"Service busy ({e}) - fallback recommendations returned"
+                recommendations = fallback(leader, "overloaded")
+            except CircuitOpenError:
+                error = "AI service temporarily unavailable - fallback recommendations returned"
+                recommendations = fallback(leader, "circuit_open")
+            except Exception as e:
+                error = f"Error analyzing profile: {str(e)} - fallback recommendations returned"
+                recommendations = fallback(leader, "batch_error")
+            elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+        return indices, [rec.model_dump() for rec in recommendations], error, elapsed_ms
+
+    tasks = [asyncio.ensure_future(run_group(indices)) for indices in group_profiles(profiles)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            indices, recommendations, error, elapsed_ms = await next_done
+            leader_name = profiles[indices[0]].name
+            for index in indices:
+                yield {
+                    "index": index,
+                    "name": profiles[index].name,
+                    "recommendations": personalize(recommendations, leader_name, profiles[index].name),
+                    "error": error,
+                    "elapsed_ms": elapsed_ms,
+                }
+    finally:
+        # Client went away or the batch was abandoned - stop outstanding work
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,81 @@
+"""
+Microbenchmark: archetype clustering and nearest-archetype lookup cost
+Fills the profile log with synthetic traffic drawn from a few base profiles
+(random extra skills and interests), times cluster() over the log and match()
+per request against the resulting archetypes, and reports how much of the
+traffic an archetype would have answered without a model call.
+
+Usage:  python -m benchmarks.bench_archetypes --log 5000 --archetypes 20 --calls 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from archetypes import ArchetypeStore, MemoryArchetypeBackend
+from main import UserProfile, advisor
+from rec_cache import profile_cache_key
+
+BASES = [
+    ("Computer Science", ["ai", "machine learning", "programming"], ["Python", "SQL"]),
+    ("Graphic Design", ["design", "art", "user experience"], ["Figma", "Photoshop"]),
+    ("Business Administration", ["business", "finance", "management"], ["Excel", "Communication"]),
+    ("Statistics", ["data", "analytics", "research"], ["R", "Excel"]),
+    ("Computer Engineering", ["security", "networks", "cloud"], ["Linux", "Python"]),
+]
+EXTRA_SKILLS = ["Git", "Docker", "Tableau", "JavaScript", "Public Speaking", "Java", "Writing"]
+EXTRA_INTERESTS = ["startups", "teaching", "gaming", "healthcare", "sustainability"]
+
+
+def synthetic_profile(rng: random.Random, i: int) -> UserProfile:
+    education, interests, skills = rng.choice(BASES)
+    if rng.random() < 0.5:
+        skills = skills + rng.sample(EXTRA_SKILLS, 1)
+    if rng.random() < 0.3:
+        interests = interests + rng.sample(EXTRA_INTERESTS, 1)
+    return UserProfile(name=f"User {i}", education=education, interests=interests, skills=skills,
+                       experience_years=rng.choice([0, 0, 1, 3]))
+
+
+async def generate(fields: dict):
+    return advisor.local_index.recommend(UserProfile(**fields), 3)
+
+
+async def record_all(store: ArchetypeStore, profiles: list) -> list:
+    return [await store.record(profile, profile_cache_key(profile)) for profile in profiles]
+
+
+def main(log_size: int, archetypes: int, calls: int):
+    rng = random.Random(42)
+    store = ArchetypeStore(MemoryArchetypeBackend(max_log=log_size),
+                           embed=lambda profile: advisor.local_index.embed_profile(profile)[0],
+                           generate=generate, count=archetypes, min_support=3)
+    log = [synthetic_profile(rng, i) for i in range(log_size)]
+    asyncio.run(record_all(store, log))
+
+    start = time.perf_counter()
+    clusters = store.cluster()
+    cluster_ms = (time.perf_counter() - start) * 1000
+    asyncio.run(store.refresh(force=True))
+
+    requests = [synthetic_profile(rng, i) for i in range(calls)]
+    normalized = asyncio.run(record_all(store, requests))
+    start = time.perf_counter()
+    served = sum(store.match(profile, fields) is not None for profile, fields in zip(requests, normalized))
+    match_ms = (time.perf_counter() - start) / calls * 1000
+
+    covered = sum(size for _, _, size in clusters)
+    print(f"log: {log_size:,}   archetypes: {len(clusters)} (cover {covered / log_size:.0%} of the log)   "
+          f"cluster: {cluster_ms:.0f} ms")
+    print(f"match: {match_ms:.3f} ms per request   served from archetypes: {served / calls:.0%} "
+          f"(ARCHETYPE_MATCH_SIMILARITY={store.match_similarity})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--log", type=int, default=5000)
+    parser.add_argument("--archetypes", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.log, args.archetypes, args.calls)
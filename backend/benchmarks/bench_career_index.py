@@ -0,0 +1,63 @@
+"""
+Microbenchmark: local career index build and per-profile scoring cost
+Replicates data/careers.json into a synthetic catalog (default 10k careers)
+and times recommend() calls
+
+Usage:  python -m benchmarks.bench_career_index --careers 10000 --calls 2000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from career_index import DEFAULT_CAREERS_PATH, CareerIndex
+from main import CareerRecommendation, UserProfile
+
+INTERESTS = ["machine learning", "design", "data", "security", "cloud", "teaching", "finance", "marketing"]
+SKILLS = ["Python", "SQL", "Figma", "Linux", "Excel", "JavaScript", "AWS", "Communication", "Statistics"]
+
+
+def synthetic_catalog(size: int, rng: random.Random) -> list:
+    with open(DEFAULT_CAREERS_PATH, encoding="utf-8") as f:
+        base = json.load(f)["careers"]
+    catalog = []
+    for i in range(size):
+        career = dict(rng.choice(base))
+        career["title"] = f"{career['title']} {i}"
+        career["required_skills"] = career["required_skills"] + rng.sample(SKILLS, 2)
+        catalog.append(career)
+    return catalog
+
+
+def main(careers: int, calls: int):
+    rng = random.Random(42)
+    catalog = synthetic_catalog(careers, rng)
+    start = time.perf_counter()
+    index = CareerIndex(catalog, CareerRecommendation)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    profiles = [
+        UserProfile(
+            name="Bench", current_role="Analyst", education="Bachelor's", experience_years=2,
+            interests=rng.sample(INTERESTS, 2), skills=rng.sample(SKILLS, 3),
+            preferred_industries=["technology"], location="Remote",
+        )
+        for _ in range(64)
+    ]
+    start = time.perf_counter()
+    for i in range(calls):
+        index.recommend(profiles[i % len(profiles)])
+    per_call_ms = (time.perf_counter() - start) / calls * 1000
+
+    postings_mb = (index._posting_careers.nbytes + index._posting_weights.nbytes) / 1e6
+    print(f"careers: {careers:,}   terms: {len(index.vocabulary):,}   postings: {postings_mb:.1f} MB   "
+          f"build: {build_ms:.0f} ms   per call: {per_call_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--careers", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.careers, args.calls)
@@ -0,0 +1,58 @@
+"""
+Microbenchmark: per-call cost of the fallback engine at large catalog sizes
+Builds a synthetic catalog (default 10k entries) and times recommend() calls
+
+Usage:  python -m benchmarks.bench_fallback --entries 10000 --calls 20000
+"""
+
+import argparse
+import random
+import time
+
+from fallback_engine import FallbackEngine
+from main import CareerRecommendation
+
+VOCAB = [f"topic{i}" for i in range(5000)] + ["data", "design", "coding", "business", "machine learning"]
+
+
+def synthetic_catalog(size: int, rng: random.Random) -> list:
+    return [
+        {
+            "title": f"Career {i}",
+            "keywords": rng.sample(VOCAB, 4),
+            "base_score": rng.randint(60, 90),
+            "reason": "Synthetic entry",
+            "required_skills": ["Skill A", "Skill B"],
+            "average_salary": "$50,000 - $90,000",
+            "growth_outlook": "Medium",
+            "learning_roadmap": ["Step 1", "Step 2"],
+        }
+        for i in range(size)
+    ]
+
+
+def main(entries: int, calls: int):
+    rng = random.Random(42)
+    start = time.perf_counter()
+    engine = FallbackEngine(synthetic_catalog(entries, rng), CareerRecommendation)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    profiles = [
+        (rng.sample(VOCAB, 3) + ["machine learning"], rng.sample(VOCAB, 4))
+        for _ in range(256)
+    ]
+    start = time.perf_counter()
+    for i in range(calls):
+        interests, skills = profiles[i % len(profiles)]
+        engine.recommend(interests, skills)
+    per_call_us = (time.perf_counter() - start) / calls * 1e6
+
+    print(f"catalog entries: {entries:,}   build: {build_ms:.1f} ms   per call: {per_call_us:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.entries, args.calls)
@@ -0,0 +1,78 @@
+"""
+Benchmark: tail latency with and without hedged requests
+Two stub models: a fast one with a 10% slow tail and a slower but steady one.
+Hedging should cut p95/p99 close to the steady model's latency.
+
+Usage:  python -m benchmarks.bench_hedging --requests 300
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.openrouter_stub import app as stub_app, make_server
+
+MODEL_PROFILES = {
+    "stub/fast-tail": {"latency": 0.05, "slow_rate": 0.1, "slow_latency": 1.5},
+    "stub/steady": {"latency": 0.12, "slow_rate": 0.0},
+}
+
+
+MESSAGES = [{"role": "user", "content": "benchmark"}]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def run(advisor, router, total: int, concurrency: int, label: str):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await router.run(lambda route: advisor._post_completion(MESSAGES, route))
+            return time.perf_counter() - start
+
+    latencies = await asyncio.gather(*(one() for _ in range(total)))
+    print(f"{label:<14} p50 {percentile(latencies, 0.5):7.1f} ms   p95 {percentile(latencies, 0.95):7.1f} ms   "
+          f"p99 {percentile(latencies, 0.99):7.1f} ms   hedges {router.hedges_sent} (won {router.hedges_won})")
+
+
+async def main(total: int, concurrency: int, port: int):
+    url = f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    os.environ["OPENROUTER_API_URL"] = url
+    os.environ["OPENROUTER_MODELS"] = ",".join(MODEL_PROFILES)
+    from main import CareerAdvisor
+    from model_router import ModelRouter, parse_routes
+
+    stub_app.state.model_profiles = MODEL_PROFILES
+    server = make_server(port)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    advisor = CareerAdvisor()
+    try:
+        for attempts, label in ((1, "single model"), (2, "hedged")):
+            router = ModelRouter(parse_routes(os.environ["OPENROUTER_MODELS"], url),
+                                 max_attempts=attempts, min_hedge_delay=0.05)
+            # Warm up latency stats so the hedge deadline is p95-derived
+            await run(advisor, router, 40, concurrency, "  (warm-up)")
+            router.hedges_sent = router.hedges_won = 0
+            await run(advisor, router, total, concurrency, label)
+    finally:
+        await advisor.http.aclose()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8104)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.port))
@@ -0,0 +1,73 @@
+"""
+Benchmark: fresh AsyncClient per request vs the shared UpstreamHTTPClient pool
+Uses the local OpenRouter stub, so no API credits are spent
+
+Usage:  python -m benchmarks.bench_http_pool --requests 200 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.openrouter_stub import make_server
+from http_pool import UpstreamHTTPClient
+
+PAYLOAD = {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+
+
+async def per_request_client(url: str) -> float:
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await client.post(url, json=PAYLOAD)
+    return time.perf_counter() - start
+
+
+async def pooled_client(pool: UpstreamHTTPClient, url: str) -> float:
+    start = time.perf_counter()
+    await pool.post(url, json=PAYLOAD)
+    return time.perf_counter() - start
+
+
+async def run(label: str, make_call, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await make_call()
+
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(one() for _ in range(total))))
+    elapsed = time.perf_counter() - start
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{label:<22} {total / elapsed:8.1f} req/s   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+
+
+async def main(total: int, concurrency: int, port: int):
+    server = make_server(port, latency=0.0)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    url = f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    pool = UpstreamHTTPClient(http2=False)
+    try:
+        await run("new client / request", lambda: per_request_client(url), total, concurrency)
+        await run("shared pool", lambda: pooled_client(pool, url), total, concurrency)
+        print(f"pool stats: {pool.stats()}")
+    finally:
+        await pool.aclose()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.port))
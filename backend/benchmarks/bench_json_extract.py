@@ -0,0 +1,102 @@
+"""
+Fuzz/benchmark: model-output JSON extraction, legacy find/rfind parser vs extract_array
+Runs the hand-written malformed-output corpus (llm_output_corpus.json, each case
+with the number of valid recommendations it should yield) plus seeded random
+mutations of a clean completion, and reports recovered items and parse time.
+Exits non-zero if any corpus case recovers fewer items than expected.
+
+Usage:  python -m benchmarks.bench_json_extract --fuzz 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks.openrouter_stub import STUB_RECOMMENDATIONS
+from llm_json import extract_array, validate_items
+from main import CareerRecommendation, RecommendationList
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "llm_output_corpus.json")
+
+
+def legacy_parse(text: str) -> int:
+    """The original _parse_recommendations: any defect loses the whole response"""
+    try:
+        start, end = text.find("["), text.rfind("]") + 1
+        if start == -1 or end == 0:
+            return 0
+        return len([CareerRecommendation(**rec) for rec in json.loads(text[start:end])])
+    except Exception:
+        return 0
+
+
+def tolerant_parse(text: str) -> int:
+    return len(validate_items(RecommendationList, extract_array(text).items)[0])
+
+
+def mutate(rng: random.Random) -> str:
+    """A completion with one to three common model-output defects"""
+    recs = [dict(rec) for rec in STUB_RECOMMENDATIONS]
+    if rng.random() < 0.2:
+        recs[rng.randrange(len(recs))]["match_score"] = "high"
+    if rng.random() < 0.1:
+        del recs[rng.randrange(len(recs))]["growth_outlook"]
+    text = json.dumps(recs, indent=rng.choice([None, 2]))
+
+    defects = rng.sample(["fence", "prose", "trailing_comma", "truncate", "wrap"], rng.randint(1, 3))
+    if "trailing_comma" in defects:
+        text = text.replace("]", ",]").replace("}", ",}")
+    if "wrap" in defects:
+        text = '{"recommendations": ' + text + "}"
+    if "truncate" in defects:
+        text = text[:rng.randint(len(text) // 2, len(text) - 1)]
+    if "fence" in defects:
+        text = "```json\n" + text + "\n```"
+    if "prose" in defects:
+        text = "Here are my picks [ranked]:\n" + text + "\nHope this helps [good luck]!"
+    return text
+
+
+def timed(parse, texts) -> tuple:
+    start = time.perf_counter()
+    recovered = sum(parse(text) for text in texts)
+    return recovered, (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main(fuzz: int, seed: int) -> bool:
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+
+    ok = True
+    print(f"{'case':<30} {'expected':>8} {'legacy':>7} {'tolerant':>9}")
+    for case in cases:
+        legacy, tolerant = legacy_parse(case["text"]), tolerant_parse(case["text"])
+        mark = "" if tolerant >= case["expected_valid"] else "   <-- regression"
+        ok = ok and not mark
+        print(f"{case['name']:<30} {case['expected_valid']:>8} {legacy:>7} {tolerant:>9}{mark}")
+
+    rng = random.Random(seed)
+    texts = [mutate(rng) for _ in range(fuzz)]
+    possible = fuzz * len(STUB_RECOMMENDATIONS)
+    legacy, legacy_us = timed(legacy_parse, texts)
+    tolerant, tolerant_us = timed(tolerant_parse, texts)
+    clean = json.dumps(STUB_RECOMMENDATIONS)
+    _, clean_legacy_us = timed(legacy_parse, [clean] * 2000)
+    _, clean_tolerant_us = timed(tolerant_parse, [clean] * 2000)
+
+    print(f"\nfuzz: {fuzz} mutated responses, {possible} items")
+    print(f"  legacy:   recovered {legacy / possible:6.1%}   {legacy_us:7.1f} us/response")
+    print(f"  tolerant: recovered {tolerant / possible:6.1%}   {tolerant_us:7.1f} us/response")
+    print(f"clean response: legacy {clean_legacy_us:.1f} us, tolerant {clean_tolerant_us:.1f} us")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(0 if main(args.fuzz, args.seed) else 1)
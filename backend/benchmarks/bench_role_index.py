@@ -0,0 +1,88 @@
+"""
+Benchmark: role index build time, lookup latency and accuracy on a large synthetic taxonomy
+Canonical titles are domain x function combinations; queries add seniority,
+abbreviations, punctuation, word swaps and typos.
+
+Usage:  python -m benchmarks.bench_role_index --roles 5000 --queries 20000
+"""
+
+import argparse
+import random
+import time
+
+from role_index import RoleIndex
+
+DOMAINS = ["Data", "Cloud", "Security", "Mobile", "Frontend", "Backend", "Platform", "Payments", "Search",
+           "Growth", "Marketing", "Finance", "Healthcare", "Retail", "Logistics", "Gaming", "Robotics",
+           "Network", "Embedded", "Quantum", "Compliance", "Product", "Content", "Analytics", "Identity"]
+FUNCTIONS = ["Engineer", "Developer", "Analyst", "Manager", "Architect", "Designer", "Scientist",
+             "Consultant", "Specialist", "Administrator", "Researcher", "Strategist", "Coordinator"]
+QUALIFIERS = [f"Q{i}" for i in range(200)]
+SENIORITY = ["Sr.", "Senior", "Jr", "Lead", "Principal", "II", "Staff"]
+
+
+def make_taxonomy(size: int, rng: random.Random):
+    if size > len(DOMAINS) * len(QUALIFIERS) * len(FUNCTIONS):
+        raise ValueError("requested more roles than the synthetic vocabulary can produce")
+    titles = set()
+    while len(titles) < size:
+        titles.add(f"{rng.choice(DOMAINS)} {rng.choice(QUALIFIERS)} {rng.choice(FUNCTIONS)}")
+    return [{"title": title, "aliases": [title.replace(" ", "-")]} for title in sorted(titles)]
+
+
+def typo(word: str, rng: random.Random) -> str:
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:]
+
+
+def noisy(title: str, rng: random.Random) -> str:
+    words = title.split()
+    roll = rng.random()
+    if roll < 0.3:
+        words.insert(0, rng.choice(SENIORITY))
+    elif roll < 0.5:
+        words[-1] = typo(words[-1], rng)
+    elif roll < 0.6:
+        words[0], words[-1] = words[-1], words[0]
+    text = " ".join(words)
+    return text.lower() if rng.random() < 0.5 else text.replace(" ", "-")
+
+
+def main(roles: int, queries: int):
+    rng = random.Random(7)
+    taxonomy = make_taxonomy(roles, rng)
+
+    start = time.perf_counter()
+    index = RoleIndex(taxonomy)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    samples = [rng.choice(taxonomy)["title"] for _ in range(queries)]
+    probes = [noisy(title, rng) for title in samples]
+
+    # Uncached path (_lookup) so the numbers reflect the index, not the LRU
+    start = time.perf_counter()
+    results = [index._lookup(probe) for probe in probes]
+    per_lookup_us = (time.perf_counter() - start) / queries * 1e6
+    correct = sum(1 for match, title in zip(results, samples) if match and match.role == title)
+
+    # Repeat lookups of a hot set are served by the LRU
+    hot = probes[:1000]
+    for probe in hot:
+        index.lookup(probe)
+    start = time.perf_counter()
+    for probe in hot:
+        index.lookup(probe)
+    cached_us = (time.perf_counter() - start) / len(hot) * 1e6
+
+    print(f"roles: {len(index):,}   build: {build_ms:.1f} ms   "
+          f"lookup: {per_lookup_us:.1f} us (cached {cached_us:.2f} us)   accuracy: {correct / queries:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roles", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.roles, args.queries)
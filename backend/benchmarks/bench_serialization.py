@@ -0,0 +1,102 @@
+"""
+Microbenchmark: response serialization cost per endpoint, default vs fast path
+The default path is what FastAPI 0.115 does for a route with a response_model:
+dump our models to dicts, re-validate them against the model, serialize in JSON
+mode, then json.dumps in JSONResponse. The fast path (FAST_JSON_RESPONSES=1)
+encodes validated models once with pydantic-core, plain payloads with orjson,
+and reuses stored bytes for snapshot-backed and shared fallback payloads.
+
+Usage:  python -m benchmarks.bench_serialization --iterations 5000
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from benchmarks.openrouter_stub import STUB_RECOMMENDATIONS
+from fast_json import EncodedBodies, dumps, encode_list
+from main import (
+    BatchAnalysisResponse, CareerRecommendation, ChatResponse, RecommendationList, UserProfile, advisor,
+    market_store, role_index
+)
+
+PROFILE = UserProfile(name="Ann", education="Computer Science", interests=["machine learning", "data"],
+                      skills=["Python", "SQL"])
+
+
+def fastapi_default(adapter: TypeAdapter, content) -> bytes:
+    """Emulates fastapi.routing.serialize_response + JSONResponse for a response_model route"""
+    if isinstance(content, BaseModel):
+        prepared = content.model_dump(by_alias=True)
+    elif isinstance(content, list):
+        prepared = [item.model_dump(by_alias=True) if isinstance(item, BaseModel) else item for item in content]
+    else:
+        prepared = content
+    value = adapter.validate_python(prepared)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def timed(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def cases():
+    """(endpoint, default encoder, fast encoder) - both must produce equivalent JSON"""
+    generated = [CareerRecommendation(**rec) for rec in STUB_RECOMMENDATIONS]
+    fallback = advisor.fallback.recommend(PROFILE.interests, PROFILE.skills)
+    local = advisor.local_index.recommend(PROFILE, 3)
+    chat = ChatResponse(message="Hi Ann! Here are 3 career paths.", recommendations=generated,
+                        timestamp=datetime.now().isoformat(), session_id="0" * 32)
+    chat_adapter = TypeAdapter(ChatResponse)
+
+    items = [{"index": i, "name": f"User {i}", "recommendations": [rec.model_dump() for rec in generated],
+              "error": None, "elapsed_ms": 12.5} for i in range(50)]
+    batch = {"results": items, "total": 50, "unique_profiles": 50, "timestamp": datetime.now().isoformat()}
+    batch_adapter = TypeAdapter(BatchAnalysisResponse)
+
+    snapshot = market_store.snapshot
+    bodies = EncodedBodies()
+    trending = lambda: {"industry": "data", "trending_skills": snapshot.trending_skills("data"),
+                        "timestamp": snapshot.generated_at}
+    match = role_index.lookup("Sr. Data Analyst")
+    market = lambda: {"role": "Sr. Data Analyst", "canonical_role": match.role if match else None,
+                      "match_confidence": match.confidence if match else 0.0,
+                      "market_data": snapshot.role_data("Sr. Data Analyst"), "timestamp": snapshot.generated_at}
+
+    return [
+        ("analyze-profile (model output)", lambda: fastapi_default(RecommendationList, generated),
+         lambda: encode_list(RecommendationList, generated)),
+        ("analyze-profile (fallback)", lambda: fastapi_default(RecommendationList, fallback),
+         lambda: encode_list(RecommendationList, fallback)),
+        ("recommend/local", lambda: fastapi_default(RecommendationList, local),
+         lambda: encode_list(RecommendationList, local)),
+        ("chat", lambda: fastapi_default(chat_adapter, chat), lambda: chat.model_dump_json()),
+        ("batch (50 profiles)", lambda: fastapi_default(batch_adapter, batch), lambda: dumps(batch)),
+        ("trending-skills", lambda: JSONResponse(trending()).body,
+         lambda: bodies.get(snapshot.version, ("trending", "data"), trending)),
+        ("market-data/{role}", lambda: JSONResponse(market()).body,
+         lambda: bodies.get(snapshot.version, ("market", "Sr. Data Analyst"), market)),
+    ]
+
+
+def main(iterations: int):
+    import json
+    print(f"{'endpoint':<32} {'default_us':>10} {'fast_us':>8} {'speedup':>8}")
+    for name, default, fast in cases():
+        assert json.loads(default()) == json.loads(fast()), f"{name}: fast path output differs"
+        default_us, fast_us = timed(default, iterations), timed(fast, iterations)
+        print(f"{name:<32} {default_us:>10.1f} {fast_us:>8.1f} {default_us / fast_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: skill-gap analysis against a synthetic career catalog
+Builds careers from random skill-graph skills (default 10k careers) and times
+SkillGapEngine.analyze() - one bitset pass over every career - against the
+same ranking done with per-career Python sets.
+
+Usage:  python -m benchmarks.bench_skill_gap --careers 10000 --calls 500
+"""
+
+import argparse
+import random
+import time
+
+from skill_graph import SkillGapEngine, SkillGraph
+
+PROFILE_SKILLS = ["Python", "SQL", "Figma", "Linux", "Excel", "JavaScript", "AWS", "pandas", "React", "Docker"]
+
+
+def synthetic_catalog(graph: SkillGraph, size: int, rng: random.Random) -> list:
+    return [{"title": f"Career {i}", "required_skills": rng.sample(graph.names, rng.randint(4, 8))}
+            for i in range(size)]
+
+
+def set_baseline(graph: SkillGraph, catalog: list):
+    """Same ranking with Python sets, career sets precomputed like the engine's matrices"""
+    def closure(ids):
+        return {int(i) for i in graph.members(graph.expand(sorted(ids)))}
+
+    careers = []
+    for career in catalog:
+        required = {i for skill in career["required_skills"] for i in graph.resolve(skill)}
+        careers.append((career["title"], required, closure(required)))
+
+    def analyze(skills: list, top: int = 5) -> list:
+        have = closure({i for skill in skills for i in graph.resolve(skill)})
+        ranked = [(-(len(required & have) / len(required) if required else 1.0), len(needed - have), title)
+                  for title, required, needed in careers]
+        return sorted(ranked)[:top]
+
+    return analyze
+
+
+def main(careers: int, calls: int):
+    rng = random.Random(42)
+    graph = SkillGraph.from_file()
+    catalog = synthetic_catalog(graph, careers, rng)
+    start = time.perf_counter()
+    engine = SkillGapEngine(graph, catalog)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    profiles = [rng.sample(PROFILE_SKILLS, 4) for _ in range(32)]
+    start = time.perf_counter()
+    for i in range(calls):
+        engine.analyze(profiles[i % len(profiles)])
+    vector_ms = (time.perf_counter() - start) / calls * 1000
+
+    baseline = set_baseline(graph, catalog)
+    baseline_calls = max(1, calls // 10)
+    start = time.perf_counter()
+    for i in range(baseline_calls):
+        baseline(profiles[i % len(profiles)])
+    baseline_ms = (time.perf_counter() - start) / baseline_calls * 1000
+
+    matrix_kb = (engine.required.nbytes + engine.needed.nbytes) / 1e3
+    print(f"careers: {careers:,}   skills: {len(graph)}   bitsets: {matrix_kb:.0f} KB   build: {build_ms:.0f} ms")
+    print(f"per call: bitsets {vector_ms:.3f} ms   python sets {baseline_ms:.1f} ms   "
+          f"({baseline_ms / vector_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--careers", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+    main(args.careers, args.calls)
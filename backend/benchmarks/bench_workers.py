@@ -0,0 +1,153 @@
+"""
+Benchmark: cold start and throughput scaling from 1 to N gunicorn workers
+For each worker count, starts `gunicorn main:app -c gunicorn.conf.py` against the
+OpenRouter stub with fresh shared stores, times how long until /ready answers
+(and the startup_ms the workers report), then runs a closed-loop load of
+trending-skills, market-data and cached analyze-profile requests.
+
+The load generator shares the machine with the workers - on a small host it
+caps throughput first, so compare worker counts on the same host and read the
+scaling as a lower bound.
+
+Usage:  python -m benchmarks.bench_workers --workers 1,2,4 --duration 10 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROLES = ["Data Analyst", "Software Engineer", "ML Engineer", "UX Designer", "Product Manager"]
+INDUSTRIES = ["technology", "data", "design", "business"]
+
+
+def profile(i: int) -> dict:
+    # 20 distinct profiles: after the first pass every analysis is a shared-cache hit
+    return {"name": f"User {i}", "education": "Computer Science",
+            "interests": ["programming", f"topic {i % 20}"], "skills": ["Python", "SQL"]}
+
+
+def request_for(i: int):
+    kind = i % 3
+    if kind == 0:
+        return "GET", f"/api/trending-skills?industry={INDUSTRIES[i % len(INDUSTRIES)]}", None
+    if kind == 1:
+        return "GET", f"/api/market-data/{ROLES[i % len(ROLES)]}", None
+    return "POST", "/api/analyze-profile", profile(i)
+
+
+def start_gunicorn(workers: int, port: int, stub_port: int, state_dir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        PORT=str(port),
+        OPENROUTER_API_URL=f"http://127.0.0.1:{stub_port}/api/v1/chat/completions",
+        OPENROUTER_API_KEY=os.getenv("OPENROUTER_API_KEY", "stub-key"),
+        RATE_LIMIT_RPS="0",
+        REC_CACHE_PATH=os.path.join(state_dir, "recommendations.db"),
+        CHAT_SESSION_PATH=os.path.join(state_dir, "sessions.db"),
+        RATE_LIMIT_PATH=os.path.join(state_dir, "ratelimit.db"),
+        MARKET_SNAPSHOT_PATH=os.path.join(state_dir, "market.db"),
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(state_dir, "metrics"),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py", "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(base_url: str, workers: int, timeout: float = 60.0):
+    """(ms until the first /ready 200, slowest startup_ms among the workers seen)"""
+    start = time.perf_counter()
+    first_ready = None
+    startup = {}
+    while time.perf_counter() - start < timeout and len(startup) < workers:
+        try:
+            # New connection each time, so the kernel hands the probe to different workers
+            async with httpx.AsyncClient(base_url=base_url, timeout=2.0) as client:
+                response = await client.get("/ready")
+            if response.status_code == 200:
+                body = response.json()
+                first_ready = first_ready or (time.perf_counter() - start) * 1000
+                startup[body["pid"]] = body["startup_ms"]
+                continue
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.02)
+    if first_ready is None:
+        raise RuntimeError("server never became ready")
+    return first_ready, max(startup.values()), len(startup)
+
+
+async def load(base_url: str, duration: float, concurrency: int):
+    latencies = []
+    errors = 0
+    counter = iter(range(10 ** 9))
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                method, path, body = request_for(next(counter))
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    return len(latencies) / duration, percentile(0.5), percentile(0.99), errors
+
+
+async def main(worker_counts, port: int, stub_port: int, duration: float, concurrency: int):
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.openrouter_stub", "--port", str(stub_port), "--latency", "0.2"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"{'workers':>7} {'ready_ms':>9} {'startup_ms':>10} {'req/s':>8} {'p50_ms':>7} {'p99_ms':>7} {'errors':>6}")
+    try:
+        await asyncio.sleep(1.0)
+        for workers in worker_counts:
+            with tempfile.TemporaryDirectory() as state_dir:
+                os.makedirs(os.path.join(state_dir, "metrics"))
+                server = start_gunicorn(workers, port, stub_port, state_dir)
+                try:
+                    first_ready, startup_ms, seen = await wait_ready(base_url, workers)
+                    rps, p50, p99, errors = await load(base_url, duration, concurrency)
+                finally:
+                    server.terminate()
+                    server.wait()
+            note = "" if seen == workers else f"   ({seen}/{workers} workers probed)"
+            print(f"{workers:>7} {first_ready:>9.0f} {startup_ms:>10.0f} {rps:>8.0f} {p50:>7.1f} {p99:>7.1f} {errors:>6}{note}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--port", type=int, default=8104)
+    parser.add_argument("--stub-port", type=int, default=8105)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    counts = [int(n) for n in args.workers.split(",")]
+    asyncio.run(main(counts, args.port, args.stub_port, args.duration, args.concurrency))
@@ -0,0 +1,70 @@
+"""
+Fault-injection run for the circuit breaker
+Drives the app in-process against the local stub while the stub fails, then
+recovers, and prints breaker state and request latency for each phase
+
+Usage:  python -m benchmarks.fault_breaker
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.openrouter_stub import make_server
+
+
+async def phase(client, label: str, requests: int, backend):
+    latencies = []
+    for i in range(requests):
+        profile = {"name": "x", "education": "CS", "interests": [f"topic {label} {i}"], "skills": []}
+        start = time.perf_counter()
+        response = await client.post("/api/analyze-profile", json=profile)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    latencies.sort()
+    print(f"{label:<12} p50 {latencies[len(latencies) // 2]:8.1f} ms   max {latencies[-1]:8.1f} ms   "
+          f"breaker {backend.advisor.breaker.stats()}")
+
+
+async def main(port: int):
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub-key")
+    os.environ["BREAKER_OPEN_SECONDS"] = "2"
+    os.environ["BREAKER_SLOW_CALL_SECONDS"] = "1"
+    # Every request comes from one in-process client - don't let the per-client limit answer them
+    os.environ["RATE_LIMIT_RPS"] = "0"
+    import main as backend
+
+    server = make_server(port, latency=0.02)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    stub_url = f"http://127.0.0.1:{port}/configure"
+    transport = httpx.ASGITransport(app=backend.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=60) as client, \
+                httpx.AsyncClient() as stub:
+            await phase(client, "healthy", 10, backend)
+            await stub.post(stub_url, json={"error_rate": 1.0})
+            await phase(client, "failing", 20, backend)
+            await stub.post(stub_url, json={"error_rate": 0.0, "slow_rate": 1.0, "slow_latency": 1.5})
+            await asyncio.sleep(2.1)
+            await phase(client, "slow", 20, backend)
+            await stub.post(stub_url, json={"slow_rate": 0.0})
+            await asyncio.sleep(2.1)
+            await phase(client, "recovered", 10, backend)
+    finally:
+        await backend.advisor.http.aclose()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8103)
+    args = parser.parse_args()
+    asyncio.run(main(args.port))
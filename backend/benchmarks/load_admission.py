@@ -0,0 +1,123 @@
+"""
+Load test: upstream admission control and per-client rate limiting under overload
+Drives the real FastAPI app in-process against the local OpenRouter stub with a
+fixed provider capacity, first with admission effectively unbounded, then with
+a bounded slot pool and queue. Every request uses a distinct profile so neither
+the cache nor request coalescing hides the load. A last phase checks that one
+client hammering the API is rate limited while another is still served.
+
+Usage:  python -m benchmarks.load_admission --requests 64 --capacity 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from admission import AdmissionController, MemoryBucketBackend, RateLimiter
+from benchmarks.openrouter_stub import app as stub_app, make_server
+
+PROFILE = {
+    "name": "Student",
+    "education": "Computer Science",
+    "interests": ["programming", "AI"],
+    "skills": ["Python"],
+}
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_phase(backend, client, label: str, total: int):
+    backend.rate_limiter = RateLimiter(MemoryBucketBackend(), rate=0)  # Admission only in this phase
+    stub_app.state.max_in_flight = 0
+
+    async def one(i: int):
+        profile = {**PROFILE, "name": f"{label} {i}", "skills": ["Python", f"skill-{label}-{i}"]}
+        start = time.perf_counter()
+        response = await client.post("/api/analyze-profile", json=profile)
+        return response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [seconds * 1000 for _, seconds in results]
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    admission = backend.advisor.admission.stats()
+    shed = admission["rejected"] + admission["timed_out"]
+    print(f"{label:<10} {total} requests in {elapsed:5.2f}s  statuses {statuses}")
+    print(f"{'':<10} p50 {percentile(latencies, 0.5):7.0f} ms  p95 {percentile(latencies, 0.95):7.0f} ms  "
+          f"p99 {percentile(latencies, 0.99):7.0f} ms  max {max(latencies):7.0f} ms")
+    print(f"{'':<10} shed {shed}  upstream peak in flight {stub_app.state.max_in_flight}")
+
+
+async def rate_limit_phase(backend, client, burst: int):
+    # Clients are told apart by X-Forwarded-For, as behind Render's proxy
+    backend.rate_limiter = RateLimiter(MemoryBucketBackend(), rate=1.0, burst=burst, trust_forwarded=True)
+
+    async def send(client_ip: str, i: int):
+        profile = {**PROFILE, "name": f"{client_ip} {i}"}
+        response = await client.post("/api/analyze-profile", json=profile, headers={"X-Forwarded-For": client_ip})
+        return response
+
+    hammering = await asyncio.gather(*(send("203.0.113.7", i) for i in range(burst * 3)))
+    limited = [r for r in hammering if r.status_code == 429]
+    polite = await send("198.51.100.2", 0)
+    retry_after = limited[0].headers.get("retry-after") if limited else None
+    print(f"rate limit {len(hammering)} burst requests from one client -> {len(limited)} x 429 "
+          f"(Retry-After {retry_after}s); other client -> {polite.status_code}")
+    assert limited, "hammering client was never limited"
+    assert polite.status_code == 200, "well-behaved client was limited"
+
+
+async def main(total: int, port: int, latency: float, capacity: int, slots: int, queue: int, wait: float):
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub-key")
+    os.environ["REC_CACHE_BACKEND"] = "memory"
+    os.environ["UPSTREAM_MAX_CONNECTIONS"] = str(total * 2)
+    import main as backend
+    from circuit_breaker import CircuitBreaker
+
+    server = make_server(port, latency=latency)
+    stub_app.state.capacity = capacity
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    # Overload is what's being measured - keep the breaker from tripping on slow calls
+    backend.advisor.breaker = CircuitBreaker(slow_call_seconds=120.0)
+    transport = httpx.ASGITransport(app=backend.app)
+    print(f"stub: capacity {capacity} concurrent calls, {latency:g}s each\n")
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=120) as client:
+            backend.advisor.admission = AdmissionController(max_concurrent=total, max_queue=total, queue_timeout=120)
+            await run_phase(backend, client, "unbounded", total)
+            backend.advisor.admission = AdmissionController(max_concurrent=slots, max_queue=queue, queue_timeout=wait)
+            await run_phase(backend, client, "bounded", total)
+            print(f"{'':<10} admission {slots} slots / {queue} queued / {wait:g}s wait: "
+                  f"{backend.advisor.admission.stats()}\n")
+            await rate_limit_phase(backend, client, burst=5)
+    finally:
+        await backend.advisor.http.aclose()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8103)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--capacity", type=int, default=4, help="stub calls served concurrently")
+    parser.add_argument("--slots", type=int, default=4, help="UPSTREAM_MAX_CONCURRENT for the bounded phase")
+    parser.add_argument("--queue", type=int, default=8, help="UPSTREAM_MAX_QUEUE for the bounded phase")
+    parser.add_argument("--wait", type=float, default=2.0, help="UPSTREAM_QUEUE_TIMEOUT for the bounded phase")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.port, args.latency, args.capacity, args.slots, args.queue, args.wait))
@@ -0,0 +1,67 @@
+"""
+Load test: N identical concurrent profile analyses must make exactly one upstream call
+Drives the real FastAPI app in-process against the local OpenRouter stub
+
+Usage:  python -m benchmarks.load_singleflight --requests 50
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from benchmarks.openrouter_stub import make_server
+
+PROFILE = {
+    "name": "Student",
+    "education": "Computer Science",
+    "interests": ["programming", "AI"],
+    "skills": ["Python"],
+}
+
+
+async def main(total: int, port: int, latency: float):
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub-key")
+    os.environ["REC_CACHE_BACKEND"] = "memory"
+    # Every request comes from one in-process client - don't let the per-client limit answer them
+    os.environ["RATE_LIMIT_RPS"] = "0"
+    import main as backend
+
+    server = make_server(port, latency=latency)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    transport = httpx.ASGITransport(app=backend.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/api/analyze-profile", json={**PROFILE, "name": f"Student {i}"})
+                for i in range(total)
+            ))
+            elapsed = time.perf_counter() - start
+
+            async with httpx.AsyncClient() as stub:
+                upstream_calls = (await stub.get(f"http://127.0.0.1:{port}/stats")).json()["calls"]
+    finally:
+        await backend.advisor.http.aclose()
+        server.should_exit = True
+        await server_task
+
+    assert all(r.status_code == 200 for r in responses), "some requests failed"
+    assert upstream_calls == 1, f"expected 1 upstream call, got {upstream_calls}"
+    print(f"{total} concurrent requests -> {upstream_calls} upstream call in {elapsed * 1000:.1f} ms")
+    print(f"coalescing: {backend.advisor.inflight.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8102)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.port, args.latency))
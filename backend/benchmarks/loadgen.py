@@ -0,0 +1,316 @@
+"""
+Load generator: open-loop traffic against the API at a target request rate
+Starts the OpenRouter stub (with a latency/fault profile) and the backend
+unless --url points at a running server, sends a weighted mix of /api/chat,
+/api/analyze-profile, /api/trending-skills and /api/market-data/{role}
+requests at --rps, and writes throughput and p50/p95/p99 latency per endpoint
+to a JSON report. --compare diffs the run against an earlier report and exits
+non-zero when a p95 regresses past --threshold.
+
+Requests are sent on schedule whether or not earlier ones finished, and latency
+is measured from the scheduled send time - a stalled server shows up as
+latency instead of silently lowering the offered load.
+
+Usage:  python -m benchmarks.loadgen --rps 40 --duration 30 --stub-profile realistic
+        python -m benchmarks.loadgen --rps 40 --compare benchmarks/results/loadgen-<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.openrouter_stub import STUB_PROFILES
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_MIX = "chat=1,analyze=2,trending=4,market=3"
+
+ROLES = ["Data Analyst", "Sr. Software Engineer", "ML Engineer", "UX Designer", "Product Manager",
+         "DevOps Engineer", "Data Scientist", "Cybersecurity Analyst"]
+INDUSTRIES = ["technology", "data", "design", "business"]
+INTERESTS = ["programming", "AI", "data", "design", "security", "cloud", "finance", "healthcare", "games", "writing"]
+SKILLS = ["Python", "SQL", "JavaScript", "Excel", "Figma", "AWS", "Docker", "Statistics", "React", "Communication"]
+QUESTIONS = ["Which of these pays best?", "What should I learn first?", "How long would the switch take?",
+             "Is remote work common in these roles?"]
+
+
+# --- Traffic ---
+
+class Traffic:
+    """Builds requests; --profiles distinct profiles bound the recommendation-cache hit rate"""
+
+    def __init__(self, profiles: int, seed: int):
+        self.rng = random.Random(seed)
+        self.profiles = [self._profile(i) for i in range(max(1, profiles))]
+        self.sessions: List[str] = []
+
+    def _profile(self, i: int) -> dict:
+        rng = random.Random(i)
+        return {
+            "name": f"Load User {i}",
+            "education": rng.choice(["Computer Science", "Business", "Design", "Mathematics"]),
+            "interests": rng.sample(INTERESTS, 3),
+            "skills": rng.sample(SKILLS, 3),
+            "experience_years": rng.randint(0, 10),
+        }
+
+    def build(self, kind: str):
+        """(method, path, json body) for one request of the given kind"""
+        if kind == "trending":
+            return "GET", f"/api/trending-skills?industry={self.rng.choice(INDUSTRIES)}", None
+        if kind == "market":
+            return "GET", f"/api/market-data/{self.rng.choice(ROLES)}", None
+        if kind == "analyze":
+            return "POST", "/api/analyze-profile", self.rng.choice(self.profiles)
+        # Chat: half follow-ups on a live session, half new conversations
+        if self.sessions and self.rng.random() < 0.5:
+            body = {"message": self.rng.choice(QUESTIONS), "session_id": self.rng.choice(self.sessions)}
+        else:
+            body = {"message": "", "profile": self.rng.choice(self.profiles)}
+        return "POST", "/api/chat", body
+
+    def observe(self, kind: str, response: httpx.Response):
+        if kind == "chat" and response.status_code == 200 and len(self.sessions) < 200:
+            self.sessions.append(response.json()["session_id"])
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("chat", "analyze", "trending", "market"):
+            raise ValueError(f"unknown request kind in --mix: {kind}")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+# --- Run ---
+
+async def run_load(base_url: str, rps: float, duration: float, weights: Dict[str, float],
+                   traffic: Traffic, arrival: str, timeout: float) -> dict:
+    kinds = list(weights)
+    results: Dict[str, List] = {kind: [] for kind in kinds}
+    statuses: Dict[str, Dict[str, int]] = {kind: {} for kind in kinds}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=256)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def send(kind: str, scheduled: float):
+            method, path, body = traffic.build(kind)
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+                traffic.observe(kind, response)
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.HTTPError:
+                status = "error"
+            results[kind].append((time.perf_counter() - scheduled, status == "200"))
+            statuses[kind][status] = statuses[kind].get(status, 0) + 1
+
+        tasks = []
+        start = time.perf_counter()
+        next_at = start
+        while next_at < start + duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = traffic.rng.choices(kinds, weights=list(weights.values()))[0]
+            tasks.append(asyncio.create_task(send(kind, next_at)))
+            gap = traffic.rng.expovariate(rps) if arrival == "poisson" else 1.0 / rps
+            next_at += gap
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    report = {kind: summarize(results[kind], statuses[kind], elapsed) for kind in kinds}
+    combined: Dict[str, int] = {}
+    for kind in kinds:
+        for status, count in statuses[kind].items():
+            combined[status] = combined.get(status, 0) + count
+    report["all"] = summarize([sample for kind in kinds for sample in results[kind]], combined, elapsed)
+    return report
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(samples: List, statuses: Dict[str, int], elapsed: float) -> dict:
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    ok = sum(1 for _, success in samples if success)
+    if not latencies:
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "ok": ok,
+        "error_rate": round(1 - ok / len(samples), 4),
+        "throughput_rps": round(ok / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "max_ms": round(latencies[-1], 1),
+        "statuses": statuses,
+    }
+
+
+# --- Local servers ---
+
+def start_servers(port: int, stub_port: int, stub_profile: str, workers: int, state_dir: str):
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.openrouter_stub", "--port", str(stub_port), "--profile", stub_profile],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    env = dict(
+        os.environ,
+        OPENROUTER_API_URL=f"http://127.0.0.1:{stub_port}/api/v1/chat/completions",
+        OPENROUTER_API_KEY=os.getenv("OPENROUTER_API_KEY", "stub-key"),
+        # All load comes from one address - per-client limits would only measure the limiter
+        RATE_LIMIT_RPS="0",
+        WEB_CONCURRENCY=str(workers),
+        REC_CACHE_PATH=os.path.join(state_dir, "recommendations.db"),
+        CHAT_SESSION_PATH=os.path.join(state_dir, "sessions.db"),
+        RATE_LIMIT_PATH=os.path.join(state_dir, "ratelimit.db"),
+        MARKET_SNAPSHOT_PATH=os.path.join(state_dir, "market.db") if workers > 1 else "",
+    )
+    if workers > 1:
+        env["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(state_dir, "metrics")
+        os.makedirs(env["PROMETHEUS_MULTIPROC_DIR"])
+        command = [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py",
+                   "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return stub, server
+
+
+async def wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2.0) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{base_url} never became ready")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- Reports ---
+
+def print_report(report: dict):
+    print(f"{'endpoint':<10} {'requests':>8} {'ok rps':>7} {'errors':>7} {'p50_ms':>8} {'p95_ms':>8} "
+          f"{'p99_ms':>8} {'max_ms':>8}")
+    for kind, row in report["endpoints"].items():
+        if not row.get("requests"):
+            continue
+        print(f"{kind:<10} {row['requests']:>8} {row['throughput_rps']:>7.1f} {row['error_rate']:>7.1%} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+
+
+def compare(report: dict, baseline: dict, threshold: float, min_delta_ms: float) -> bool:
+    """Print per-endpoint deltas; False if any p95 got more than `threshold` (and `min_delta_ms`) slower"""
+    print(f"\nvs {baseline['meta']['commit']} ({baseline['meta']['timestamp'][:19]}):")
+    ok = True
+    for kind, row in report["endpoints"].items():
+        base = baseline["endpoints"].get(kind)
+        if not base or not base.get("requests") or not row.get("requests"):
+            continue
+        deltas = {metric: (row[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+                  for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")}
+        # Millisecond-scale endpoints jitter by large fractions - require an absolute slowdown too
+        regressed = deltas["p95_ms"] > threshold and row["p95_ms"] - base["p95_ms"] > min_delta_ms
+        ok = ok and not regressed
+        print(f"{kind:<10} " + "  ".join(f"{metric} {delta:+.1%}" for metric, delta in deltas.items())
+              + ("   <-- p95 regression" if regressed else ""))
+    return ok
+
+
+async def main(args) -> bool:
+    weights = parse_mix(args.mix)
+    traffic = Traffic(args.profiles, args.seed)
+    stub = server = None
+    base_url = args.url
+    with tempfile.TemporaryDirectory() as state_dir:
+        try:
+            if base_url is None:
+                stub, server = start_servers(args.port, args.stub_port, args.stub_profile, args.workers, state_dir)
+                base_url = f"http://127.0.0.1:{args.port}"
+            await wait_ready(base_url)
+            if args.warmup > 0:
+                await run_load(base_url, args.rps, args.warmup, weights, traffic, args.arrival, args.timeout)
+            endpoints = await run_load(base_url, args.rps, args.duration, weights, traffic, args.arrival, args.timeout)
+        finally:
+            for process in (server, stub):
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "target": args.url or "local",
+            "stub_profile": None if args.url else args.stub_profile,
+            "workers": None if args.url else args.workers,
+            "rps": args.rps,
+            "duration_s": args.duration,
+            "arrival": args.arrival,
+            "mix": weights,
+            "profiles": args.profiles,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "endpoints": endpoints,
+    }
+    print_report(report)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"loadgen-{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nreport: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return compare(report, json.load(f), args.threshold, args.min_delta_ms)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="target a running server instead of starting the stub and backend")
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds first (fills caches)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="request weights, e.g. chat=1,analyze=2")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--profiles", type=int, default=50, help="distinct user profiles in the traffic")
+    parser.add_argument("--stub-profile", choices=sorted(STUB_PROFILES), default="realistic")
+    parser.add_argument("--workers", type=int, default=1, help=">1 runs the backend under gunicorn")
+    parser.add_argument("--port", type=int, default=8106)
+    parser.add_argument("--stub-port", type=int, default=8107)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="report path (default benchmarks/results/loadgen-<commit>.json)")
+    parser.add_argument("--compare", help="earlier report to diff against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 slowdown before failing --compare")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0, help="ignore p95 slowdowns smaller than this")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
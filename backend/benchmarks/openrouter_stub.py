@@ -0,0 +1,213 @@
+"""
+Local stub of the OpenRouter chat-completions API
+Returns a canned career recommendation completion so benchmarks never hit the real API
+
+Run standalone:  python -m benchmarks.openrouter_stub --port 8100 [--profile realistic]
+Then point the backend at it:  OPENROUTER_API_URL=http://127.0.0.1:8100/api/v1/chat/completions
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+STUB_RECOMMENDATIONS = [
+    {
+        "title": "Machine Learning Engineer",
+        "match_score": 88,
+        "reason": "Strong programming interest combined with AI focus",
+        "required_skills": ["Python", "PyTorch", "Statistics", "MLOps"],
+        "average_salary": "$95,000 - $150,000",
+        "growth_outlook": "High - AI adoption keeps accelerating",
+        "learning_roadmap": ["Learn linear algebra", "Build ML projects", "Deploy a model"]
+    },
+    {
+        "title": "Data Analyst",
+        "match_score": 80,
+        "reason": "Analytical interests map well to data analysis",
+        "required_skills": ["SQL", "Excel", "Python", "Tableau"],
+        "average_salary": "$60,000 - $95,000",
+        "growth_outlook": "High - 25% growth expected in data careers",
+        "learning_roadmap": ["Learn SQL", "Master Pandas", "Publish dashboards"]
+    },
+    {
+        "title": "Software Developer",
+        "match_score": 76,
+        "reason": "Solid base for any technology career",
+        "required_skills": ["Python", "JavaScript", "Git"],
+        "average_salary": "$70,000 - $120,000",
+        "growth_outlook": "High - 22% growth projected through 2030",
+        "learning_roadmap": ["Pick a language", "Build projects", "Apply for junior roles"]
+    }
+]
+
+# Named latency/fault/streaming presets (--profile, STUB_PROFILE or {"profile": ...} on /configure)
+STUB_PROFILES = {
+    "fast": {"latency": 0.05, "jitter": 0.0, "error_rate": 0.0, "slow_rate": 0.0, "chunk_delay": 0.005, "capacity": 0},
+    # Roughly what OpenRouter looks like for a ~600-token completion
+    "realistic": {"latency": 1.2, "jitter": 0.3, "error_rate": 0.01, "slow_rate": 0.02, "slow_latency": 8.0,
+                  "chunk_size": 16, "chunk_delay": 0.02, "capacity": 0},
+    "flaky": {"latency": 0.5, "jitter": 0.3, "error_rate": 0.15, "slow_rate": 0.1, "slow_latency": 5.0, "capacity": 0},
+    "overloaded": {"latency": 1.0, "jitter": 0.2, "error_rate": 0.0, "slow_rate": 0.0, "capacity": 4},
+    "slow-stream": {"latency": 0.3, "jitter": 0.1, "error_rate": 0.0, "chunk_size": 8, "chunk_delay": 0.05, "capacity": 0},
+}
+SETTINGS = ("latency", "jitter", "error_rate", "slow_rate", "slow_latency", "chunk_size", "chunk_delay", "capacity")
+
+app = FastAPI(title="OpenRouter Stub")
+app.state.latency = float(os.getenv("STUB_LATENCY", "0.05"))
+# Each delay is scaled by a uniform factor in [1 - jitter, 1 + jitter]
+app.state.jitter = float(os.getenv("STUB_JITTER", "0"))
+app.state.chunk_size = int(os.getenv("STUB_CHUNK_SIZE", "16"))
+app.state.chunk_delay = float(os.getenv("STUB_CHUNK_DELAY", "0.005"))
+# Fault injection: fraction of calls answered with a 5xx, fraction answered slowly
+app.state.error_rate = float(os.getenv("STUB_ERROR_RATE", "0"))
+app.state.slow_rate = float(os.getenv("STUB_SLOW_RATE", "0"))
+app.state.slow_latency = float(os.getenv("STUB_SLOW_LATENCY", "5"))
+# Per-model overrides, e.g. {"fast-model": {"latency": 0.05, "slow_rate": 0.1, "slow_latency": 2}}
+app.state.model_profiles = json.loads(os.getenv("STUB_MODEL_PROFILES", "{}"))
+# Provider capacity: calls beyond this many in flight queue behind them (0 = unlimited)
+app.state.capacity = int(os.getenv("STUB_CAPACITY", "0"))
+app.state.calls = 0
+app.state.in_flight = 0
+app.state.max_in_flight = 0
+_capacity_gate = {"size": 0, "semaphore": None}
+
+
+def _gate():
+    """Semaphore matching the current capacity setting (rebuilt when it changes)"""
+    if _capacity_gate["size"] != app.state.capacity:
+        _capacity_gate["size"] = app.state.capacity
+        _capacity_gate["semaphore"] = asyncio.Semaphore(app.state.capacity) if app.state.capacity > 0 else None
+    return _capacity_gate["semaphore"]
+
+
+def apply_profile(name: str):
+    """Switch to one of STUB_PROFILES (unknown names raise KeyError)"""
+    for setting, value in STUB_PROFILES[name].items():
+        setattr(app.state, setting, value)
+
+
+if os.getenv("STUB_PROFILE"):
+    apply_profile(os.environ["STUB_PROFILE"])
+
+
+def stub_usage(payload: dict, content: str) -> dict:
+    """Approximate token usage (~4 chars per token) so token accounting can be exercised"""
+    prompt_tokens = len(json.dumps(payload.get("messages", []))) // 4
+    completion_tokens = len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def completion_body(payload: dict) -> dict:
+    """Build an OpenAI-compatible completion response"""
+    content = json.dumps(STUB_RECOMMENDATIONS)
+    return {
+        "id": "stub-completion",
+        "model": payload.get("model", "stub"),
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}}
+        ],
+        "usage": stub_usage(payload, content)
+    }
+
+
+async def stream_chunks(payload: dict):
+    """Yield the canned completion as OpenAI-compatible SSE deltas"""
+    model = payload.get("model", "stub")
+    content = json.dumps(STUB_RECOMMENDATIONS)
+    yield ": OPENROUTER PROCESSING\n\n"
+    for i in range(0, len(content), app.state.chunk_size):
+        delta = {"choices": [{"index": 0, "delta": {"content": content[i:i + app.state.chunk_size]}}], "model": model}
+        yield f"data: {json.dumps(delta)}\n\n"
+        await asyncio.sleep(app.state.chunk_delay)
+    if (payload.get("stream_options") or {}).get("include_usage"):
+        yield f"data: {json.dumps({'choices': [], 'usage': stub_usage(payload, content)})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/api/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Mimic the chat-completions endpoint after the configured latency"""
+    payload = await request.json()
+    app.state.calls += 1
+    app.state.in_flight += 1
+    app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+    try:
+        settings = app.state.model_profiles.get(payload.get("model"), {})
+        slow = random.random() < settings.get("slow_rate", app.state.slow_rate)
+        delay = (settings.get("slow_latency", app.state.slow_latency) if slow
+                 else settings.get("latency", app.state.latency))
+        if app.state.jitter:
+            delay *= random.uniform(1 - app.state.jitter, 1 + app.state.jitter)
+        gate = _gate()
+        if gate is None:
+            await asyncio.sleep(delay)
+        else:
+            async with gate:
+                await asyncio.sleep(delay)
+    finally:
+        app.state.in_flight -= 1
+    if random.random() < settings.get("error_rate", app.state.error_rate):
+        return JSONResponse({"error": {"message": "Injected upstream failure"}}, status_code=503)
+    if payload.get("stream"):
+        return StreamingResponse(stream_chunks(payload), media_type="text/event-stream")
+    return completion_body(payload)
+
+
+@app.post("/configure")
+async def configure(request: Request):
+    """Change latency/fault settings at runtime, e.g. {"error_rate": 1.0} or {"profile": "flaky"}"""
+    settings = await request.json()
+    if "profile" in settings:
+        if settings["profile"] not in STUB_PROFILES:
+            return JSONResponse({"error": f"unknown profile, expected one of {sorted(STUB_PROFILES)}"}, status_code=400)
+        apply_profile(settings["profile"])
+    for name in SETTINGS:
+        if name in settings:
+            setattr(app.state, name, type(getattr(app.state, name))(settings[name]))
+    if "model_profiles" in settings:
+        app.state.model_profiles = settings["model_profiles"]
+    return {name: getattr(app.state, name) for name in SETTINGS}
+
+
+@app.post("/reset")
+async def reset():
+    """Zero the call counters between benchmark runs"""
+    app.state.calls = 0
+    app.state.max_in_flight = app.state.in_flight
+    return {"calls": 0}
+
+
+@app.get("/stats")
+async def stats():
+    """Completions served and peak concurrency, used by benchmarks to count upstream calls"""
+    return {"calls": app.state.calls, "in_flight": app.state.in_flight, "max_in_flight": app.state.max_in_flight}
+
+
+def make_server(port: int, latency: Optional[float] = 0.05) -> uvicorn.Server:
+    """Create an in-process uvicorn server for the stub (start with `await server.serve()`)"""
+    if latency is not None:
+        app.state.latency = latency
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    return uvicorn.Server(config)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenRouter stub")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--profile", choices=sorted(STUB_PROFILES), help="latency/fault preset")
+    parser.add_argument("--latency", type=float, help="seconds per completion (overrides the profile)")
+    parser.add_argument("--capacity", type=int, help="concurrent calls served before queueing (0 = unlimited)")
+    args = parser.parse_args()
+    if args.profile:
+        apply_profile(args.profile)
+    if args.capacity is not None:
+        app.state.capacity = args.capacity
+    asyncio.run(make_server(args.port, args.latency).serve())
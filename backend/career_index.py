@@ -0,0 +1,225 @@
+"""
+Local career retrieval index
+Careers from data/careers.json are embedded once as TF-IDF vectors over the
+catalog's exact unigram/bigram vocabulary (NumPy, CPU only), so matching needs
+no LLM call. Profile terms the catalog never uses are dropped - unlike hashed
+buckets, an exact vocabulary can't credit a career with a term it doesn't
+contain.
+
+The vectors are stored as per-term posting lists (careers containing the term
+and their weights): a profile only touches a few dozen terms, so scoring adds
+up those lists instead of streaming a terms x careers matrix.
+"""
+
+import json
+import math
+import os
+import re
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from fast_json import EncodedList
+
+DEFAULT_CAREERS_PATH = os.path.join(os.path.dirname(__file__), "data", "careers.json")
+
+# Profile fields and how much each one counts in the query vector
+PROFILE_WEIGHTS = (
+    ("interests", 1.0),
+    ("skills", 0.8),
+    ("preferred_industries", 0.5),
+    ("education", 0.5),
+    ("current_role", 0.3),
+)
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is",
+    "it", "of", "on", "or", "the", "then", "through", "to", "using", "with", "your",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def terms(text: str) -> List[str]:
+    """Word unigrams and bigrams (stop words removed)"""
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class CareerIndex:
+    """Precomputed career postings with vectorized top-k profile matching"""
+
+    def __init__(self, careers: Sequence[dict], factory: Callable, min_similarity: float = 0.1):
+        self.careers = list(careers)
+        self.factory = factory
+        # Weaker matches than this are no match (the fallback defaults answer instead)
+        self.min_similarity = min_similarity
+
+        docs = [self._career_terms(career) for career in self.careers]
+        # Sorted, so every worker numbers terms the same way
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(sorted({t for doc in docs for t in doc}))}
+        dims = len(self.vocabulary)
+
+        # (career, term) pairs with their counts
+        rows = np.repeat(np.arange(len(docs), dtype=np.int64), [len(doc) for doc in docs])
+        columns = np.fromiter((self.vocabulary[term] for doc in docs for term in doc), dtype=np.int64, count=len(rows))
+        pairs, counts = np.unique(rows * max(dims, 1) + columns, return_counts=True)
+        rows, columns = pairs // max(dims, 1), pairs % max(dims, 1)
+
+        # Smoothed IDF per term, then unit-length rows
+        df = np.bincount(columns, minlength=dims).astype(np.float32)
+        self.idf = np.log((1 + len(docs)) / (1 + df)).astype(np.float32) + 1.0
+        weights = counts.astype(np.float32) * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=len(docs))).astype(np.float32)
+        weights /= np.maximum(norms[rows], 1e-9)
+
+        # Term-major postings (careers ascending within a term): term t is [indptr[t], indptr[t + 1])
+        order = np.lexsort((rows, columns))
+        self._posting_careers = rows[order]
+        self._posting_weights = weights[order]
+        self._indptr = np.searchsorted(columns[order], np.arange(dims + 1))
+
+        self.queries = 0
+        self.total_ms = 0.0
+        # Identical matches (careers, scores, matched terms) share one result list
+        self._results: Dict[tuple, EncodedList] = {}
+        self.max_shared_results = 4096
+
+    @classmethod
+    def from_file(cls, factory: Callable, path: str = None) -> "CareerIndex":
+        """Build from CAREERS_PATH or the bundled data/careers.json"""
+        path = path or os.getenv("CAREERS_PATH", DEFAULT_CAREERS_PATH)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["careers"] if isinstance(data, dict) else data, factory,
+                   min_similarity=float(os.getenv("CAREER_INDEX_MIN_SIMILARITY", 0.1)))
+
+    @staticmethod
+    def _career_terms(career: dict) -> List[str]:
+        # Title and skills are repeated so they outweigh the free-text description
+        text = " ".join([
+            career["title"], career["title"],
+            career.get("description", ""),
+            " . ".join(career["required_skills"]), " . ".join(career["required_skills"]),
+        ])
+        return terms(text)
+
+    def embed_profile(self, profile) -> Tuple[np.ndarray, Dict[int, str]]:
+        """Query vector for a profile, plus term column -> profile item map for explanations"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        labels: Dict[int, str] = {}
+        for field, weight in PROFILE_WEIGHTS:
+            value = getattr(profile, field, None) or []
+            items = [value] if isinstance(value, str) else value
+            for item in items:
+                for term in terms(item):
+                    column = self.vocabulary.get(term)
+                    if column is None:
+                        continue
+                    vector[column] += weight
+                    if " " not in term and field in ("interests", "skills"):
+                        labels.setdefault(column, item)
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector, labels
+
+    def search(self, profile, k: int = 3) -> List[Tuple[int, float, List[str]]]:
+        """Top-k (career index, cosine similarity, matched profile terms)"""
+        start = time.perf_counter()
+        vector, labels = self.embed_profile(profile)
+        columns = np.flatnonzero(vector)
+        if not len(columns):
+            return []
+
+        # Cosine similarity against every career (rows are unit-length, so a dot product)
+        weights = vector[columns]
+        scores = np.zeros(len(self.careers), dtype=np.float32)
+        for column, weight in zip(columns, weights):
+            lo, hi = self._indptr[column], self._indptr[column + 1]
+            scores[self._posting_careers[lo:hi]] += weight * self._posting_weights[lo:hi]
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for idx in top:
+            if scores[idx] <= 0 or scores[idx] < self.min_similarity:
+                continue
+            # Profile items contributing most to this career's score
+            contributions = weights * self._career_weights(columns, idx)
+            matched = []
+            for pos in np.argsort(-contributions)[:8]:
+                label = labels.get(int(columns[pos]))
+                if contributions[pos] > 0 and label and label not in matched:
+                    matched.append(label)
+            results.append((int(idx), float(scores[idx]), matched[:3]))
+
+        self.queries += 1
+        self.total_ms += (time.perf_counter() - start) * 1000
+        return results
+
+    def _career_weights(self, columns: np.ndarray, career: int) -> np.ndarray:
+        """Weight of each term column in one career's vector (0 where it doesn't occur)"""
+        found = np.zeros(len(columns), dtype=np.float32)
+        for i, column in enumerate(columns):
+            lo, hi = self._indptr[column], self._indptr[column + 1]
+            pos = lo + np.searchsorted(self._posting_careers[lo:hi], career)
+            if pos < hi and self._posting_careers[pos] == career:
+                found[i] = self._posting_weights[pos]
+        return found
+
+    @staticmethod
+    def match_score(similarity: float) -> int:
+        """Map cosine similarity to 0-100 (sqrt spreads the low end: 0.1 -> 32, 0.25 -> 50, 0.5 -> 71)"""
+        return max(0, min(99, round(100 * math.sqrt(max(similarity, 0.0)))))
+
+    def candidates(self, profile, k: int = 5) -> List[Tuple[str, int]]:
+        """(title, match score) of the closest careers - used to ground the LLM prompt"""
+        return [(self.careers[idx]["title"], self.match_score(similarity))
+                for idx, similarity, _ in self.search(profile, k)]
+
+    def recommend(self, profile, k: int = 3) -> List:
+        """Top-k careers as CareerRecommendation objects with similarity-based scores
+
+        Returns a shared, read-only list - the same match always yields the same list.
+        """
+        matches = tuple((idx, self.match_score(similarity), tuple(matched))
+                        for idx, similarity, matched in self.search(profile, k))
+        shared = self._results.get(matches)
+        if shared is not None:
+            return shared
+
+        recommendations = EncodedList()
+        for idx, score, matched in matches:
+            career = self.careers[idx]
+            if matched:
+                reason = f"Your profile ({', '.join(matched)}) closely matches what {career['title']} roles need."
+            else:
+                reason = f"Your background overlaps with the skills {career['title']} roles need."
+            recommendations.append(self.factory(
+                title=career["title"],
+                match_score=score,
+                reason=reason,
+                required_skills=list(career["required_skills"]),
+                average_salary=career["average_salary"],
+                growth_outlook=career["growth_outlook"],
+                learning_roadmap=list(career["learning_roadmap"]),
+            ))
+        if len(self._results) >= self.max_shared_results:
+            self._results.clear()
+        self._results[matches] = recommendations
+        return recommendations
+
+    def stats(self) -> dict:
+        return {
+            "careers": len(self.careers),
+            "vocabulary": len(self.vocabulary),
+            "postings": len(self._posting_careers),
+            "queries": self.queries,
+            "avg_ms": round(self.total_ms / self.queries, 3) if self.queries else 0.0,
+        }
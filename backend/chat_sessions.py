@@ -0,0 +1,136 @@
+"""
+Server-side chat sessions
+A session keeps the profile's compact context, the recommendations already
+given, a rolling summary of older turns and the last few turns verbatim.
+Follow-up messages are answered from that state, so only the new question
+(plus a bounded context) goes to the model - never the full profile again.
+"""
+
+import json
+import os
+import uuid
+from typing import List, Optional, Sequence
+
+from prompts import compact_list, estimate_tokens
+from rec_cache import MemoryCacheBackend, SQLiteCacheBackend, default_backend, profile_cache_key, run_blocking
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def profile_context(profile) -> str:
+    """One-line profile digest sent with follow-ups instead of the full profile"""
+    skills = compact_list(profile.skills, 30)
+    interests = compact_list(profile.interests, 30)
+    return (f"{profile.name}, {profile.current_role} ({profile.experience_years} yrs), {profile.education}; "
+            f"skills: {', '.join(skills) or 'n/a'}; interests: {', '.join(interests) or 'n/a'}; "
+            f"location: {profile.location}")
+
+
+class ChatSession:
+    """Conversation state for one session id"""
+
+    def __init__(self, session_id: str, profile_key: Optional[str] = None, context: str = "",
+                 recommendations: Optional[List[dict]] = None, summary: Optional[List[str]] = None,
+                 history: Optional[List[dict]] = None, turns: int = 0):
+        self.session_id = session_id
+        self.profile_key = profile_key
+        self.context = context
+        self.recommendations = recommendations or []
+        self.summary = summary or []    # One line per folded (question, answer) pair, oldest first
+        self.history = history or []    # Recent {"role", "content"} messages
+        self.turns = turns
+
+    @property
+    def has_profile(self) -> bool:
+        return self.profile_key is not None
+
+    def set_profile(self, profile, recommendations: Sequence[dict]):
+        """Adopt a new profile and its recommendations (earlier turns stay in the summary)"""
+        self.profile_key = profile_cache_key(profile)
+        self.context = profile_context(profile)
+        self.recommendations = list(recommendations)
+
+    def careers_line(self) -> str:
+        return ", ".join(f"{rec['title']} ({rec['match_score']})" for rec in self.recommendations)
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ChatSession":
+        return cls(**json.loads(raw))
+
+
+class ChatSessionStore:
+    """Bounded session store (LRU + sliding TTL) on the recommendation-cache backends"""
+
+    def __init__(self, backend, history_turns: int = 4, summary_tokens: int = 200):
+        self.backend = backend
+        self.history_turns = history_turns
+        self.summary_tokens = summary_tokens
+        self.created = 0
+        self.resumed = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls) -> "ChatSessionStore":
+        """Build a store from CHAT_SESSION_* environment variables"""
+        ttl = float(os.getenv("CHAT_SESSION_TTL", 1800))
+        max_entries = int(os.getenv("CHAT_SESSION_MAX_ENTRIES", 10000))
+        # Workers must share sessions - a follow-up can land on any of them
+        if os.getenv("CHAT_SESSION_BACKEND", default_backend()).lower() == "sqlite":
+            path = os.getenv("CHAT_SESSION_PATH", "cache/sessions.db")
+            backend = SQLiteCacheBackend(path, max_entries=max_entries, ttl=ttl, table="chat_sessions")
+        else:
+            backend = MemoryCacheBackend(max_entries=max_entries, ttl=ttl)
+        return cls(
+            backend,
+            history_turns=int(os.getenv("CHAT_HISTORY_TURNS", 4)),
+            summary_tokens=int(os.getenv("CHAT_SUMMARY_TOKENS", 200)),
+        )
+
+    async def load(self, session_id: Optional[str]) -> ChatSession:
+        """Resume a live session, or start a new one (unknown and expired ids get a fresh id)"""
+        if session_id:
+            raw = await run_blocking(self.backend, "get", session_id)
+            if raw is not None:
+                self.resumed += 1
+                return ChatSession.from_json(raw)
+            self.expired += 1
+        self.created += 1
+        return ChatSession(uuid.uuid4().hex)
+
+    async def save(self, session: ChatSession):
+        # Every save refreshes the TTL, so active conversations never expire mid-session
+        await run_blocking(self.backend, "set", session.session_id, session.to_json())
+
+    def record_turn(self, session: ChatSession, question: str, answer: str):
+        """Append one exchange; turns beyond the history window fold into the summary"""
+        session.turns += 1
+        if not question.strip():
+            # Profile-only turns carry no text worth replaying to the model
+            return
+        session.history.append({"role": "user", "content": question})
+        session.history.append({"role": "assistant", "content": answer})
+        while len(session.history) > 2 * self.history_turns:
+            old_question, old_answer = session.history[0], session.history[1]
+            del session.history[:2]
+            session.summary.append(
+                f"Q: {_clip(old_question['content'], 100)} A: {_clip(old_answer['content'], 140)}"
+            )
+        # Oldest summary lines go first once the summary exceeds its token budget
+        while session.summary and estimate_tokens(" ".join(session.summary)) > self.summary_tokens:
+            session.summary.pop(0)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "sessions": len(self.backend),
+            "created": self.created,
+            "resumed": self.resumed,
+            "expired": self.expired,
+            "evictions": self.backend.evictions,
+        }
@@ -0,0 +1,162 @@
+"""
+Circuit breaker around the upstream model call
+When OpenRouter is failing or slow, requests go straight to the fallback engine
+instead of each waiting out the full timeout
+"""
+
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by rolling error and slow-call rates"""
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        # Rolling window of (failed, slow) outcomes for recent calls
+        self._outcomes: deque = deque(maxlen=window_size)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Build a breaker from BREAKER_* environment variables"""
+        return cls(
+            window_size=int(os.getenv("BREAKER_WINDOW", 20)),
+            min_calls=int(os.getenv("BREAKER_MIN_CALLS", 5)),
+            error_rate_threshold=float(os.getenv("BREAKER_ERROR_RATE", 0.5)),
+            slow_call_seconds=float(os.getenv("BREAKER_SLOW_CALL_SECONDS", 10.0)),
+            slow_rate_threshold=float(os.getenv("BREAKER_SLOW_RATE", 0.5)),
+            open_seconds=float(os.getenv("BREAKER_OPEN_SECONDS", 30.0)),
+            half_open_probes=int(os.getenv("BREAKER_HALF_OPEN_PROBES", 1)),
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (reserves a probe slot when half-open)"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.short_circuited += 1
+                return False
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.short_circuited += 1
+                return False
+            self._probes_in_flight += 1
+
+        return True
+
+    def record_success(self, duration: float):
+        slow = duration >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if slow:
+                self._trip()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(CLOSED)
+            return
+
+        self._outcomes.append((False, slow))
+        self._evaluate()
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._trip()
+            return
+
+        self._outcomes.append((True, False))
+        self._evaluate()
+
+    def release(self):
+        """Give back a probe slot without an outcome (the caller went away, upstream said nothing)"""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` through the breaker, raising CircuitOpenError if it is open"""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit {self.state} - skipping upstream call")
+
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (client disconnected, hedge lost) - not upstream's fault
+            self.release()
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    def _evaluate(self):
+        calls = len(self._outcomes)
+        if self.state != CLOSED or calls < self.min_calls:
+            return
+        error_rate = sum(failed for failed, _ in self._outcomes) / calls
+        slow_rate = sum(slow for _, slow in self._outcomes) / calls
+        if error_rate >= self.error_rate_threshold or slow_rate >= self.slow_rate_threshold:
+            self._trip()
+
+    def _trip(self):
+        self.times_opened += 1
+        self.opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state != self.state:
+            print(f"Circuit breaker: {self.state} -> {state}")
+        self.state = state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+
+    def stats(self) -> dict:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "error_rate": round(sum(f for f, _ in self._outcomes) / calls, 3) if calls else 0.0,
+            "slow_rate": round(sum(s for _, s in self._outcomes) / calls, 3) if calls else 0.0,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
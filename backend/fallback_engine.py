@@ -0,0 +1,140 @@
+"""
+Table-driven fallback recommendation engine
+Serves rule-based recommendations when the AI is unconfigured, slow or failing.
+The catalog lives in data/fallback_careers.json (or YAML) and is compiled once
+into a keyword index, so each call only tokenizes the profile and does dict lookups.
+Result lists are shared per ranking, so their encoded JSON can be reused too.
+"""
+
+import heapq
+import json
+import os
+import re
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from fast_json import EncodedList
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "fallback_careers.json")
+
+# Interests are a stronger signal than skills the user already has
+INTEREST_WEIGHT = 1.0
+SKILL_WEIGHT = 0.5
+MAX_SCORE = 98
+# Distinct (score, entry) rankings kept; the catalog is small, so this rarely fills
+MAX_SHARED_RESULTS = 4096
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def load_catalog(path: str) -> List[dict]:
+    """Load catalog entries from a JSON or YAML file"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise RuntimeError("PyYAML is required to load a YAML fallback catalog") from e
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return data["careers"] if isinstance(data, dict) else data
+
+
+class FallbackEngine:
+    """Scores a profile against the fallback catalog using a precompiled keyword index"""
+
+    def __init__(self, catalog: Sequence[dict], factory: Callable, limit: int = 3):
+        self.limit = limit
+        self.entries = list(catalog)
+
+        # Keyword phrase (tuple of tokens) -> catalog indices containing it
+        self._index: Dict[Tuple[str, ...], List[int]] = {}
+        self._max_phrase_len = 1
+        for idx, entry in enumerate(self.entries):
+            for keyword in entry.get("keywords", []):
+                phrase = tuple(tokenize(keyword))
+                if not phrase:
+                    continue
+                self._index.setdefault(phrase, []).append(idx)
+                self._max_phrase_len = max(self._max_phrase_len, len(phrase))
+
+        # Response objects are built once; per-call results are cheap copies with a new score
+        self._templates = [
+            factory(
+                title=entry["title"],
+                match_score=entry.get("base_score", 70),
+                reason=entry["reason"],
+                required_skills=list(entry["required_skills"]),
+                average_salary=entry["average_salary"],
+                growth_outlook=entry["growth_outlook"],
+                learning_roadmap=list(entry["learning_roadmap"]),
+            )
+            for entry in self.entries
+        ]
+        self._defaults = [idx for idx, entry in enumerate(self.entries) if entry.get("default")]
+        self._results: Dict[Tuple[Tuple[int, int], ...], EncodedList] = {}
+
+    @classmethod
+    def from_file(cls, factory: Callable, path: str = None, limit: int = 3) -> "FallbackEngine":
+        """Build the engine from FALLBACK_CATALOG_PATH or the bundled catalog"""
+        path = path or os.getenv("FALLBACK_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+        return cls(load_catalog(path), factory, limit=limit)
+
+    def _match(self, texts: Sequence[str], weight: float, matched: Dict[Tuple[str, ...], float]):
+        """Record every catalog phrase found in `texts` with its (max) weight"""
+        for text in texts:
+            tokens = tokenize(text)
+            for start in range(len(tokens)):
+                for length in range(1, min(self._max_phrase_len, len(tokens) - start) + 1):
+                    phrase = tuple(tokens[start:start + length])
+                    if phrase in self._index and matched.get(phrase, 0.0) < weight:
+                        matched[phrase] = weight
+
+    def score(self, interests: Sequence[str], skills: Sequence[str]) -> List[Tuple[int, int]]:
+        """Return (score, catalog index) pairs for every matching entry, best first"""
+        matched: Dict[Tuple[str, ...], float] = {}
+        self._match(interests, INTEREST_WEIGHT, matched)
+        self._match(skills, SKILL_WEIGHT, matched)
+
+        weights: Dict[int, float] = {}
+        for phrase, weight in matched.items():
+            for idx in self._index[phrase]:
+                weights[idx] = weights.get(idx, 0.0) + weight
+
+        scored = []
+        for idx, weight in weights.items():
+            # One interest hit earns the base score; extra hits add a diminishing bonus
+            base = self.entries[idx].get("base_score", 70)
+            score = base - 10 + 10 * min(weight, 1.0) + 4 * max(weight - 1.0, 0.0)
+            scored.append((min(MAX_SCORE, round(score)), idx))
+
+        # Ties keep catalog order
+        return heapq.nlargest(self.limit, scored, key=lambda item: (item[0], -item[1]))
+
+    def recommend(self, interests: Sequence[str], skills: Sequence[str], defaults: bool = True) -> List:
+        """Top recommendations for the given interests and skills
+
+        With nothing matched, returns the catalog defaults (or [] if `defaults`
+        is False). The same ranking always returns the same (shared, read-only) list.
+        """
+        ranked = tuple(self.score(interests, skills))
+        if not ranked and not defaults:
+            return []
+        results = self._results.get(ranked)
+        if results is not None:
+            return results
+        if not ranked:
+            results = EncodedList(self._templates[idx] for idx in self._defaults[:self.limit])
+        else:
+            results = EncodedList(
+                self._templates[idx].model_copy(update={"match_score": score})
+                for score, idx in ranked
+            )
+        if len(self._results) >= MAX_SHARED_RESULTS:
+            self._results.clear()
+        self._results[ranked] = results
+        return results
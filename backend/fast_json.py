@@ -0,0 +1,101 @@
+"""
+Fast JSON response path (opt-in with FAST_JSON_RESPONSES=1)
+FastAPI validates every returned object against the route's response_model and
+then encodes it with the stdlib json module. For objects this service built and
+validated itself that work is redundant: routes on the fast path return
+pre-encoded bytes instead (pydantic-core for models, orjson for plain data when
+installed). Snapshot-backed and shared fallback payloads are encoded once and
+the bytes reused until the data changes.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # Optional - the stdlib encoder is the fallback
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON_RESPONSES", "0").lower() in ("1", "true", "yes", "on")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (stdlib fallback) - the app default on the fast path"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(Response):
+    """Body is already-encoded JSON bytes; no validation or serialization happens here"""
+    media_type = "application/json"
+
+
+class EncodedList(list):
+    """A result list shared across responses (never mutated) that remembers its JSON encoding"""
+
+    __slots__ = ("body",)
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.body: Optional[bytes] = None
+
+
+def encode_list(adapter, items: list) -> bytes:
+    """Encode a list of models with its TypeAdapter; shared EncodedLists are encoded only once"""
+    body = getattr(items, "body", None)
+    if body is not None:
+        return body
+    body = adapter.dump_json(items)
+    if isinstance(items, EncodedList):
+        items.body = body
+    return body
+
+
+class EncodedBodies:
+    """Encoded response bodies for one data version (e.g. a market snapshot), LRU-bounded
+
+    A new version drops every stored body, so nothing stale is ever served.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.version: Optional[str] = None
+        self._bodies: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: str, key: Hashable, build: Callable[[], Any]) -> bytes:
+        if version != self.version:
+            self._bodies.clear()
+            self.version = version
+        body = self._bodies.get(key)
+        if body is not None:
+            self.hits += 1
+            self._bodies.move_to_end(key)
+            return body
+        self.misses += 1
+        body = self._bodies[key] = dumps(build())
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
+        return body
+
+    def stats(self) -> dict:
+        return {
+            "enabled": FAST_JSON,
+            "encoder": "orjson" if orjson is not None else "json",
+            "bodies": len(self._bodies),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for multi-worker deployments
+Start with:  gunicorn main:app -c gunicorn.conf.py
+
+Each worker is a uvicorn event loop with its own advisor; caches, chat
+sessions, rate-limit buckets and the market snapshot default to shared SQLite
+files under cache/ whenever WEB_CONCURRENCY > 1 (see rec_cache.default_backend).
+"""
+
+import os
+import shutil
+
+# WEB_CONCURRENCY is also what Render and the shared-store defaults read
+workers = int(os.environ.setdefault("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Worker heartbeat timeout - keep it well above the warm-up time reported by /ready
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Metrics from all workers are merged at scrape time via this directory
+PROMETHEUS_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/career-guidance-metrics")
+
+
+def on_starting(server):
+    # Stale files from a previous run would be summed into the new counters
+    shutil.rmtree(PROMETHEUS_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,186 @@
+"""
+Shared HTTP connection pool for upstream (OpenRouter) calls
+One long-lived AsyncClient per process, opened and closed by the app lifespan,
+so requests reuse warm TCP+TLS connections instead of handshaking every time
+"""
+
+import importlib.util
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+class _ConnectionTracker:
+    """httpcore trace hook: notices new connections and when response headers arrived"""
+
+    def __init__(self):
+        self.opened = False
+        self.started = time.perf_counter()
+        self.ttfb: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.started":
+            self.opened = True
+        elif event_name.endswith("receive_response_headers.complete") and self.ttfb is None:
+            self.ttfb = time.perf_counter() - self.started
+
+    def extensions(self, extensions: Optional[dict]) -> dict:
+        extensions = dict(extensions or {})
+        extensions["trace"] = self
+        return extensions
+
+
+class UpstreamHTTPClient:
+    """Pooled AsyncClient with per-phase timeouts and connection reuse metrics"""
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = True,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        write_timeout: float = 10.0,
+        pool_timeout: float = 5.0,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("HTTP/2 requested but 'h2' is not installed - falling back to HTTP/1.1")
+            http2 = False
+
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Connection reuse metrics
+        self.requests = 0
+        self.new_connections = 0
+        self.pool_hits = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "UpstreamHTTPClient":
+        """Build a client from UPSTREAM_* environment variables"""
+        return cls(
+            max_connections=_env_int("UPSTREAM_MAX_CONNECTIONS", 20),
+            max_keepalive_connections=_env_int("UPSTREAM_MAX_KEEPALIVE", 10),
+            keepalive_expiry=_env_float("UPSTREAM_KEEPALIVE_EXPIRY", 60.0),
+            http2=_env_bool("UPSTREAM_HTTP2", True),
+            connect_timeout=_env_float("UPSTREAM_CONNECT_TIMEOUT", 5.0),
+            read_timeout=_env_float("UPSTREAM_READ_TIMEOUT", 30.0),
+            write_timeout=_env_float("UPSTREAM_WRITE_TIMEOUT", 10.0),
+            pool_timeout=_env_float("UPSTREAM_POOL_TIMEOUT", 5.0),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+        return self._client
+
+    async def start(self):
+        """Open the pool (called from the app lifespan)"""
+        _ = self.client
+
+    async def prewarm(self, url: str, headers: Optional[dict] = None) -> bool:
+        """Open a pooled connection to the url's origin before traffic arrives (TCP + TLS + HTTP/2)
+
+        Any HTTP response counts - even a 404/405 leaves the connection in the pool.
+        """
+        tracker = _ConnectionTracker()
+        try:
+            await self.client.request(
+                "HEAD", url, headers=headers, extensions=tracker.extensions(None),
+                timeout=self.timeout.connect + self.timeout.read / 10,
+            )
+        except Exception as e:
+            print(f"Upstream prewarm failed ({url}): {e}")
+            return False
+        self._record(tracker)
+        return True
+
+    async def aclose(self):
+        """Close the pool and drop all keep-alive connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the shared pool (response.extensions["ttfb"] = seconds to response headers)"""
+        tracker = _ConnectionTracker()
+        kwargs["extensions"] = tracker.extensions(kwargs.get("extensions"))
+
+        self.requests += 1
+        try:
+            response = await self.client.post(url, **kwargs)
+            response.extensions["ttfb"] = tracker.ttfb
+            return response
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._record(tracker)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Streaming request through the shared pool (body is read by the caller)"""
+        tracker = _ConnectionTracker()
+        kwargs["extensions"] = tracker.extensions(kwargs.get("extensions"))
+
+        self.requests += 1
+        try:
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._record(tracker)
+
+    def _record(self, tracker: "_ConnectionTracker"):
+        if tracker.opened:
+            self.new_connections += 1
+        else:
+            self.pool_hits += 1
+
+    def stats(self) -> dict:
+        """Connection pool counters for the health endpoint"""
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "pool_hits": self.pool_hits,
+            "errors": self.errors,
+        }
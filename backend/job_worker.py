@@ -0,0 +1,47 @@
+"""
+Standalone job consumer for the SQLite job queue
+Runs analysis jobs in its own process, so the web workers only enqueue and poll.
+Start the web app with JOB_BACKEND=sqlite JOB_WORKERS=0 and, with the same
+JOB_QUEUE_PATH and OpenRouter settings:
+
+    python job_worker.py --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+
+
+async def consume(workers: int):
+    # Imported here so --help works without building the app
+    from main import advisor, job_pool, market_store
+    from jobs import SQLiteJobQueue
+
+    if not isinstance(job_pool.queue, SQLiteJobQueue):
+        raise SystemExit("job_worker needs the shared queue: set JOB_BACKEND=sqlite (and JOB_QUEUE_PATH)")
+
+    job_pool.workers = workers
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+
+    await advisor.http.start()
+    await market_store.start()
+    await job_pool.start()
+    print(f"Consuming jobs from {job_pool.queue.path} with {workers} workers")
+    try:
+        await stopping.wait()
+    finally:
+        # Jobs in flight go back to the queue for the next consumer
+        await job_pool.stop()
+        await market_store.stop()
+        await advisor.http.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_CONSUMER_WORKERS", 4)))
+    args = parser.parse_args()
+    asyncio.run(consume(args.workers))
@@ -0,0 +1,502 @@
+"""
+Async profile-analysis jobs
+POST /api/jobs answers at once with a job id; a pool of asyncio workers runs
+the analysis in priority order with retries, and clients poll the job (or get
+a webhook) when it finishes - request latency no longer waits on the model.
+With the SQLite queue, jobs survive restarts and can be consumed by a separate
+process (python job_worker.py) while the web workers only enqueue.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from admission import OverloadedError
+from rec_cache import SQLiteBackend, default_backend, run_blocking
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+STATUSES = ("queued", "running", "completed", "failed")
+TERMINAL = ("completed", "failed")
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+def _describe(error: BaseException) -> str:
+    return str(error) or type(error).__name__
+
+
+def _pin(url: str, address: str) -> Tuple[str, dict, dict]:
+    """(url, headers, extensions) that connect to `address` but still present the original host
+
+    Host header and TLS SNI/certificate check keep the hostname, so the server
+    sees an ordinary request - but no second DNS lookup can swap the address.
+    """
+    parts = urlsplit(url)
+    userinfo, at, hostport = parts.netloc.rpartition("@")
+    host = f"[{address}]" if ":" in address else address
+    netloc = userinfo + at + (f"{host}:{parts.port}" if parts.port else host)
+    return parts._replace(netloc=netloc).geturl(), {"Host": hostport}, {"sni_hostname": parts.hostname}
+
+
+class Job:
+    """One profile analysis and its outcome (wall-clock timestamps, comparable across processes)"""
+
+    def __init__(self, job_id: str, profile: dict, priority: int = PRIORITIES["normal"],
+                 webhook_url: Optional[str] = None, max_attempts: int = 3, status: str = "queued",
+                 attempts: int = 0, created_at: Optional[float] = None, started_at: Optional[float] = None,
+                 finished_at: Optional[float] = None, not_before: float = 0.0,
+                 result: Optional[List[dict]] = None, error: Optional[str] = None,
+                 webhook_status: Optional[str] = None):
+        self.job_id = job_id
+        self.profile = profile
+        self.priority = priority
+        self.webhook_url = webhook_url
+        self.max_attempts = max_attempts
+        self.status = status
+        self.attempts = attempts
+        self.created_at = created_at or time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.not_before = not_before    # Retry backoff: not claimable before this time
+        self.result = result
+        self.error = error
+        self.webhook_status = webhook_status
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL
+
+    def finish(self, status: str, result: Optional[List[dict]] = None, error: Optional[str] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+
+    def public(self) -> dict:
+        """API view of the job (the submitted profile is not echoed back)"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "priority": PRIORITY_NAMES.get(self.priority, "normal"),
+            "attempts": self.attempts,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "result": self.result,
+            "error": self.error,
+            "webhook_status": self.webhook_status,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Job":
+        return cls(**json.loads(raw))
+
+
+# --- Queue backends ---
+
+class MemoryJobQueue:
+    """Per-process queue: a priority heap over an id -> job map (jobs are lost on restart)"""
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._heap: List[tuple] = []
+        self._order = itertools.count()
+
+    def submit(self, job: Job):
+        self._jobs[job.job_id] = job
+        heapq.heappush(self._heap, (job.priority, next(self._order), job.job_id))
+
+    def claim(self, now: float, lease: float) -> Optional[Job]:
+        """Highest-priority queued job that is due, marked running (oldest first within a priority)"""
+        deferred = []
+        claimed = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            job = self._jobs.get(entry[2])
+            if job is None or job.status != "queued":
+                continue
+            if job.not_before > now:
+                deferred.append(entry)
+                continue
+            claimed = job
+            break
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+        if claimed is not None:
+            claimed.status = "running"
+            claimed.attempts += 1
+            claimed.started_at = now
+        return claimed
+
+    def update(self, job: Job):
+        self._jobs[job.job_id] = job
+        if job.status == "queued":
+            heapq.heappush(self._heap, (job.priority, next(self._order), job.job_id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATUSES, 0)
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def purge(self, now: float, result_ttl: float) -> int:
+        """Drop finished jobs older than the result TTL"""
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.done and job.finished_at < now - result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class SQLiteJobQueue(SQLiteBackend):
+    """Durable queue shared by every process on the host; claims are leased
+
+    A job whose lease runs out while "running" (its consumer died) is requeued by purge().
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, not_before REAL NOT NULL, lease_until REAL,"
+            " finished_at REAL, job TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority, created_at)")
+
+    def _write(self, job: Job, lease_until: Optional[float] = None):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, priority, created_at, not_before, lease_until, finished_at, job)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.job_id, job.status, job.priority, job.created_at, job.not_before, lease_until,
+             job.finished_at, job.to_json()),
+        )
+
+    def submit(self, job: Job):
+        self._write(job)
+
+    def claim(self, now: float, lease: float) -> Optional[Job]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT job FROM jobs WHERE status = 'queued' AND not_before <= ?"
+                " ORDER BY priority, created_at LIMIT 1", (now,)
+            ).fetchone()
+            job = None
+            if row is not None:
+                job = Job.from_json(row[0])
+                job.status = "running"
+                job.attempts += 1
+                job.started_at = now
+                self._write(job, lease_until=now + lease)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return job
+
+    def update(self, job: Job):
+        self._write(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._conn.execute("SELECT job FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_json(row[0]) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return counts
+
+    def purge(self, now: float, result_ttl: float) -> int:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (raw,) in self._conn.execute(
+                "SELECT job FROM jobs WHERE status = 'running' AND lease_until < ?", (now,)
+            ).fetchall():
+                job = Job.from_json(raw)
+                job.status = "queued"
+                self._write(job)
+            removed = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?", (now - result_ttl,)
+            ).rowcount
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return removed
+
+
+# --- Worker pool ---
+
+class JobWorkerPool:
+    """Runs queued jobs on `workers` asyncio tasks, with retries, result TTL and webhooks
+
+    `analyze(profile)` returns recommendation models and raises on upstream
+    failures; those are retried with exponential backoff, and once every attempt
+    has failed the job completes with `fallback(profile, reason)` and an error note.
+    """
+
+    def __init__(
+        self,
+        queue,
+        analyze: Callable[[dict], Awaitable[Sequence]],
+        fallback: Callable[[dict, str], Sequence],
+        workers: int = 2,
+        max_queued: int = 1000,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        job_timeout: float = 60.0,
+        result_ttl: float = 3600.0,
+        poll_interval: float = 0.5,
+        webhook_timeout: float = 5.0,
+        webhook_secret: str = "",
+        webhook_hosts: Sequence[str] = (),
+    ):
+        self.queue = queue
+        self.analyze = analyze
+        self.fallback = fallback
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.job_timeout = job_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self.webhook_secret = webhook_secret
+        self.webhook_hosts = {host.lower() for host in webhook_hosts}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._webhooks: Optional[httpx.AsyncClient] = None
+        self.submitted = 0
+        self.processed = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.webhooks_delivered = 0
+        self.webhooks_failed = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    @classmethod
+    def from_env(cls, analyze, fallback) -> "JobWorkerPool":
+        """Build from JOB_* environment variables (JOB_WORKERS=0: enqueue only, for an external consumer)"""
+        if os.getenv("JOB_BACKEND", default_backend()).lower() == "sqlite":
+            queue = SQLiteJobQueue(os.getenv("JOB_QUEUE_PATH", "cache/jobs.db"))
+        else:
+            queue = MemoryJobQueue()
+        hosts = [host.strip() for host in os.getenv("JOB_WEBHOOK_HOSTS", "").split(",") if host.strip()]
+        return cls(
+            queue, analyze, fallback,
+            workers=int(os.getenv("JOB_WORKERS", 2)),
+            max_queued=int(os.getenv("JOB_MAX_QUEUED", 1000)),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+            retry_backoff=float(os.getenv("JOB_RETRY_BACKOFF", 2.0)),
+            job_timeout=float(os.getenv("JOB_TIMEOUT", 60.0)),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL", 3600)),
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", 0.5)),
+            webhook_timeout=float(os.getenv("JOB_WEBHOOK_TIMEOUT", 5.0)),
+            webhook_secret=os.getenv("JOB_WEBHOOK_SECRET", ""),
+            webhook_hosts=hosts,
+        )
+
+    # --- Client side ---
+
+    async def check_webhook(self, url: str) -> Optional[str]:
+        """Raise ValueError unless job results may be POSTed to this URL
+
+        It must be http(s). With JOB_WEBHOOK_HOSTS set, only those hosts are
+        accepted; otherwise every address the host resolves to must be public -
+        no loopback, private, link-local (cloud metadata) or reserved ranges.
+        Returns the checked address to connect to (None for allow-listed hosts).
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("webhook_url must be an absolute http(s) URL")
+        host = parts.hostname.lower()
+        if self.webhook_hosts:
+            if host not in self.webhook_hosts:
+                raise ValueError(f"webhook host {host} is not allowed")
+            return None
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, parts.port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM
+            )
+        except socket.gaierror:
+            raise ValueError(f"webhook host {host} does not resolve")
+        for info in infos:
+            address = ipaddress.ip_address(info[4][0].split("%")[0])
+            if address.version == 6 and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global:
+                raise ValueError(f"webhook host {host} resolves to a non-public address")
+        return infos[0][4][0].split("%")[0]
+
+    async def submit(self, profile: dict, priority: str = "normal", webhook_url: Optional[str] = None) -> Job:
+        """Enqueue a job (OverloadedError once max_queued jobs are waiting)"""
+        if webhook_url:
+            await self.check_webhook(webhook_url)
+        queued = (await run_blocking(self.queue, "counts"))["queued"]
+        if queued >= self.max_queued:
+            raise OverloadedError(f"{queued} jobs already queued", retry_after=max(1, int(self.job_timeout)))
+        job = Job(uuid.uuid4().hex, profile, PRIORITIES[priority], webhook_url, max_attempts=self.max_attempts)
+        await run_blocking(self.queue, "submit", job)
+        self.submitted += 1
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await run_blocking(self.queue, "get", job_id)
+
+    # --- Workers ---
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._webhooks = httpx.AsyncClient(timeout=self.webhook_timeout)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._webhooks is not None:
+            await self._webhooks.aclose()
+            self._webhooks = None
+
+    async def _worker(self):
+        while True:
+            # Cleared before claiming, so a submit in between still wakes us
+            self._wakeup.clear()
+            job = await run_blocking(self.queue, "claim", time.time(), self.job_timeout + 30)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _purge_loop(self):
+        while True:
+            try:
+                await run_blocking(self.queue, "purge", time.time(), self.result_ttl)
+            except Exception as e:
+                print(f"Job purge error: {e}")
+            await asyncio.sleep(max(self.poll_interval, 30.0))
+
+    async def _run(self, job: Job):
+        if job.attempts == 1:
+            self.total_wait_ms += (job.started_at - job.created_at) * 1000
+        start = time.monotonic()
+        try:
+            recommendations = await asyncio.wait_for(self.analyze(job.profile), self.job_timeout)
+            job.finish("completed", result=[rec.model_dump() for rec in recommendations])
+        except asyncio.CancelledError:
+            # Shutting down - hand the job back without spending an attempt (synchronously:
+            # this task is being cancelled)
+            job.status = "queued"
+            job.attempts -= 1
+            self.queue.update(job)
+            raise
+        except Exception as e:
+            if job.attempts < job.max_attempts:
+                self.retries += 1
+                job.status = "queued"
+                job.error = f"Attempt {job.attempts} failed: {_describe(e)}"
+                job.not_before = time.time() + self.retry_backoff * 2 ** (job.attempts - 1)
+                await run_blocking(self.queue, "update", job)
+                return
+            try:
+                self.fallbacks += 1
+                recommendations = self.fallback(job.profile, "job_failed")
+                job.finish("completed", result=[rec.model_dump() for rec in recommendations],
+                           error=f"Failed after {job.attempts} attempts ({_describe(e)}) - "
+                                 "fallback recommendations returned")
+            except Exception as fallback_error:
+                job.finish("failed", error=f"Failed after {job.attempts} attempts: {_describe(fallback_error)}")
+        finally:
+            self.total_run_ms += (time.monotonic() - start) * 1000
+
+        self.processed += 1
+        await run_blocking(self.queue, "update", job)
+        if job.webhook_url:
+            await self._notify(job)
+            await run_blocking(self.queue, "update", job)
+
+    async def _notify(self, job: Job, attempts: int = 3):
+        """POST the finished job to its webhook; the body is HMAC-signed when JOB_WEBHOOK_SECRET is set"""
+        body = json.dumps(job.public()).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Job-Id": job.job_id}
+        if self.webhook_secret:
+            digest = hmac.new(self.webhook_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Job-Signature"] = f"sha256={digest}"
+        error = None
+        for attempt in range(attempts):
+            try:
+                # Checked again at delivery: DNS may have changed since the job was submitted
+                address = await self.check_webhook(job.webhook_url)
+            except ValueError as e:
+                error = str(e)
+                break
+            url, extensions = job.webhook_url, {}
+            if address is not None:
+                # Connect to the address just checked - resolving again would reopen DNS rebinding
+                url, host, extensions = _pin(url, address)
+                headers.update(host)
+            try:
+                response = await self._webhooks.post(url, content=body, headers=headers, extensions=extensions)
+                if response.status_code < 300:
+                    job.webhook_status = "delivered"
+                    self.webhooks_delivered += 1
+                    return
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = _describe(e)
+            await asyncio.sleep(0.5 * 2 ** attempt)
+        job.webhook_status = f"failed: {error}"
+        self.webhooks_failed += 1
+
+    def stats(self) -> dict:
+        processed = self.processed or 1
+        return {
+            "backend": type(self.queue).__name__,
+            "workers": self.workers if self._tasks else 0,
+            **self.queue.counts(),
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "retries": self.retries,
+            "fallbacks": self.fallbacks,
+            "webhooks_delivered": self.webhooks_delivered,
+            "webhooks_failed": self.webhooks_failed,
+            "avg_queue_wait_ms": round(self.total_wait_ms / processed, 1),
+            "avg_run_ms": round(self.total_run_ms / processed, 1),
+        }
@@ -0,0 +1,236 @@
+"""
+JSON helpers for model output
+Incremental parsing of a streamed JSON array, so each element can be used as
+soon as its closing brace arrives instead of waiting for the whole completion.
+The same single pass tolerates the usual model defects: prose and code fences
+around the array, trailing commas, and a completion cut off mid-element.
+"""
+
+import json
+import re
+from typing import List, NamedTuple, Sequence, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+_CLOSERS = {"{": "}", "[": "]"}
+# Same start rule as the parser: "[" followed by an object or the end of the array
+_ARRAY_START = re.compile(r"\[\s*[{\]]")
+_decoder = json.JSONDecoder()
+
+
+def _closing(stack: Sequence[str]) -> str:
+    return "".join(_CLOSERS[bracket] for bracket in reversed(stack))
+
+
+class IncrementalArrayParser:
+    """Feed text chunks of a JSON array, get back each complete top-level object
+
+    Anything before the opening `[` (prose, code fences) is skipped - a `[` only
+    opens the array when the next non-space character is `{` or `]`, so "[1]" or
+    "[Note]" in leading prose is ignored. Only the current element is buffered,
+    and each character is scanned exactly once.
+    """
+
+    def __init__(self):
+        self._state = "scan"    # scan -> open (saw "[") -> array -> done
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._element: List[str] = []
+        # (buffer length, open brackets) at each comma - where a truncated element can be cut
+        self._cuts: List[Tuple[int, Tuple[str, ...]]] = []
+        self.repairs = 0
+        self.malformed = 0
+        self.truncated = False
+
+    @property
+    def started(self) -> bool:
+        return self._state in ("array", "done")
+
+    @property
+    def finished(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk and return the objects it completed (possibly none)"""
+        completed = []
+        for char in chunk:
+            if self._state == "done":
+                break
+
+            if self._state == "scan":
+                if char == "[":
+                    self._state = "open"
+                continue
+
+            if self._state == "open":
+                if char == "{":
+                    self._state = "array"
+                elif char == "]":
+                    self._state = "done"
+                    continue
+                elif char == "[" or char.isspace():
+                    continue
+                else:
+                    self._state = "scan"
+                    continue
+
+            if not self._stack:
+                # Between elements: only an object opens a new element
+                if char == "{":
+                    self._stack = ["{"]
+                    self._element = [char]
+                    self._cuts = []
+                elif char == "]":
+                    self._state = "done"
+                continue
+
+            if self._in_string:
+                self._element.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._element.append(char)
+                self._in_string = True
+            elif char in "{[":
+                self._element.append(char)
+                self._stack.append(char)
+            elif char in "}]":
+                self._drop_trailing_comma()
+                self._element.append(char)
+                self._stack.pop()
+                if not self._stack:
+                    obj = self._load("".join(self._element))
+                    self._element = []
+                    if obj is not None:
+                        completed.append(obj)
+            elif char == ",":
+                self._cuts.append((len(self._element), tuple(self._stack)))
+                self._element.append(char)
+            else:
+                self._element.append(char)
+        return completed
+
+    def close(self) -> List[dict]:
+        """End of input: salvage a truncated final element, cut back to its last complete value"""
+        if self._state != "array" or not self._stack:
+            return []
+        self._state = "done"
+        self.truncated = True
+
+        text = "".join(self._element)
+        candidates = []
+        if not self._in_string:
+            candidates.append(text.rstrip().rstrip(",:").rstrip() + _closing(self._stack))
+        candidates.extend(text[:length] + _closing(stack) for length, stack in reversed(self._cuts))
+        for candidate in candidates:
+            try:
+                obj = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(obj, dict):
+                self.repairs += 1
+                return [obj]
+        self.malformed += 1
+        return []
+
+    def _drop_trailing_comma(self):
+        """Remove a dangling comma before a closing bracket ("[1, 2,]" / '{"a": 1,}')"""
+        i = len(self._element) - 1
+        while i >= 0 and self._element[i].isspace():
+            i -= 1
+        if i >= 0 and self._element[i] == ",":
+            del self._element[i:]
+            if self._cuts and self._cuts[-1][0] == i:
+                self._cuts.pop()
+            self.repairs += 1
+
+    def _load(self, text: str):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            self.malformed += 1
+            print(f"Stream parse error: {e}")
+            return None
+
+
+class ExtractedArray(NamedTuple):
+    items: List[dict]
+    found: bool       # An array opening was located at all
+    repairs: int      # Trailing commas removed + truncated elements salvaged
+    malformed: int    # Elements that could not be parsed even after repair
+    truncated: bool   # Input ended inside the array
+
+
+def extract_array(text: str) -> ExtractedArray:
+    """Single pass over a complete model response: the objects of its JSON array
+
+    Well-formed arrays are decoded by the C parser straight from their opening
+    bracket (trailing prose is ignored); only defective ones take the repairing scan.
+    """
+    match = _ARRAY_START.search(text)
+    if match is None:
+        return ExtractedArray([], False, 0, 0, False)
+    try:
+        value, _ = _decoder.raw_decode(text, match.start())
+        return ExtractedArray([item for item in value if isinstance(item, dict)], True, 0, 0, False)
+    except json.JSONDecodeError:
+        pass
+
+    parser = IncrementalArrayParser()
+    items = parser.feed(text[match.start():])
+    if not parser.finished:
+        items += parser.close()
+    return ExtractedArray(items, parser.started, parser.repairs, parser.malformed, parser.truncated)
+
+
+def validate_items(adapter: TypeAdapter, items: List[dict]) -> Tuple[list, int]:
+    """Validate a list in one call; on errors drop only the offending items. Returns (valid, dropped)"""
+    try:
+        return adapter.validate_python(items), 0
+    except ValidationError as e:
+        bad = {error["loc"][0] for error in e.errors() if error["loc"]}
+        keep = [item for index, item in enumerate(items) if index not in bad]
+        return adapter.validate_python(keep), len(items) - len(keep)
+
+
+class JSONParseStats:
+    """Running counts of how model output parsed"""
+
+    def __init__(self):
+        self.responses = 0
+        self.clean = 0
+        self.repaired = 0
+        self.truncated = 0
+        self.failed = 0
+        self.items = 0
+        self.items_dropped = 0
+
+    def record(self, extracted, valid: int, dropped: int):
+        """Count one response (`extracted` is an ExtractedArray or a closed IncrementalArrayParser)"""
+        self.responses += 1
+        self.items += valid
+        self.items_dropped += dropped + extracted.malformed
+        self.truncated += extracted.truncated
+        if not valid:
+            self.failed += 1
+        elif extracted.repairs or extracted.malformed or dropped:
+            self.repaired += 1
+        else:
+            self.clean += 1
+
+    def stats(self) -> dict:
+        return {
+            "responses": self.responses,
+            "clean": self.clean,
+            "repaired": self.repaired,
+            "truncated": self.truncated,
+            "failed": self.failed,
+            "items": self.items,
+            "items_dropped": self.items_dropped,
+            "failure_rate": round(self.failed / self.responses, 3) if self.responses else 0.0,
+        }
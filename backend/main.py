@@ -4,16 +4,76 @@ Simple, stable, production-ready API
 Optimized for Render deployment with OpenRouter API
 """
 
-from fastapi import FastAPI, HTTPException
+# First import, so the reported startup time covers loading everything below
+from warmup import Warmup
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from contextlib import asynccontextmanager
 import os
+import hashlib
+import asyncio
 import json
+import time
 from datetime import datetime
+
 import httpx
 
-app = FastAPI(title="Career Guidance AI Assistant")
+from admission import AdmissionController, OverloadedError, RateLimiter
+from archetypes import ArchetypeStore
+from batch import (
+    BATCH_CONCURRENCY, BATCH_ITEM_TIMEOUT, BATCH_MAX_CONCURRENCY, BATCH_MAX_PROFILES,
+    analyze_batch, group_profiles
+)
+from career_index import CareerIndex
+from chat_sessions import ChatSession, ChatSessionStore
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from fallback_engine import FallbackEngine
+from fast_json import FAST_JSON, EncodedBodies, EncodedJSONResponse, FastJSONResponse, dumps, encode_list
+from http_pool import UpstreamHTTPClient
+from jobs import JobWorkerPool
+from market_data import MarketDataStore
+from metrics import (
+    MetricsMiddleware, observe_stage, record_fallback, record_upstream, register_stats,
+    render_metrics, setup_tracing, shutdown_tracing, stage
+)
+from model_router import ModelRoute, ModelRouter
+from prompts import PromptBuilder, TokenUsageStats, estimate_message_tokens
+from role_index import RoleIndex
+from llm_json import IncrementalArrayParser, JSONParseStats, extract_array, validate_items
+from rec_cache import RecommendationCache, personalize, profile_cache_key
+from singleflight import SingleFlight
+from skill_graph import SkillGapEngine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream connections and warm up before taking traffic; tear down on shutdown"""
+    setup_tracing()
+    await advisor.http.start()
+    await warmup.run({
+        "market_data": market_store.start,
+        "upstream_pool": _prewarm_upstream,
+        "indexes": _warm_indexes,
+    })
+    await job_pool.start()
+    await advisor.archetypes.start()
+    yield
+    warmup.ready = False
+    await advisor.archetypes.stop()
+    await job_pool.stop()
+    await market_store.stop()
+    await advisor.http.aclose()
+    shutdown_tracing()
+
+app = FastAPI(
+    title="Career Guidance AI Assistant",
+    lifespan=lifespan,
+    # FAST_JSON_RESPONSES=1: orjson rendering for plain payloads (routes below skip re-validation too)
+    default_response_class=FastJSONResponse if FAST_JSON else JSONResponse
+)
 
 # CORS middleware for frontend communication
 app.add_middleware(
@@ -24,6 +84,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Route latency histograms (and request spans when tracing is enabled)
+app.add_middleware(MetricsMiddleware)
+
 # --- Data Models ---
 
 class UserProfile(BaseModel):
@@ -47,16 +110,95 @@ class CareerRecommendation(BaseModel):
     growth_outlook: str
     learning_roadmap: List[str]
 
+# Validates a whole parsed model response in one call
+RecommendationList = TypeAdapter(List[CareerRecommendation])
+
 class ChatMessage(BaseModel):
     """Chat message from user"""
     message: str
     profile: Optional[UserProfile] = None
+    session_id: Optional[str] = None  # Returned by the first turn; send it back to continue the conversation
 
 class ChatResponse(BaseModel):
     """AI response"""
     message: str
     recommendations: Optional[List[CareerRecommendation]] = None
     timestamp: str
+    session_id: Optional[str] = None
+
+class BatchAnalysisRequest(BaseModel):
+    """Many profiles to analyze in one call (e.g. a career fair upload)"""
+    profiles: List[UserProfile]
+    concurrency: Optional[int] = None  # Defaults to BATCH_CONCURRENCY
+    item_timeout: Optional[float] = None  # Seconds per profile, defaults to BATCH_ITEM_TIMEOUT
+
+class BatchItemResult(BaseModel):
+    """Result for one profile of a batch"""
+    index: int
+    name: str
+    recommendations: List[CareerRecommendation]
+    error: Optional[str] = None  # Set when fallback recommendations were used for this item
+    elapsed_ms: float
+
+class BatchAnalysisResponse(BaseModel):
+    """All batch results, in input order"""
+    results: List[BatchItemResult]
+    total: int
+    unique_profiles: int
+    timestamp: str
+
+class JobRequest(BaseModel):
+    """Profile to analyze in the background"""
+    profile: UserProfile
+    priority: Literal["high", "normal", "low"] = "normal"
+    webhook_url: Optional[str] = None  # POSTed the finished job (see JOB_WEBHOOK_* settings)
+
+class JobStatus(BaseModel):
+    """State of a background analysis; `result` is set once it has completed"""
+    job_id: str
+    status: str  # queued, running, completed or failed
+    priority: str
+    attempts: int
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[List[CareerRecommendation]] = None
+    error: Optional[str] = None  # Last retry reason, or why fallback recommendations were used
+    webhook_status: Optional[str] = None
+
+class SkillTarget(BaseModel):
+    """A career to measure against - recommendations from /api/analyze-profile can be sent as-is"""
+    title: str
+    required_skills: List[str]
+
+class SkillGapRequest(BaseModel):
+    """Profile to compare against catalog careers (all of them unless `careers` names some) or `targets`"""
+    profile: UserProfile
+    careers: Optional[List[str]] = None
+    targets: Optional[List[SkillTarget]] = None
+    top: int = 5  # Best-covered catalog careers returned when neither list is given
+
+class RoadmapStep(BaseModel):
+    """One skill to learn; its prerequisites still to learn come in earlier steps"""
+    step: int
+    skill: str
+    prerequisites: List[str]
+
+class CareerSkillGap(BaseModel):
+    """How a profile's skills cover one career"""
+    title: str
+    coverage: int  # 0-100, share of the required skills the profile has
+    matched_skills: List[str]
+    missing_skills: List[str]
+    roadmap: List[RoadmapStep]
+
+class SkillGapResponse(BaseModel):
+    """Skill-gap analysis of one profile"""
+    recognized_skills: List[str]
+    implied_skills: List[str]  # Prerequisites of recognized skills, counted as known
+    unrecognized_skills: List[str]
+    careers: List[CareerSkillGap]
+    timestamp: str
 
 # --- Real-Time Market Data Fetcher ---
 
@@ -65,282 +207,529 @@ class MarketDataFetcher:
 
     @staticmethod
     async def get_trending_skills(industry: str = "technology") -> List[str]:
-        """Get trending skills from GitHub and tech communities"""
-        # In a production system, this would call real APIs
-        # For MVP: Using curated data that reflects current market (Feb 2025)
-        trending_by_industry = {
-            "technology": [
-                "Python", "JavaScript", "React", "Node.js", "AWS",
-                "Docker", "Kubernetes", "AI/ML", "Data Science",
-                "DevOps", "Cloud Computing", "Cybersecurity"
-            ],
-            "data": [
-                "Python", "SQL", "Tableau", "Power BI", "Excel",
-                "Machine Learning", "Statistics", "R", "Big Data",
-                "Apache Spark", "ETL", "Data Warehousing"
-            ],
-            "design": [
-                "Figma", "Adobe XD", "UI/UX Design", "Prototyping",
-                "User Research", "Wireframing", "Design Systems",
-                "Accessibility", "Motion Design", "Sketch"
-            ],
-            "business": [
-                "Data Analysis", "Excel", "Project Management",
-                "Agile", "Scrum", "Communication", "Leadership",
-                "Strategy", "Finance", "Marketing Analytics"
-            ]
-        }
-        return trending_by_industry.get(industry.lower(), trending_by_industry["technology"])
+        """Get trending skills from the current market snapshot"""
+        # Aggregated from job-posting datasets (market_data.py), curated lists otherwise
+        return market_store.snapshot.trending_skills(industry)
 
     @staticmethod
     async def get_job_market_data(role: str) -> dict:
         """Get job market insights for a specific role"""
-        # Real-time simulation - in production, integrate with:
-        # - LinkedIn API
-        # - Indeed API
-        # - Glassdoor API
-        # - GitHub Jobs
-
-        market_data = {
-            "demand": "High",
-            "salary_range": "$60,000 - $120,000",
-            "growth_rate": "15% (Above Average)",
-            "open_positions": "50,000+",
-            "competition": "Moderate",
-            "remote_availability": "High"
-        }
-        return market_data
+        return market_store.snapshot.role_data(role)
+
+# Canonical job-title taxonomy - resolves "Sr. Data Analyst" / "data-analyst" to one role
+role_index = RoleIndex.from_file()
+
+# Snapshot of job-posting datasets, refreshed in the background by the app lifespan
+market_store = MarketDataStore.from_env(resolve_role=role_index.canonical_key)
 
 # --- AI Career Advisor ---
 
+GREETING = "Hello! I'm your AI Career Guidance Assistant. To provide personalized career recommendations, please share your profile including your interests, skills, and career goals."
+
 class CareerAdvisor:
     """AI-powered career guidance using OpenRouter API"""
 
     def __init__(self):
         self.api_key = os.getenv("OPENROUTER_API_KEY", "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")
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.api_url = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
         # Using Claude 3.5 Sonnet - best balance of intelligence and cost
         self.model = "anthropic/claude-3.5-sonnet"
+        # Ordered model list (OPENROUTER_MODELS) with latency ranking and hedged backups
+        self.router = ModelRouter.from_env(self.model, self.api_url)
+        # Precomputed prompt templates with token budgets, plus per-request token accounting
+        self.prompts = PromptBuilder.from_env()
+        self.token_usage = TokenUsageStats()
+        # How often model output needed repair or was unusable
+        self.parse_stats = JSONParseStats()
         self.has_api = bool(self.api_key)
+        # Shared connection pool - reused across requests, managed by the app lifespan
+        self.http = UpstreamHTTPClient.from_env()
+        # Recommendation cache keyed on the normalized profile (name excluded)
+        self.cache = RecommendationCache.from_env()
+        # In-flight deduplication of identical concurrent profile analyses
+        self.inflight = SingleFlight()
+        # Rule-based engine used whenever the AI path is unavailable
+        self.fallback = FallbackEngine.from_file(CareerRecommendation)
+        # Short-circuits to the fallback engine while OpenRouter is failing or slow
+        self.breaker = CircuitBreaker.from_env()
+        # Global cap on concurrent OpenRouter calls with a bounded wait queue
+        self.admission = AdmissionController.from_env()
+        # Vectorized profile -> career matching over data/careers.json (no model call)
+        self.local_index = CareerIndex.from_file(CareerRecommendation)
+        # Strong local matches are answered without the model (0 disables this tier)
+        self.local_tier_min_score = int(os.getenv("LOCAL_TIER_MIN_SCORE", 0))
+        self.local_grounding = int(os.getenv("LOCAL_GROUNDING_CANDIDATES", 5))
+        # Popular profile archetypes, precomputed off-peak from the request log (ARCHETYPE_COUNT=0 disables)
+        self.archetypes = ArchetypeStore.from_env(
+            embed=lambda profile: self.local_index.embed_profile(profile)[0],
+            generate=lambda fields: self.analyze_profile_and_recommend(
+                UserProfile(**fields), degrade=False, archetypes=False
+            ),
+            is_busy=lambda: self.admission.active + self.admission.waiting > 0,
+            market_version=lambda: market_store.snapshot.version
+        )
 
-    async def analyze_profile_and_recommend(self, profile: UserProfile) -> List[CareerRecommendation]:
-        """Analyze user profile and generate career recommendations"""
+    async def analyze_profile_and_recommend(self, profile: UserProfile, degrade: bool = True,
+                                            archetypes: bool = True) -> List[CareerRecommendation]:
+        """Analyze user profile and generate career recommendations
+
+        degrade=False raises upstream failures instead of answering from the
+        fallback engine (background jobs retry them later). archetypes=False
+        neither logs the profile nor answers from a precomputed archetype
+        (used when generating the archetypes themselves).
+        """
 
         if not self.has_api:
             # Fallback mode when API key not set
-            return self._get_fallback_recommendations(profile)
+            return self._get_fallback_recommendations(profile, "no_api_key")
+
+        local = self._local_tier(profile)
+        if local is not None:
+            return local
+
+        key = profile_cache_key(profile)
+        normalized = await self.archetypes.record(profile, key) if archetypes else None
+
+        # Same normalized profile seen recently - skip the model call
+        cached = await self.cache.get(profile, key)
+        if cached is not None:
+            return [CareerRecommendation(**rec) for rec in cached]
+
+        # Close to a precomputed popular archetype - no model call either
+        nearest = self.archetypes.match(profile, normalized) if normalized is not None else None
+        if nearest is not None:
+            return [CareerRecommendation(**rec) for rec in nearest]
 
         try:
-            # Fetch real-time market data
-            market_data = MarketDataFetcher()
-            trending_skills = await market_data.get_trending_skills()
+            # Concurrent requests for the same profile share one upstream call
+            generated_for, generated = await self.inflight.do(
+                key, lambda: self._generate_and_cache(profile, key)
+            )
+        except CircuitOpenError:
+            if not degrade:
+                raise
+            # Upstream known to be unhealthy - answer from the fallback engine right away
+            return self._get_fallback_recommendations(profile, "circuit_open")
+        except OverloadedError:
+            # Too many upstream calls in flight - shed load (429) or degrade
+            if self.admission.overflow == "reject" or not degrade:
+                raise
+            return self._get_fallback_recommendations(profile, "overloaded")
+        except Exception as e:
+            print(f"AI Error: {e}")
+            if not degrade:
+                raise
+            # Return fallback recommendations on error (stability first)
+            return self._get_fallback_recommendations(profile, self._fallback_reason(e))
 
-            # Build AI prompt with real-time context
-            prompt = self._build_analysis_prompt(profile, trending_skills)
-
-            # Call OpenRouter API with Claude 3.5 Sonnet
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "HTTP-Referer": "https://career-guidance-ai.onrender.com",
-                        "X-Title": "AI Career Guidance Assistant",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "max_tokens": 1200,  # Optimized for OpenRouter credits
-                        "temperature": 0.7
-                    }
-                )
+        return [CareerRecommendation(**rec) for rec in personalize(generated, generated_for, profile.name)]
 
-                if response.status_code != 200:
-                    print(f"OpenRouter API Error: {response.status_code} - {response.text}")
-                    return self._get_fallback_recommendations(profile)
+    async def _generate_and_cache(self, profile: UserProfile, key: str):
+        """Generate recommendations once and store them (shared by coalesced callers)"""
+        recommendations = [rec.model_dump() for rec in await self._generate_recommendations(profile)]
+        # Only model output is cached - fallbacks are cheap to rebuild
+        await self.cache.set(profile, recommendations, key)
+        return profile.name, recommendations
 
-                result = response.json()
-                response_text = result["choices"][0]["message"]["content"]
+    async def _generate_recommendations(self, profile: UserProfile) -> List[CareerRecommendation]:
+        """Call the model for a fresh set of recommendations (raises on any failure)"""
+        messages = await self._prepare_messages(profile)
 
-            # Parse AI response
-            recommendations = self._parse_recommendations(response_text, profile)
-            return recommendations
+        # Call OpenRouter through the circuit breaker - fails fast while upstream is unhealthy.
+        # The router picks the fastest healthy model and hedges to the next one if it stalls.
+        # Admission comes first, so waiting for a slot never counts against upstream health.
+        async with self.admission.slot():
+            result = await self.breaker.call(
+                lambda: self.router.run(lambda route: self._post_completion(messages, route))
+            )
+        response_text = result["choices"][0]["message"]["content"]
+
+        # Parse AI response
+        return self._parse_recommendations(response_text)
+
+    async def answer_followup(self, session: ChatSession, question: str) -> str:
+        """Answer a follow-up message from session state (no profile re-analysis)"""
+        if not self.has_api:
+            return self._fallback_answer(session)
 
+        messages = self.prompts.followup_messages(session, question)
+        try:
+            async with self.admission.slot():
+                result = await self.breaker.call(
+                    lambda: self.router.run(
+                        lambda route: self._post_completion(messages, route, self.prompts.chat_max_tokens)
+                    )
+                )
+            return result["choices"][0]["message"]["content"].strip()
+        except CircuitOpenError:
+            return self._fallback_answer(session)
+        except OverloadedError:
+            if self.admission.overflow == "reject":
+                raise
+            return self._fallback_answer(session)
         except Exception as e:
             print(f"AI Error: {e}")
-            # Return fallback recommendations on error (stability first)
-            return self._get_fallback_recommendations(profile)
-
-    def _build_analysis_prompt(self, profile: UserProfile, trending_skills: List[str]) -> str:
-        """Build detailed prompt for AI analysis"""
-        return f"""You are an expert career counselor with access to real-time job market data.
-
-USER PROFILE:
-- Name: {profile.name}
-- Current Role: {profile.current_role}
-- Education: {profile.education}
-- Interests: {', '.join(profile.interests)}
-- Current Skills: {', '.join(profile.skills)}
-- Experience: {profile.experience_years} years
-- Preferred Industries: {', '.join(profile.preferred_industries) if profile.preferred_industries else 'Open to all'}
-- Location: {profile.location}
-
-REAL-TIME MARKET DATA (Feb 2025):
-- Trending Skills: {', '.join(trending_skills)}
-- Hot Industries: AI/ML, Cloud Computing, Cybersecurity, Data Science, Web Development
-
-TASK:
-Provide 3-5 career recommendations that:
-1. Match user's interests and skills
-2. Are in-demand in current market (Feb 2025)
-3. Have clear growth potential
-4. Include realistic skill gaps
-5. Provide actionable learning roadmaps
-
-FORMAT YOUR RESPONSE AS JSON:
-[
-  {{
-    "title": "Career Title",
-    "match_score": 85,
-    "reason": "Why this career fits the user",
-    "required_skills": ["skill1", "skill2", "skill3"],
-    "average_salary": "$XX,000 - $XX,000",
-    "growth_outlook": "High/Medium/Low with explanation",
-    "learning_roadmap": ["Step 1", "Step 2", "Step 3"]
-  }}
-]
-
-Provide ONLY the JSON array, no other text."""
-
-    def _parse_recommendations(self, response_text: str, profile: UserProfile) -> List[CareerRecommendation]:
-        """Parse AI response into structured recommendations"""
+            return self._fallback_answer(session)
+
+    @staticmethod
+    def _fallback_answer(session: ChatSession) -> str:
+        titles = [rec["title"] for rec in session.recommendations]
+        if not titles:
+            return GREETING
+        return (f"Based on your profile, your strongest matches are {', '.join(titles)}. "
+                "Ask me about any of them - for example which skills to build first or what the role pays.")
+
+    async def _post_completion(self, messages: List[dict], route: ModelRoute, max_tokens: Optional[int] = None) -> dict:
+        """Call OpenRouter API for one model route over the shared pool"""
         try:
-            # Extract JSON from response
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
+            with stage("upstream", model=route.model):
+                response = await self.http.post(
+                    route.api_url,
+                    headers=self._request_headers(),
+                    json=self._request_payload(messages, route.model, max_tokens=max_tokens)
+                )
+        except Exception:
+            record_upstream(route.model, "error")
+            raise
+        record_upstream(route.model, response.status_code)
+        if response.extensions.get("ttfb") is not None:
+            observe_stage("upstream_ttfb", response.extensions["ttfb"])
 
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON array found")
+        if response.status_code != 200:
+            raise RuntimeError(f"OpenRouter API Error: {response.status_code} - {response.text}")
+
+        result = response.json()
+        finish_reason = (result.get("choices") or [{}])[0].get("finish_reason")
+        self.token_usage.record(route.model, result.get("usage"), estimate_message_tokens(messages), finish_reason)
+        return result
+
+    async def stream_recommendations(self, profile: UserProfile) -> AsyncIterator[Tuple[str, object]]:
+        """Stream ("token", text) and ("recommendation", CareerRecommendation) events
+
+        Each recommendation is yielded as soon as its JSON object is complete and
+        validated. Cache hits, fallback mode and upstream failures before the
+        first card all yield fallback/cached recommendations instead.
+        """
+        if not self.has_api:
+            for rec in self._get_fallback_recommendations(profile, "no_api_key"):
+                yield "recommendation", rec
+            return
+
+        local = self._local_tier(profile)
+        if local is not None:
+            for rec in local:
+                yield "recommendation", rec
+            return
+
+        key = profile_cache_key(profile)
+        normalized = await self.archetypes.record(profile, key)
+        cached = await self.cache.get(profile, key)
+        if cached is None and normalized is not None:
+            cached = self.archetypes.match(profile, normalized)
+        if cached is not None:
+            for rec in cached:
+                yield "recommendation", CareerRecommendation(**rec)
+            return
+
+        # Bounded wait for an upstream slot; overflow degrades to the fallback engine
+        # (the SSE response has already started, so a 429 is no longer possible)
+        try:
+            acquired_at = await self.admission.acquire()
+        except OverloadedError:
+            for rec in self._get_fallback_recommendations(profile, "overloaded"):
+                yield "recommendation", rec
+            return
+
+        recommendations: List[CareerRecommendation] = []
+        completed = False
+        # Streams only go upstream when the breaker allows it; health is judged on time to first token
+        admitted = self.breaker.allow()
+        recorded = not admitted
+        fallback_reason = "circuit_open" if not admitted else "parse_error"
+        try:
+            if admitted:
+                messages = await self._prepare_messages(profile)
+                parser = IncrementalArrayParser()
+                usage = {}
+                # Streams are not hedged - they go to the currently fastest healthy model
+                route = self.router.ranked()[0]
+                start = time.monotonic()
+
+                async with self.http.stream(
+                    "POST",
+                    route.api_url,
+                    headers=self._request_headers(),
+                    json=self._request_payload(messages, route.model, stream=True)
+                ) as response:
+                    record_upstream(route.model, response.status_code)
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        raise RuntimeError(f"OpenRouter API Error: {response.status_code} - {body}")
+
+                    async for token in self._iter_stream_tokens(response, usage):
+                        if not recorded:
+                            self.breaker.record_success(time.monotonic() - start)
+                            observe_stage("upstream_ttfb", time.monotonic() - start)
+                            recorded = True
+                        yield "token", token
+                        for rec_data in parser.feed(token):
+                            rec = self._validate_streamed(rec_data)
+                            if rec is not None:
+                                recommendations.append(rec)
+                                yield "recommendation", rec
+                    # Completion cut off mid-array (e.g. max_tokens) - salvage the last element
+                    for rec_data in parser.close():
+                        rec = self._validate_streamed(rec_data)
+                        if rec is not None:
+                            recommendations.append(rec)
+                            yield "recommendation", rec
+                if not recorded:
+                    # Stream ended without a single token
+                    self.breaker.record_failure()
+                    recorded = True
+                completed = True
+                observe_stage("upstream", time.monotonic() - start)
+                self.token_usage.record(route.model, usage, estimate_message_tokens(messages),
+                                        usage.get("finish_reason"))
+                self.parse_stats.record(parser, len(recommendations), dropped=0)
+
+        except Exception as e:
+            print(f"AI Error: {e}")
+            fallback_reason = self._fallback_reason(e)
+            if not recorded:
+                self.breaker.record_failure()
+                recorded = True
+        finally:
+            self.admission.release(acquired_at)
+            if not recorded:
+                # Client disconnected before the first token - only free the probe slot
+                self.breaker.release()
+
+        if not recommendations:
+            # Nothing usable arrived - stability first
+            for rec in self._get_fallback_recommendations(profile, fallback_reason):
+                yield "recommendation", rec
+            return
 
-            json_str = response_text[start_idx:end_idx]
-            recommendations_data = json.loads(json_str)
+        # Partial streams are served but never cached
+        if completed:
+            await self.cache.set(profile, [rec.model_dump() for rec in recommendations], key)
 
-            recommendations = []
-            for rec_data in recommendations_data:
-                recommendations.append(CareerRecommendation(**rec_data))
+    @staticmethod
+    async def _iter_stream_tokens(response, usage: dict) -> AsyncIterator[str]:
+        """Extract content deltas from an OpenAI-compatible SSE completion stream
+
+        The final usage chunk (if the provider sends one) and the finish reason
+        are copied into `usage`.
+        """
+        async for line in response.aiter_lines():
+            # Skip blank separators and ": OPENROUTER PROCESSING" keep-alive comments
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("usage"):
+                usage.update(chunk["usage"])
+            if not chunk.get("choices"):
+                continue
+            if chunk["choices"][0].get("finish_reason"):
+                usage["finish_reason"] = chunk["choices"][0]["finish_reason"]
+            content = chunk["choices"][0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+    async def _prepare_messages(self, profile: UserProfile) -> List[dict]:
+        """Build the analysis messages with real-time market context"""
+        # Fetch real-time market data
+        with stage("market_data"):
+            market_data = MarketDataFetcher()
+            trending_skills = await market_data.get_trending_skills()
+
+        # Nearest catalog careers give the model a grounded starting point
+        with stage("local_index"):
+            candidates = self.local_index.candidates(profile, self.local_grounding) if self.local_grounding > 0 else []
+
+        # Precomputed static instructions + compact, token-budgeted profile section
+        with stage("prompt_build"):
+            return self.prompts.build_messages(profile, trending_skills, candidates)
+
+    def _request_headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "HTTP-Referer": "https://career-guidance-ai.onrender.com",
+            "X-Title": "AI Career Guidance Assistant",
+            "Content-Type": "application/json"
+        }
+
+    def _request_payload(self, messages: List[dict], model: str, stream: bool = False,
+                         max_tokens: Optional[int] = None) -> dict:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens or self.prompts.max_tokens,  # Sized to the number of recommendations requested
+            "temperature": 0.7,
+            "usage": {"include": True}
+        }
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    def _parse_recommendations(self, response_text: str) -> List[CareerRecommendation]:
+        """Parse AI response into structured recommendations (raises if nothing usable)"""
+        try:
+            with stage("json_parse"):
+                # Locate the balanced JSON array, repairing trailing commas and truncation
+                extracted = extract_array(response_text)
+
+                # Bulk validation - invalid items are dropped, valid ones kept
+                recommendations, dropped = validate_items(RecommendationList, extracted.items)
+            self.parse_stats.record(extracted, len(recommendations), dropped)
+            if not extracted.found:
+                raise ValueError("No JSON array found")
+            if dropped or extracted.malformed:
+                print(f"Parse warning: dropped {dropped + extracted.malformed} invalid recommendation(s)")
+            if not recommendations:
+                raise ValueError("No valid recommendations in response")
 
             return recommendations
 
         except Exception as e:
             print(f"Parse error: {e}")
-            return self._get_fallback_recommendations(profile)
+            raise
 
-    def _get_fallback_recommendations(self, profile: UserProfile) -> List[CareerRecommendation]:
-        """Provide smart fallback recommendations based on profile"""
-        # Analyze user interests and skills to provide relevant fallbacks
-        interests_lower = [i.lower() for i in profile.interests]
-        skills_lower = [s.lower() for s in profile.skills]
+    def _validate_streamed(self, rec_data: dict) -> Optional[CareerRecommendation]:
+        try:
+            return CareerRecommendation(**rec_data)
+        except ValueError as e:
+            print(f"Parse error: {e}")
+            return None
 
-        recommendations = []
+    def _local_tier(self, profile: UserProfile) -> Optional[List[CareerRecommendation]]:
+        """Local index results when the best match clears LOCAL_TIER_MIN_SCORE, else None"""
+        if self.local_tier_min_score <= 0:
+            return None
+        recommendations = self.local_index.recommend(profile, self.prompts.num_recommendations)
+        if recommendations and recommendations[0].match_score >= self.local_tier_min_score:
+            return recommendations
+        return None
 
-        # Tech-related interests
-        if any(word in ' '.join(interests_lower) for word in ['coding', 'programming', 'software', 'technology', 'ai', 'data']):
-            recommendations.append(CareerRecommendation(
-                title="Software Developer",
-                match_score=85,
-                reason="Your interest in technology and coding aligns well with software development. High demand in 2025.",
-                required_skills=["Python", "JavaScript", "Git", "Problem Solving", "Data Structures"],
-                average_salary="$70,000 - $120,000",
-                growth_outlook="High - 22% growth projected through 2030",
-                learning_roadmap=[
-                    "Master a programming language (Python or JavaScript)",
-                    "Learn data structures and algorithms",
-                    "Build 3-5 portfolio projects",
-                    "Contribute to open source projects",
-                    "Apply for junior developer positions"
-                ]
-            ))
-
-        # Data-related interests
-        if any(word in ' '.join(interests_lower) for word in ['data', 'analytics', 'statistics', 'numbers']):
-            recommendations.append(CareerRecommendation(
-                title="Data Analyst",
-                match_score=80,
-                reason="Your analytical interests match well with data analysis. Growing field with high demand.",
-                required_skills=["SQL", "Excel", "Python", "Tableau", "Statistics"],
-                average_salary="$60,000 - $95,000",
-                growth_outlook="High - 25% growth expected in data careers",
-                learning_roadmap=[
-                    "Learn SQL and Excel for data manipulation",
-                    "Master Python for data analysis (Pandas, NumPy)",
-                    "Study statistics and data visualization",
-                    "Complete data analysis projects",
-                    "Get certified (Google Data Analytics or similar)"
-                ]
-            ))
-
-        # Creative/Design interests
-        if any(word in ' '.join(interests_lower) for word in ['design', 'creative', 'art', 'ui', 'ux']):
-            recommendations.append(CareerRecommendation(
-                title="UI/UX Designer",
-                match_score=78,
-                reason="Your creative interests align with user experience design. High demand for digital products.",
-                required_skills=["Figma", "User Research", "Wireframing", "Prototyping", "Design Thinking"],
-                average_salary="$65,000 - $110,000",
-                growth_outlook="Medium-High - Digital transformation driving demand",
-                learning_roadmap=[
-                    "Learn design fundamentals and color theory",
-                    "Master Figma or Adobe XD",
-                    "Study user research methods",
-                    "Build portfolio with 5+ case studies",
-                    "Network with designers and apply for roles"
-                ]
-            ))
-
-        # Business/Management interests
-        if any(word in ' '.join(interests_lower) for word in ['business', 'management', 'leadership', 'strategy']):
-            recommendations.append(CareerRecommendation(
-                title="Product Manager",
-                match_score=75,
-                reason="Your business acumen fits product management. Bridge between tech and business.",
-                required_skills=["Product Strategy", "Agile", "Communication", "Data Analysis", "Market Research"],
-                average_salary="$80,000 - $140,000",
-                growth_outlook="High - Product-led companies need PMs",
-                learning_roadmap=[
-                    "Learn product management fundamentals",
-                    "Understand Agile and Scrum methodologies",
-                    "Develop technical literacy",
-                    "Work on side projects as PM",
-                    "Get Product Manager certification"
-                ]
-            ))
-
-        # If no specific match, provide general tech recommendation
-        if not recommendations:
-            recommendations.append(CareerRecommendation(
-                title="Full-Stack Developer",
-                match_score=70,
-                reason="Versatile career path with high demand across industries. Great starting point for tech careers.",
-                required_skills=["HTML/CSS", "JavaScript", "React", "Node.js", "Databases"],
-                average_salary="$75,000 - $125,000",
-                growth_outlook="High - Continuous demand for web developers",
-                learning_roadmap=[
-                    "Learn HTML, CSS, JavaScript basics",
-                    "Master React for frontend development",
-                    "Learn Node.js for backend",
-                    "Understand databases (SQL and NoSQL)",
-                    "Build full-stack projects and deploy them"
-                ]
-            ))
-
-        return recommendations[:3]  # Return top 3 recommendations
+    @staticmethod
+    def _fallback_reason(error: Exception) -> str:
+        """Metrics label for why the AI path failed"""
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+            return "timeout"
+        if isinstance(error, ValueError):
+            # JSON decode and validation errors are ValueErrors
+            return "parse_error"
+        return "upstream_error"
+
+    def _get_fallback_recommendations(self, profile: UserProfile, reason: str = "unspecified") -> List[CareerRecommendation]:
+        """Provide smart fallback recommendations based on profile"""
+        record_fallback(reason)
+        with stage("fallback"):
+            # Keyword-scored against the data-driven catalog (data/fallback_careers.json) first
+            recommendations = self.fallback.recommend(profile.interests, profile.skills, defaults=False)
+            if recommendations:
+                return recommendations
+            # No keyword hit: nearest careers from the local index, then the catalog defaults
+            return (self.local_index.recommend(profile, self.prompts.num_recommendations)
+                    or self.fallback.recommend(profile.interests, profile.skills))
 
 # Initialize AI advisor
 advisor = CareerAdvisor()
 
+# Canonical skill graph + career skill bitsets for /api/skill-gap
+skill_gaps = SkillGapEngine.from_file(advisor.local_index.careers)
+
+# Conversation state for /api/chat (session id -> profile digest, recommendations, history)
+sessions = ChatSessionStore.from_env()
+
+# Per-client token buckets for the model-backed endpoints
+rate_limiter = RateLimiter.from_env()
+
+# Encoded trending/market bodies for the current market snapshot (fast path only)
+snapshot_bodies = EncodedBodies()
+
+# Background analysis jobs (/api/jobs), run by the app lifespan's worker tasks
+job_pool = JobWorkerPool.from_env(
+    # Upstream failures raise so the pool can retry them; fallback only once retries run out
+    analyze=lambda profile: advisor.analyze_profile_and_recommend(UserProfile(**profile), degrade=False),
+    fallback=lambda profile, reason: advisor._get_fallback_recommendations(UserProfile(**profile), reason)
+)
+
+# --- Startup warm-up ---
+
+warmup = Warmup()
+
+WARMUP_PROFILE = UserProfile(
+    name="Warm-up", education="Computer Science", interests=["programming", "data"], skills=["Python", "SQL"]
+)
+
+async def _prewarm_upstream():
+    """Open one pooled connection per upstream origin, so the first user doesn't pay the TLS handshake"""
+    if not advisor.has_api or os.getenv("PREWARM_UPSTREAM", "1").lower() in ("0", "false", "no", "off"):
+        return
+    urls = {route.api_url or advisor.api_url for route in advisor.router.routes}
+    await asyncio.gather(*(advisor.http.prewarm(url) for url in urls))
+
+def _warm_indexes():
+    """First pass through the fallback catalog, career/role indexes and prompt templates"""
+    role_index.lookup(WARMUP_PROFILE.skills[0])
+    advisor.fallback.recommend(WARMUP_PROFILE.interests, WARMUP_PROFILE.skills)
+    advisor.local_index.candidates(WARMUP_PROFILE, advisor.local_grounding)
+    skill_gaps.analyze(WARMUP_PROFILE.skills)
+    advisor.prompts.build_messages(WARMUP_PROFILE, market_store.snapshot.trending_skills("technology"))
+
+# Component stats: shown on the health endpoint and exported as /metrics gauges
+STATS_SECTIONS = {
+    "upstream_pool": advisor.http.stats,
+    "recommendation_cache": advisor.cache.stats,
+    "coalescing": advisor.inflight.stats,
+    "circuit_breaker": advisor.breaker.stats,
+    "model_routing": advisor.router.stats,
+    "token_usage": advisor.token_usage.stats,
+    "json_parsing": advisor.parse_stats.stats,
+    "market_data": market_store.stats,
+    "local_index": advisor.local_index.stats,
+    "archetypes": advisor.archetypes.stats,
+    "skill_gap": skill_gaps.stats,
+    "chat_sessions": sessions.stats,
+    "admission": advisor.admission.stats,
+    "rate_limit": rate_limiter.stats,
+    "warmup": warmup.stats,
+    "fast_json": snapshot_bodies.stats,
+    "jobs": job_pool.stats,
+}
+register_stats(STATS_SECTIONS)
+
+async def _check_rate_limit(request: Request, cost: float = 1.0):
+    """429 with Retry-After once a client exhausts its token bucket"""
+    retry_after = await rate_limiter.check(rate_limiter.client_key(request), cost)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests - please slow down",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+async def rate_limit(request: Request):
+    """Dependency: one token per request"""
+    await _check_rate_limit(request)
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    """Upstream admission queue full (ADMISSION_OVERFLOW=reject)"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"Service busy: {exc}"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # --- API Endpoints ---
 
 @app.get("/")
@@ -350,65 +739,292 @@ async def root():
         "status": "online",
         "service": "AI Career Guidance Assistant",
         "version": "1.0.0",
+        **{name: stats() for name, stats in STATS_SECTIONS.items()},
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until this worker has warmed up (`/` is the liveness check)"""
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "starting", **warmup.stats()})
+    return {
+        "status": "ready",
+        **warmup.stats(),
+        "market_data_version": market_store.snapshot.version,
         "timestamp": datetime.now().isoformat()
     }
 
-@app.post("/api/chat", response_model=ChatResponse)
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.post("/api/chat", response_model=ChatResponse, dependencies=[Depends(rate_limit)])
 async def chat(message: ChatMessage):
     """Main chat endpoint for career guidance"""
     try:
         response_message = ""
         recommendations = None
+        session = await sessions.load(message.session_id)
 
-        # If profile is provided, generate career recommendations
-        if message.profile:
+        # New or changed profile - generate career recommendations
+        if message.profile and profile_cache_key(message.profile) != session.profile_key:
             recommendations = await advisor.analyze_profile_and_recommend(message.profile)
+            session.set_profile(message.profile, [rec.model_dump() for rec in recommendations])
             response_message = f"Hi {message.profile.name}! Based on your profile and current market trends, I've identified {len(recommendations)} career paths that match your interests and skills. Let me walk you through each one."
+        elif session.has_profile and message.message.strip():
+            # Follow-up - answered from session state; the client already has the recommendations
+            response_message = await advisor.answer_followup(session, message.message)
+        elif session.has_profile:
+            recommendations = [CareerRecommendation(**rec) for rec in session.recommendations]
+            response_message = f"Here are the {len(recommendations)} career paths we've been discussing."
         else:
             # General conversation
-            response_message = "Hello! I'm your AI Career Guidance Assistant. To provide personalized career recommendations, please share your profile including your interests, skills, and career goals."
+            response_message = GREETING
+
+        sessions.record_turn(session, message.message, response_message)
+        await sessions.save(session)
 
-        return ChatResponse(
+        response = ChatResponse(
             message=response_message,
             recommendations=recommendations,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            session_id=session.session_id
         )
+        if FAST_JSON:
+            # Built and validated just above - encode once instead of re-validating
+            return EncodedJSONResponse(response.model_dump_json())
+        return response
 
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
-@app.post("/api/analyze-profile", response_model=List[CareerRecommendation])
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/chat/stream", dependencies=[Depends(rate_limit)])
+async def chat_stream(message: ChatMessage):
+    """Streaming chat endpoint - relays tokens and emits each recommendation as soon as it is ready"""
+
+    session = await sessions.load(message.session_id)
+
+    async def events():
+        def done(count: int) -> str:
+            return _sse_event("done", {"count": count, "session_id": session.session_id,
+                                       "timestamp": datetime.now().isoformat()})
+
+        if not message.profile or profile_cache_key(message.profile) == session.profile_key:
+            recap = []
+            if session.has_profile and message.message.strip():
+                reply = await advisor.answer_followup(session, message.message)
+            elif session.has_profile:
+                recap = session.recommendations
+                reply = f"Here are the {len(recap)} career paths we've been discussing."
+            else:
+                reply = GREETING
+            yield _sse_event("message", {"message": reply})
+            for rec in recap:
+                yield _sse_event("recommendation", rec)
+            sessions.record_turn(session, message.message, reply)
+            await sessions.save(session)
+            yield done(len(recap))
+            return
+
+        greeting = f"Hi {message.profile.name}! Let me analyze your profile against current market trends..."
+        yield _sse_event("message", {"message": greeting})
+        recommendations = []
+        try:
+            async for kind, payload in advisor.stream_recommendations(message.profile):
+                if kind == "token":
+                    yield _sse_event("token", {"text": payload})
+                else:
+                    recommendations.append(payload.model_dump())
+                    yield _sse_event("recommendation", recommendations[-1])
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error processing request: {str(e)}"})
+        if recommendations:
+            session.set_profile(message.profile, recommendations)
+        sessions.record_turn(session, message.message, greeting)
+        await sessions.save(session)
+        yield done(len(recommendations))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/analyze-profile", response_model=List[CareerRecommendation], dependencies=[Depends(rate_limit)])
 async def analyze_profile(profile: UserProfile):
     """Analyze user profile and return career recommendations"""
     try:
         recommendations = await advisor.analyze_profile_and_recommend(profile)
+        if FAST_JSON:
+            return EncodedJSONResponse(encode_list(RecommendationList, recommendations))
         return recommendations
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing profile: {str(e)}")
 
+@app.post("/api/recommend/local", response_model=List[CareerRecommendation])
+async def recommend_local(profile: UserProfile):
+    """Career recommendations from the local index only (no model call)"""
+    try:
+        recommendations = advisor.local_index.recommend(profile, advisor.prompts.num_recommendations)
+        if FAST_JSON:
+            return EncodedJSONResponse(encode_list(RecommendationList, recommendations))
+        return recommendations
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error matching profile: {str(e)}")
+
+@app.post("/api/skill-gap", response_model=SkillGapResponse)
+async def skill_gap(request: SkillGapRequest):
+    """Matched and missing skills plus a prerequisite-ordered roadmap per career (no model call)"""
+    try:
+        result = skill_gaps.analyze(
+            request.profile.skills,
+            careers=request.careers,
+            targets=[target.model_dump() for target in request.targets] if request.targets is not None else None,
+            top=request.top
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown careers: {e.args[0]}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing skill gap: {str(e)}")
+    return {**result, "timestamp": datetime.now().isoformat()}
+
+def _start_batch(request: BatchAnalysisRequest):
+    """Validate a batch request and return its result iterator"""
+    if not request.profiles:
+        raise HTTPException(status_code=400, detail="At least one profile is required")
+    if len(request.profiles) > BATCH_MAX_PROFILES:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {BATCH_MAX_PROFILES} profiles)")
+
+    concurrency = min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    return analyze_batch(
+        request.profiles,
+        # degrade=False: upstream failures raise, so the batch marks each fallback item with an error
+        (lambda profile: advisor.analyze_profile_and_recommend(profile, degrade=False)) if advisor.has_api else None,
+        advisor._get_fallback_recommendations,
+        concurrency=concurrency,
+        item_timeout=request.item_timeout or BATCH_ITEM_TIMEOUT
+    )
+
+@app.post("/api/analyze-profiles/batch", response_model=BatchAnalysisResponse)
+async def analyze_profiles_batch(request: BatchAnalysisRequest, http_request: Request):
+    """Analyze many profiles concurrently and return all results in input order"""
+    # One token per profile - a batch is as much work as that many single requests
+    await _check_rate_limit(http_request, len(request.profiles))
+    results = _start_batch(request)
+    try:
+        items = [item async for item in results]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing profiles: {str(e)}")
+
+    items.sort(key=lambda item: item["index"])
+    if FAST_JSON:
+        # Items are plain dicts dumped from validated models
+        return EncodedJSONResponse(dumps({
+            "results": items,
+            "total": len(items),
+            "unique_profiles": len(group_profiles(request.profiles)),
+            "timestamp": datetime.now().isoformat()
+        }))
+    return BatchAnalysisResponse(
+        results=items,
+        total=len(items),
+        unique_profiles=len(group_profiles(request.profiles)),
+        timestamp=datetime.now().isoformat()
+    )
+
+@app.post("/api/analyze-profiles/batch/stream")
+async def analyze_profiles_batch_stream(request: BatchAnalysisRequest, http_request: Request):
+    """Analyze many profiles concurrently, streaming NDJSON results as each one finishes"""
+    await _check_rate_limit(http_request, len(request.profiles))
+    results = _start_batch(request)
+
+    async def lines():
+        async for item in results:
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/api/jobs", response_model=JobStatus, status_code=202, dependencies=[Depends(rate_limit)])
+async def submit_job(request: JobRequest, response: Response):
+    """Queue a profile analysis and return its job id at once (poll it or wait for the webhook)"""
+    try:
+        job = await job_pool.submit(request.profile.model_dump(), request.priority, request.webhook_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["Location"] = f"/api/jobs/{job.job_id}"
+    return job.public()
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, response: Response):
+    """Status of a background analysis, with the recommendations once it has completed"""
+    job = await job_pool.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id")
+    if not job.done:
+        # Polling hint for clients
+        response.headers["Retry-After"] = "1"
+    return job.public()
+
+MARKET_CACHE_MAX_AGE = int(os.getenv("MARKET_CACHE_MAX_AGE", 300))
+
+def _snapshot_etag(snapshot, key: str) -> str:
+    """Weak ETag for one entry of a market snapshot"""
+    return f'W/"{snapshot.version}-{hashlib.md5(key.encode("utf-8")).hexdigest()[:8]}"'
+
+def _snapshot_response(request: Request, snapshot, etag: str, key: tuple, build) -> Response:
+    """Serve snapshot-backed data with ETag revalidation and Cache-Control
+
+    `build()` makes the payload; on the fast path it runs once per key and snapshot version.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={MARKET_CACHE_MAX_AGE}"
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if FAST_JSON:
+        return EncodedJSONResponse(snapshot_bodies.get(snapshot.version, key, build), headers=headers)
+    return JSONResponse(build(), headers=headers)
+
 @app.get("/api/trending-skills")
-async def get_trending_skills(industry: str = "technology"):
+async def get_trending_skills(request: Request, industry: str = "technology"):
     """Get trending skills for specific industry"""
     try:
-        skills = await MarketDataFetcher.get_trending_skills(industry)
-        return {
+        snapshot = market_store.snapshot
+        return _snapshot_response(request, snapshot, _snapshot_etag(snapshot, industry), ("trending", industry), lambda: {
             "industry": industry,
-            "trending_skills": skills,
-            "timestamp": datetime.now().isoformat()
-        }
+            "trending_skills": snapshot.trending_skills(industry),
+            # Body must stay identical for a given ETag, so report the snapshot time
+            "timestamp": snapshot.generated_at
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trending skills: {str(e)}")
 
 @app.get("/api/market-data/{role}")
-async def get_market_data(role: str):
+async def get_market_data(request: Request, role: str):
     """Get market data for specific role"""
     try:
-        data = await MarketDataFetcher.get_job_market_data(role)
-        return {
+        snapshot = market_store.snapshot
+        match = role_index.lookup(role)
+        etag = _snapshot_etag(snapshot, match.key if match else role)
+        return _snapshot_response(request, snapshot, etag, ("market", role), lambda: {
             "role": role,
-            "market_data": data,
-            "timestamp": datetime.now().isoformat()
-        }
+            "canonical_role": match.role if match else None,
+            "match_confidence": match.confidence if match else 0.0,
+            "market_data": snapshot.role_data(role),
+            "timestamp": snapshot.generated_at
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching market data: {str(e)}")
 
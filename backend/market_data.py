@@ -0,0 +1,342 @@
+"""
+Market data store
+Aggregates local job-posting dumps (CSV/JSON files in MARKET_DATA_DIR) into
+per-industry skill frequencies and per-role salary/demand indexes. A background
+task rebuilds the snapshot when the files change and swaps it in atomically,
+so readers never wait and every lookup is a dict access. With several workers
+the aggregate is built once and shared through a SQLite file
+(MARKET_SNAPSHOT_PATH); the other workers load it instead of re-reading the dumps.
+
+Posting fields (CSV columns or JSON object keys):
+  title, industry, skills (list, or ';'/'|' separated), salary_min, salary_max,
+  remote (true/false), posted_at (ISO date)
+"""
+
+import asyncio
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from rec_cache import SQLiteBackend, default_backend
+
+DEFAULT_MARKET_DIR = os.path.join(os.path.dirname(__file__), "data", "market")
+TOP_SKILLS = 12
+
+# Curated Feb 2025 lists - served for industries the datasets don't cover
+CURATED_TRENDING = {
+    "technology": [
+        "Python", "JavaScript", "React", "Node.js", "AWS",
+        "Docker", "Kubernetes", "AI/ML", "Data Science",
+        "DevOps", "Cloud Computing", "Cybersecurity"
+    ],
+    "data": [
+        "Python", "SQL", "Tableau", "Power BI", "Excel",
+        "Machine Learning", "Statistics", "R", "Big Data",
+        "Apache Spark", "ETL", "Data Warehousing"
+    ],
+    "design": [
+        "Figma", "Adobe XD", "UI/UX Design", "Prototyping",
+        "User Research", "Wireframing", "Design Systems",
+        "Accessibility", "Motion Design", "Sketch"
+    ],
+    "business": [
+        "Data Analysis", "Excel", "Project Management",
+        "Agile", "Scrum", "Communication", "Leadership",
+        "Strategy", "Finance", "Marketing Analytics"
+    ]
+}
+
+# Served for roles with no postings, and for fields postings can't tell us
+DEFAULT_MARKET_DATA = {
+    "demand": "High",
+    "salary_range": "$60,000 - $120,000",
+    "growth_rate": "15% (Above Average)",
+    "open_positions": "50,000+",
+    "competition": "Moderate",
+    "remote_availability": "High"
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_key(text: str) -> str:
+    return _NON_ALNUM.sub(" ", str(text).lower()).strip()
+
+
+def _split_skills(value) -> List[str]:
+    if isinstance(value, list):
+        return [str(s).strip() for s in value if str(s).strip()]
+    return [s.strip() for s in re.split(r"[;|]", value or "") if s.strip()]
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", "").replace("$", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_date(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def read_postings(paths: Iterable[str]) -> Iterable[dict]:
+    """Stream postings from CSV and JSON (array or {"postings": [...]}) files"""
+    for path in paths:
+        if path.endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+        elif path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            yield from (data.get("postings", []) if isinstance(data, dict) else data)
+
+
+class MarketSnapshot:
+    """Immutable aggregate of one dataset load - replaced wholesale on refresh"""
+
+    def __init__(self, trending: Dict[str, List[str]], roles: Dict[str, dict], postings: int,
+                 resolve_role: Callable[[str], str] = normalize_key):
+        self.trending = trending
+        self.roles = roles
+        self.resolve_role = resolve_role
+        self.postings = postings
+        self.generated_at = datetime.now().isoformat()
+        digest = hashlib.sha1(json.dumps([trending, roles], sort_keys=True).encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    def trending_skills(self, industry: str) -> List[str]:
+        return self.trending.get(normalize_key(industry), self.trending["technology"])
+
+    def role_data(self, role: str) -> dict:
+        return self.roles.get(self.resolve_role(role), DEFAULT_MARKET_DATA)
+
+    def to_json(self) -> str:
+        return json.dumps({"trending": self.trending, "roles": self.roles, "postings": self.postings,
+                           "generated_at": self.generated_at})
+
+    @classmethod
+    def from_json(cls, raw: str, resolve_role: Callable[[str], str] = normalize_key) -> "MarketSnapshot":
+        data = json.loads(raw)
+        snapshot = cls(data["trending"], data["roles"], data["postings"], resolve_role)
+        # Same content -> same version; keep the builder's timestamp so ETag'd bodies match across workers
+        snapshot.generated_at = data["generated_at"]
+        return snapshot
+
+    @classmethod
+    def curated(cls, resolve_role: Callable[[str], str] = normalize_key) -> "MarketSnapshot":
+        return cls(dict(CURATED_TRENDING), {}, 0, resolve_role)
+
+    @classmethod
+    def build(cls, postings: Iterable[dict], resolve_role: Callable[[str], str] = normalize_key) -> "MarketSnapshot":
+        """Aggregate raw postings into skill-frequency and role indexes
+
+        Posting titles are grouped by `resolve_role`, so "Sr. Data Analyst" and
+        "data-analyst" postings land in the same role bucket.
+        """
+        skill_counts: Dict[str, Counter] = defaultdict(Counter)
+        skill_labels: Dict[str, str] = {}
+        role_postings: Dict[str, List[dict]] = defaultdict(list)
+        total = 0
+
+        for posting in postings:
+            total += 1
+            industry = normalize_key(posting.get("industry") or "technology")
+            for skill in _split_skills(posting.get("skills")):
+                key = normalize_key(skill)
+                skill_counts[industry][key] += 1
+                skill_labels.setdefault(key, skill)
+            if posting.get("title"):
+                role_postings[resolve_role(posting["title"])].append(posting)
+
+        trending = dict(CURATED_TRENDING)
+        for industry, counts in skill_counts.items():
+            trending[industry] = [skill_labels[key] for key, _ in counts.most_common(TOP_SKILLS)]
+
+        return cls(trending, _role_index(role_postings), total, resolve_role)
+
+
+def _role_index(role_postings: Dict[str, List[dict]]) -> Dict[str, dict]:
+    """Per-role demand, salary band, growth and remote share"""
+    if not role_postings:
+        return {}
+
+    # Demand tiers by posting-count rank: top third High, middle Medium, rest Low
+    ranked = sorted(role_postings, key=lambda role: len(role_postings[role]), reverse=True)
+    tier = {role: ("High" if i < len(ranked) / 3 else "Medium" if i < 2 * len(ranked) / 3 else "Low")
+            for i, role in enumerate(ranked)}
+
+    latest = max((_to_date(p.get("posted_at")) for ps in role_postings.values() for p in ps
+                  if _to_date(p.get("posted_at"))), default=None)
+
+    roles = {}
+    for role, postings in role_postings.items():
+        data = dict(DEFAULT_MARKET_DATA)
+        data["demand"] = tier[role]
+        data["open_positions"] = f"{len(postings):,}"
+
+        midpoints = sorted(
+            (lo + hi) / 2 for lo, hi in
+            ((_to_float(p.get("salary_min")), _to_float(p.get("salary_max"))) for p in postings)
+            if lo and hi
+        )
+        if midpoints:
+            p25 = midpoints[int(0.25 * (len(midpoints) - 1))]
+            p75 = midpoints[int(0.75 * (len(midpoints) - 1))]
+            data["salary_range"] = f"${p25:,.0f} - ${p75:,.0f}"
+
+        remote = [str(p.get("remote", "")).lower() in ("1", "true", "yes") for p in postings]
+        share = sum(remote) / len(remote)
+        data["remote_availability"] = "High" if share >= 0.5 else "Medium" if share >= 0.2 else "Low"
+
+        if latest is not None:
+            recent = previous = 0
+            for p in postings:
+                posted = _to_date(p.get("posted_at"))
+                if posted is None:
+                    continue
+                if posted > latest - timedelta(days=30):
+                    recent += 1
+                elif posted > latest - timedelta(days=60):
+                    previous += 1
+            if previous:
+                data["growth_rate"] = f"{(recent - previous) / previous:+.0%} (last 30 days vs prior 30)"
+
+        roles[role] = data
+    return roles
+
+
+class SharedSnapshotFile(SQLiteBackend):
+    """Last built snapshot in a SQLite (WAL) file, keyed by the dataset file signature"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS market_snapshot ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1), signature TEXT NOT NULL, snapshot TEXT NOT NULL)"
+        )
+
+    def load(self, signature: str) -> Optional[str]:
+        row = self._conn.execute("SELECT signature, snapshot FROM market_snapshot WHERE id = 1").fetchone()
+        return row[1] if row and row[0] == signature else None
+
+    def save(self, signature: str, raw: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO market_snapshot (id, signature, snapshot) VALUES (1, ?, ?)", (signature, raw)
+        )
+
+
+class MarketDataStore:
+    """Holds the current snapshot and refreshes it in the background"""
+
+    def __init__(self, data_dir: str = DEFAULT_MARKET_DIR, refresh_seconds: float = 900.0,
+                 resolve_role: Callable[[str], str] = normalize_key, shared: Optional[SharedSnapshotFile] = None):
+        self.data_dir = data_dir
+        self.refresh_seconds = refresh_seconds
+        self.resolve_role = resolve_role
+        self.shared = shared
+        # Readers only ever dereference this attribute; refresh replaces it in one assignment
+        self.snapshot = MarketSnapshot.curated(resolve_role)
+        self._signature = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.shared_loads = 0
+        self.last_refresh_ms = 0.0
+
+    @classmethod
+    def from_env(cls, resolve_role: Callable[[str], str] = normalize_key) -> "MarketDataStore":
+        # Shared by default when several workers run; MARKET_SNAPSHOT_PATH="" opts out
+        default_path = "cache/market.db" if default_backend() == "sqlite" else ""
+        path = os.getenv("MARKET_SNAPSHOT_PATH", default_path)
+        return cls(
+            data_dir=os.getenv("MARKET_DATA_DIR", DEFAULT_MARKET_DIR),
+            refresh_seconds=float(os.getenv("MARKET_REFRESH_SECONDS", 900)),
+            resolve_role=resolve_role,
+            shared=SharedSnapshotFile(path) if path else None,
+        )
+
+    def _files(self) -> List[str]:
+        patterns = ("*.csv", "*.json")
+        return sorted(p for pattern in patterns for p in glob.glob(os.path.join(self.data_dir, pattern)))
+
+    def _file_signature(self, files: List[str]):
+        return tuple((path, os.path.getmtime(path), os.path.getsize(path)) for path in files)
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the snapshot if the dataset files changed (blocking; run off the event loop)"""
+        files = self._files()
+        signature = self._file_signature(files)
+        if not force and signature == self._signature:
+            return False
+
+        start = time.perf_counter()
+        shared_key = json.dumps(signature)
+        raw = self.shared.load(shared_key) if self.shared is not None and not force else None
+        if raw is not None:
+            # Another worker already aggregated these exact files
+            snapshot = MarketSnapshot.from_json(raw, self.resolve_role)
+            self.shared_loads += 1
+        else:
+            if files:
+                snapshot = MarketSnapshot.build(read_postings(files), self.resolve_role)
+            else:
+                snapshot = MarketSnapshot.curated(self.resolve_role)
+            if self.shared is not None:
+                self.shared.save(shared_key, snapshot.to_json())
+        self.snapshot = snapshot
+        self._signature = signature
+        self.refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 1)
+        return True
+
+    async def refresh(self) -> bool:
+        return await asyncio.to_thread(self.reload)
+
+    async def start(self):
+        """Load once, then keep refreshing in a background task"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Market data load error: {e}")
+        if self._task is None and self.refresh_seconds > 0:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the previous snapshot
+                print(f"Market data refresh error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "version": self.snapshot.version,
+            "generated_at": self.snapshot.generated_at,
+            "postings": self.snapshot.postings,
+            "industries": len(self.snapshot.trending),
+            "roles": len(self.snapshot.roles),
+            "refreshes": self.refreshes,
+            "shared_loads": self.shared_loads,
+            "last_refresh_ms": self.last_refresh_ms,
+        }
@@ -0,0 +1,206 @@
+"""
+Prometheus metrics and per-stage latency tracing
+Route latency comes from an ASGI middleware; `stage()` times one step of the
+analysis pipeline (market data, prompt build, upstream call, JSON parse,
+fallback). When OTEL_EXPORTER_OTLP_ENDPOINT is set and the OpenTelemetry SDK is
+installed, every request and stage is also exported as a span.
+
+Multi-worker (gunicorn) deployments set PROMETHEUS_MULTIPROC_DIR; histograms
+and counters are then aggregated across workers at scrape time.
+"""
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route (until the last body byte is sent)",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "career_stage_duration_seconds", "Latency of one analysis pipeline stage",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+FALLBACKS = Counter("career_fallbacks_total", "Fallback recommendations served, by reason", ["reason"])
+UPSTREAM_RESPONSES = Counter(
+    "career_upstream_responses_total", "OpenRouter responses by model and HTTP status", ["model", "status"]
+)
+TOKENS = Counter("career_llm_tokens_total", "Tokens used by model and kind (prompt, cached_prompt, completion)",
+                 ["model", "kind"])
+COMPLETION_TOKENS = Histogram(
+    "career_completion_tokens", "Completion tokens per model call (for sizing max_tokens)", ["model"],
+    buckets=(100, 200, 300, 400, 600, 800, 1000, 1200, 1600, 2000, 3000),
+)
+TRUNCATED_COMPLETIONS = Counter(
+    "career_truncated_completions_total", "Completions cut off at max_tokens", ["model"]
+)
+
+_tracer = None
+_provider = None
+_stats_collector: Optional["StatsCollector"] = None
+
+
+# --- Tracing ---
+
+def setup_tracing(service_name: str = "career-guidance-api") -> bool:
+    """Export spans over OTLP/HTTP when OTEL_EXPORTER_OTLP_ENDPOINT is set (SDK is optional)"""
+    global _tracer, _provider
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        print("OTEL_EXPORTER_OTLP_ENDPOINT set but opentelemetry-sdk / "
+              "opentelemetry-exporter-otlp-proto-http are not installed - tracing disabled")
+        return False
+
+    resource = Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)})
+    _provider = TracerProvider(resource=resource)
+    # The exporter reads the endpoint (and headers) from the standard OTEL_* variables
+    _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer("career-guidance")
+    return True
+
+
+def shutdown_tracing():
+    """Flush buffered spans (called from the app lifespan)"""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+def _span(name: str, **attributes):
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """Time a pipeline stage into career_stage_duration_seconds (and a span, if tracing)"""
+    start = time.perf_counter()
+    with _span(name, **attributes):
+        try:
+            yield
+        finally:
+            STAGE_LATENCY.labels(name).observe(time.perf_counter() - start)
+
+
+def observe_stage(name: str, seconds: float):
+    """Record a stage timed elsewhere (e.g. time to first byte)"""
+    STAGE_LATENCY.labels(name).observe(seconds)
+
+
+def record_fallback(reason: str):
+    FALLBACKS.labels(reason).inc()
+
+
+def record_upstream(model: str, status) -> None:
+    UPSTREAM_RESPONSES.labels(model, str(status)).inc()
+
+
+def record_tokens(model: str, prompt: int, completion: int, cached: int = 0, truncated: bool = False) -> None:
+    TOKENS.labels(model, "prompt").inc(prompt)
+    TOKENS.labels(model, "cached_prompt").inc(cached)
+    TOKENS.labels(model, "completion").inc(completion)
+    COMPLETION_TOKENS.labels(model).observe(completion)
+    if truncated:
+        TRUNCATED_COMPLETIONS.labels(model).inc()
+
+
+# --- HTTP middleware ---
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency histogram and a server span per request
+
+    Timing stops when the last body chunk is sent, so streaming endpoints
+    report their full duration. Routes are labeled by path template
+    ("/api/market-data/{role}"), never by raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _span(f"{scope['method']} {scope['path']}") as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_LATENCY.labels(scope["method"], route, str(status)).observe(time.perf_counter() - start)
+                if span is not None:
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.status_code", status)
+
+
+# --- Health stats bridge ---
+
+class StatsCollector:
+    """Exposes every numeric field of the health-endpoint stats sections as a gauge
+
+    e.g. recommendation_cache.hits -> career_recommendation_cache_hits
+    These are per-process values; under multiple workers they carry a `pid` label.
+    """
+
+    def __init__(self, sections: Dict[str, Callable[[], dict]]):
+        self.sections = sections
+        self.per_worker = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+    def collect(self):
+        for section, stats in self.sections.items():
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Metrics collection error ({section}): {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    gauge = GaugeMetricFamily(f"career_{section}_{key}", f"{section}.{key} from the health endpoint",
+                                              labels=["pid"] if self.per_worker else None)
+                    gauge.add_metric([str(os.getpid())] if self.per_worker else [], float(value))
+                    yield gauge
+
+
+def register_stats(sections: Dict[str, Callable[[], dict]]):
+    global _stats_collector
+    _stats_collector = StatsCollector(sections)
+    REGISTRY.register(_stats_collector)
+
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint"""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    # Histograms/counters from every worker's files; stats gauges from the worker answering the scrape
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if _stats_collector is not None:
+        registry.register(_stats_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,189 @@
+"""
+Multi-model routing with hedged requests
+Routes are tried in latency/health order; if the first hasn't answered by a
+p95-derived deadline, a hedged request goes to the next route and whichever
+completes first wins (the loser is cancelled)
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ModelRoute:
+    """One model/provider endpoint plus its rolling latency and error stats"""
+
+    def __init__(self, model: str, api_url: Optional[str] = None, window: int = 100):
+        self.model = model
+        self.api_url = api_url
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.wins = 0
+
+    def record_success(self, duration: float):
+        self.latencies.append(duration)
+        self.outcomes.append(True)
+
+    def record_failure(self):
+        self.outcomes.append(False)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "model": self.model,
+            "samples": len(self.latencies),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "wins": self.wins,
+        }
+
+
+def parse_routes(spec: str, default_url: str) -> List[ModelRoute]:
+    """Parse "model[|url],model[|url]" into routes (url defaults to the OpenRouter endpoint)"""
+    routes = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        model, _, url = item.partition("|")
+        routes.append(ModelRoute(model.strip(), url.strip() or default_url))
+    return routes
+
+
+class ModelRouter:
+    """Latency-ranked routing with a single hedged backup request"""
+
+    def __init__(
+        self,
+        routes: List[ModelRoute],
+        max_attempts: int = 2,
+        min_samples: int = 5,
+        default_hedge_delay: float = 8.0,
+        min_hedge_delay: float = 0.5,
+        max_hedge_delay: float = 20.0,
+        unhealthy_error_rate: float = 0.5,
+    ):
+        if not routes:
+            raise ValueError("ModelRouter needs at least one route")
+        self.routes = routes
+        self.max_attempts = max(1, max_attempts)
+        self.min_samples = min_samples
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    @classmethod
+    def from_env(cls, default_model: str, default_url: str) -> "ModelRouter":
+        """Build a router from OPENROUTER_MODELS and HEDGE_* environment variables"""
+        routes = parse_routes(os.getenv("OPENROUTER_MODELS", default_model), default_url)
+        return cls(
+            routes or [ModelRoute(default_model, default_url)],
+            max_attempts=int(os.getenv("HEDGE_MAX_ATTEMPTS", 2)),
+            default_hedge_delay=float(os.getenv("HEDGE_DEFAULT_DELAY", 8.0)),
+            min_hedge_delay=float(os.getenv("HEDGE_MIN_DELAY", 0.5)),
+            max_hedge_delay=float(os.getenv("HEDGE_MAX_DELAY", 20.0)),
+        )
+
+    def ranked(self) -> List[ModelRoute]:
+        """Healthy routes first, then fastest p50; configured order until enough samples exist"""
+        def sort_key(item):
+            position, route = item
+            unhealthy = route.error_rate >= self.unhealthy_error_rate
+            p50 = route.percentile(0.5) if len(route.latencies) >= self.min_samples else None
+            return (unhealthy, p50 if p50 is not None else float("inf"), position)
+
+        return [route for _, route in sorted(enumerate(self.routes), key=sort_key)]
+
+    def hedge_delay(self, route: ModelRoute) -> float:
+        """How long to wait on `route` before hedging: its rolling p95, clamped"""
+        if len(route.latencies) < self.min_samples:
+            return self.default_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, route.percentile(0.95)))
+
+    async def run(self, call: Callable[[ModelRoute], Awaitable[T]]) -> T:
+        """Run `call` against the best route, hedging to the next one past the deadline
+
+        A route that fails outright triggers the next attempt immediately. The
+        first successful result wins and any attempt still running is cancelled.
+        """
+        candidates = self.ranked()[:self.max_attempts]
+        pending = {}
+        last_error: Optional[BaseException] = None
+
+        async def attempt(route: ModelRoute):
+            start = time.monotonic()
+            try:
+                result = await call(route)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                route.record_failure()
+                raise
+            route.record_success(time.monotonic() - start)
+            return result
+
+        def launch(index: int):
+            task = asyncio.ensure_future(attempt(candidates[index]))
+            pending[task] = index
+
+        launch(0)
+        next_index = 1
+        try:
+            while pending:
+                timeout = None
+                if next_index < len(candidates):
+                    timeout = self.hedge_delay(candidates[next_index - 1])
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Deadline passed with no answer - send the hedged request
+                    self.hedges_sent += 1
+                    launch(next_index)
+                    next_index += 1
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        candidates[index].wins += 1
+                        if index > 0:
+                            self.hedges_won += 1
+                        return task.result()
+                    last_error = task.exception()
+
+                # Failed before the deadline - fail over straight away
+                if not pending and next_index < len(candidates):
+                    launch(next_index)
+                    next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or RuntimeError("No model route produced a response")
+
+    def stats(self) -> dict:
+        return {
+            "routes": [route.stats() for route in self.ranked()],
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+        }
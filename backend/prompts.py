@@ -0,0 +1,242 @@
+"""
+Prompt templates for career analysis
+The static instruction/format block is built once and sent first; only the
+compact per-user section changes per call. User lists are deduplicated and
+trimmed to a token budget.
+
+Provider prompt caching only applies to prefixes of ~1024 tokens or more, so
+the static block (~200 tokens today) is only marked cacheable once it is long
+enough to qualify - a cache_control marker on a shorter block saves nothing.
+"""
+
+import math
+import os
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from metrics import record_tokens
+
+# Rough chars-per-token ratio for English prose/JSON (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+# Completion budget. Catalog-shaped recommendation objects measure ~120-160 tokens
+# (chars/4) and closer to ~215 with real tokenizers on JSON; model-written reasons
+# and roadmaps run longer, so allow about twice that - a cut-off array loses a
+# recommendation. Tune against the career_completion_tokens histogram on /metrics.
+TOKENS_PER_RECOMMENDATION = 400
+COMPLETION_OVERHEAD_TOKENS = 100
+
+# Smallest prefix providers cache (Anthropic/OpenAI: 1024 tokens)
+CACHE_MIN_PREFIX_TOKENS = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_list(items: Sequence[str], token_budget: int, max_item_chars: int = 60) -> List[str]:
+    """Deduplicate (case-insensitively, keeping order) and trim a list to a token budget"""
+    seen = set()
+    compacted = []
+    used = 0
+    for item in items:
+        item = " ".join(str(item).split())[:max_item_chars]
+        key = item.casefold()
+        if not item or key in seen:
+            continue
+        cost = estimate_tokens(item) + 1  # separator
+        if used + cost > token_budget:
+            break
+        seen.add(key)
+        compacted.append(item)
+        used += cost
+    return compacted
+
+
+@lru_cache(maxsize=8)
+def static_instructions(num_recommendations: int) -> str:
+    """Instruction and output-format block shared by every request"""
+    return f"""You are an expert career counselor with access to real-time job market data.
+
+TASK:
+Provide {num_recommendations} career recommendations that:
+1. Match user's interests and skills
+2. Are in-demand in current market (Feb 2025)
+3. Have clear growth potential
+4. Include realistic skill gaps
+5. Provide actionable learning roadmaps
+
+FORMAT YOUR RESPONSE AS JSON:
+[
+  {{
+    "title": "Career Title",
+    "match_score": 85,
+    "reason": "Why this career fits the user",
+    "required_skills": ["skill1", "skill2", "skill3"],
+    "average_salary": "$XX,000 - $XX,000",
+    "growth_outlook": "High/Medium/Low with explanation",
+    "learning_roadmap": ["Step 1", "Step 2", "Step 3"]
+  }}
+]
+
+Provide ONLY the JSON array, no other text."""
+
+
+@lru_cache(maxsize=1)
+def chat_instructions() -> str:
+    """System block for follow-up turns in a chat session"""
+    return """You are an expert career counselor continuing a conversation with a user.
+You have already given them the career recommendations listed in the context.
+Answer their latest message directly and concisely (under 150 words), referring
+to those recommendations and their profile where relevant. Reply in plain text, not JSON."""
+
+
+class PromptBuilder:
+    """Builds chat messages and completion budgets for profile analysis"""
+
+    def __init__(
+        self,
+        num_recommendations: int = 3,
+        interests_token_budget: int = 60,
+        skills_token_budget: int = 60,
+        industries_token_budget: int = 30,
+        trending_token_budget: int = 60,
+        cache_control: bool = True,
+        chat_max_tokens: int = 300,
+        tokens_per_recommendation: int = TOKENS_PER_RECOMMENDATION,
+    ):
+        self.num_recommendations = num_recommendations
+        self.interests_token_budget = interests_token_budget
+        self.skills_token_budget = skills_token_budget
+        self.industries_token_budget = industries_token_budget
+        self.trending_token_budget = trending_token_budget
+        self.cache_control = cache_control
+        self.chat_max_tokens = chat_max_tokens
+        self.tokens_per_recommendation = tokens_per_recommendation
+
+    @classmethod
+    def from_env(cls) -> "PromptBuilder":
+        """Build from PROMPT_* environment variables"""
+        return cls(
+            num_recommendations=int(os.getenv("PROMPT_NUM_RECOMMENDATIONS", 3)),
+            interests_token_budget=int(os.getenv("PROMPT_INTERESTS_TOKENS", 60)),
+            skills_token_budget=int(os.getenv("PROMPT_SKILLS_TOKENS", 60)),
+            industries_token_budget=int(os.getenv("PROMPT_INDUSTRIES_TOKENS", 30)),
+            trending_token_budget=int(os.getenv("PROMPT_TRENDING_TOKENS", 60)),
+            cache_control=os.getenv("PROMPT_CACHE_CONTROL", "1").lower() in ("1", "true", "yes", "on"),
+            chat_max_tokens=int(os.getenv("PROMPT_CHAT_MAX_TOKENS", 300)),
+            tokens_per_recommendation=int(os.getenv("PROMPT_TOKENS_PER_RECOMMENDATION", TOKENS_PER_RECOMMENDATION)),
+        )
+
+    @property
+    def max_tokens(self) -> int:
+        """Completion budget sized to the number of recommendations requested"""
+        return self.num_recommendations * self.tokens_per_recommendation + COMPLETION_OVERHEAD_TOKENS
+
+    def user_section(self, profile, trending_skills: Sequence[str],
+                     candidates: Sequence[Tuple[str, int]] = ()) -> str:
+        """Compact per-request context: market data, local career matches and the user's profile"""
+        interests = compact_list(profile.interests, self.interests_token_budget)
+        skills = compact_list(profile.skills, self.skills_token_budget)
+        industries = compact_list(profile.preferred_industries, self.industries_token_budget)
+        trending = compact_list(trending_skills, self.trending_token_budget)
+        # Nearest catalog careers from the local index - a starting point, not a constraint
+        grounding = ""
+        if candidates:
+            matches = ", ".join(f"{title} ({score})" for title, score in candidates)
+            grounding = f"\n\nCLOSEST CATALOG CAREERS (local match score):\n- {matches}"
+
+        return f"""REAL-TIME MARKET DATA (Feb 2025):
+- Trending Skills: {', '.join(trending)}
+- Hot Industries: AI/ML, Cloud Computing, Cybersecurity, Data Science, Web Development{grounding}
+
+USER PROFILE:
+- Name: {profile.name}
+- Current Role: {profile.current_role}
+- Education: {profile.education}
+- Interests: {', '.join(interests)}
+- Current Skills: {', '.join(skills)}
+- Experience: {profile.experience_years} years
+- Preferred Industries: {', '.join(industries) if industries else 'Open to all'}
+- Location: {profile.location}"""
+
+    def _system_message(self, static: str) -> dict:
+        if self.cache_control and estimate_tokens(static) >= CACHE_MIN_PREFIX_TOKENS:
+            return {"role": "system", "content": [{"type": "text", "text": static, "cache_control": {"type": "ephemeral"}}]}
+        return {"role": "system", "content": static}
+
+    def build_messages(self, profile, trending_skills: Sequence[str],
+                       candidates: Sequence[Tuple[str, int]] = ()) -> List[dict]:
+        """Static system block first (a stable prefix), then the user section"""
+        return [
+            self._system_message(static_instructions(self.num_recommendations)),
+            {"role": "user", "content": self.user_section(profile, trending_skills, candidates)},
+        ]
+
+    def followup_messages(self, session, question: str) -> List[dict]:
+        """Follow-up turn: session digest + rolling summary + recent turns + the new question
+
+        The profile and recommendations travel as one-line digests built when the
+        profile was set, so per-turn prompt size stays flat as the session grows.
+        """
+        context = f"""SESSION CONTEXT:
+- Profile: {session.context}
+- Recommended careers: {session.careers_line() or 'none yet'}"""
+        if session.summary:
+            context += "\n- Earlier in this conversation: " + " | ".join(session.summary)
+        return [
+            self._system_message(chat_instructions()),
+            {"role": "system", "content": context},
+            *session.history,
+            {"role": "user", "content": " ".join(question.split())},
+        ]
+
+
+def estimate_message_tokens(messages: Sequence[dict]) -> int:
+    """Approximate prompt size of a message list"""
+    total = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, list):
+            total += sum(estimate_tokens(part.get("text", "")) for part in content)
+        else:
+            total += estimate_tokens(content)
+    return total
+
+
+class TokenUsageStats:
+    """Per-request prompt/completion token metrics and running totals"""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.truncated = 0
+
+    def record(self, model: str, usage: dict, estimated_prompt_tokens: int, finish_reason: Optional[str] = None):
+        """Record one completion's token usage (falls back to the estimate if the provider sent none)"""
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or estimated_prompt_tokens
+        completion_tokens = usage.get("completion_tokens") or 0
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        # "length": the completion hit max_tokens
+        truncated = finish_reason == "length"
+
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_prompt_tokens += cached
+        self.truncated += truncated
+        record_tokens(model, prompt_tokens, completion_tokens, cached, truncated)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "truncated": self.truncated,
+            "avg_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else 0.0,
+            "avg_completion_tokens": round(self.completion_tokens / self.requests, 1) if self.requests else 0.0,
+        }
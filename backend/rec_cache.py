@@ -0,0 +1,239 @@
+"""
+Content-addressed recommendation cache
+Profiles that differ only in name (or casing/order of list items) share one cache
+entry, so repeat profiles skip the model call entirely
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# UserProfile fields that feed the analysis prompt - `name` is deliberately excluded
+KEY_FIELDS = ("current_role", "education", "experience_years", "location")
+KEY_LIST_FIELDS = ("interests", "skills", "preferred_industries")
+
+
+def default_backend() -> str:
+    """Backend name when none is configured: sqlite if several workers share the host (WEB_CONCURRENCY > 1)"""
+    return "sqlite" if int(os.getenv("WEB_CONCURRENCY", 1)) > 1 else "memory"
+
+
+async def run_blocking(backend, method: str, *args):
+    """Call a backend method; blocking (SQLite) backends run in a worker thread
+
+    A write may wait up to the busy timeout for another worker's lock - in a
+    thread that stalls one request, on the event loop it would stall them all.
+    """
+    if getattr(backend, "blocking", False):
+        return await asyncio.to_thread(getattr(backend, method), *args)
+    return getattr(backend, method)(*args)
+
+
+class SQLiteBackend:
+    """Base for the SQLite stores shared by workers: WAL, one connection per thread
+
+    Calls block, so async callers go through run_blocking(). Each thread gets
+    its own connection, so concurrent calls never interleave transactions.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def _norm(value) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def normalize_profile(profile) -> dict:
+    """Canonical form of the prompt-relevant profile fields"""
+    canonical = {field: _norm(getattr(profile, field) or "") for field in KEY_FIELDS}
+    for field in KEY_LIST_FIELDS:
+        canonical[field] = sorted({_norm(item) for item in getattr(profile, field) or [] if _norm(item)})
+    return canonical
+
+
+def profile_cache_key(profile) -> str:
+    """Stable SHA-256 hash of the normalized profile"""
+    payload = json.dumps(normalize_profile(profile), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --- Backends ---
+
+class MemoryCacheBackend:
+    """In-process LRU + TTL store (per worker)"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        self._entries[key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(SQLiteBackend):
+    """On-disk approximate-LRU + TTL store shared by every uvicorn worker on the host
+
+    Reads don't write: last_access is refreshed at most once per
+    `touch_interval` per key, and expired rows are pruned on set().
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 3600.0, table: str = "recommendations",
+                 touch_interval: float = 60.0):
+        super().__init__(path)
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.touch_interval = touch_interval
+        self.evictions = 0
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_access ON {table}(last_access)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_expires_at ON {table}(expires_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self._conn.execute(
+            f"SELECT value, expires_at, last_access FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, last_access = row
+        if expires_at < now:
+            return None
+        if now - last_access >= self.touch_interval:
+            # Keeps hot keys out of the LRU tail without a write on every hit
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, now + self.ttl, now),
+        )
+        expired = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,)).rowcount
+        self.evictions += max(expired, 0)
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def __len__(self) -> int:
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+# --- Cache front-end ---
+
+class RecommendationCache:
+    """Maps normalized profiles to serialized recommendation lists"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "RecommendationCache":
+        """Build a cache from REC_CACHE_* environment variables"""
+        ttl = float(os.getenv("REC_CACHE_TTL", 3600))
+        max_entries = int(os.getenv("REC_CACHE_MAX_ENTRIES", 1024))
+        if os.getenv("REC_CACHE_BACKEND", default_backend()).lower() == "sqlite":
+            path = os.getenv("REC_CACHE_PATH", "cache/recommendations.db")
+            return cls(SQLiteCacheBackend(path, max_entries=max_entries, ttl=ttl))
+        return cls(MemoryCacheBackend(max_entries=max_entries, ttl=ttl))
+
+    async def get(self, profile, key: Optional[str] = None) -> Optional[List[dict]]:
+        """Return cached recommendation dicts, re-personalized for this profile"""
+        raw = await run_blocking(self.backend, "get", key or profile_cache_key(profile))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry = json.loads(raw)
+        return personalize(entry["recommendations"], entry.get("name", ""), profile.name)
+
+    async def set(self, profile, recommendations: List[dict], key: Optional[str] = None):
+        entry = {"name": profile.name, "recommendations": recommendations}
+        await run_blocking(self.backend, "set", key or profile_cache_key(profile), json.dumps(entry))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+@lru_cache(maxsize=1024)
+def _name_pattern(name: str) -> "re.Pattern":
+    # Whole words only - "Ana" must not touch "Data Analyst"
+    return re.compile(rf"(?<!\w){re.escape(name)}(?!\w)")
+
+
+def personalize(recommendations: List[dict], cached_name: str, name: str) -> List[dict]:
+    """Swap the original requester's name for the current one in free-text fields"""
+    if not cached_name or not name or cached_name == name:
+        return recommendations
+    pattern = _name_pattern(cached_name)
+    recommendations = [dict(rec) for rec in recommendations]
+    for rec in recommendations:
+        rec["reason"] = pattern.sub(lambda _: name, rec.get("reason", ""))
+    return recommendations
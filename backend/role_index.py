@@ -0,0 +1,196 @@
+"""
+Fuzzy role lookup over a canonical job-title taxonomy
+"Data Analyst", "data-analyst" and "Sr. Data Analyst" all resolve to the same
+canonical role. Lookups try, in order of cost:
+  1. exact hit on the normalized title (abbreviations expanded, seniority dropped)
+  2. exact hit on the bag of words (word-order variants)
+  3. per-word typo correction against the title vocabulary, then the bag-of-words map
+  4. trigram inverted index over every title/alias, scored by Dice similarity -
+     multi-word queries only, and the alias must share at least one whole word
+     (a lone "Engineer" or "Software" is too generic to guess a role from)
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "roles.json")
+
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior",
+    "mgr": "manager", "mngr": "manager",
+    "eng": "engineer", "engr": "engineer",
+    "dev": "developer", "devs": "developer",
+    "ml": "machine learning", "qa": "quality assurance",
+    "admin": "administrator", "ops": "operations",
+}
+
+# Seniority and level words don't change which role a title refers to
+SENIORITY = {
+    "senior", "junior", "lead", "principal", "staff", "associate", "entry",
+    "level", "mid", "i", "ii", "iii", "iv", "1", "2", "3",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9+#&]+")
+
+
+def normalize_title(title: str) -> str:
+    """Canonical matching key: lowercase words, abbreviations expanded, seniority removed"""
+    words = []
+    for token in _NON_ALNUM.sub(" ", str(title).lower()).split():
+        words.extend(ABBREVIATIONS.get(token, token).split())
+    kept = [word for word in words if word not in SENIORITY]
+    return " ".join(kept or words)
+
+
+def _bag(key: str) -> str:
+    return " ".join(sorted(key.split()))
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class RoleMatch(NamedTuple):
+    role: str          # Canonical title
+    key: str           # Normalized canonical key (market data index key)
+    confidence: float  # 1.0 for exact/alias hits, trigram similarity otherwise
+    method: str        # "exact" or "fuzzy"
+
+
+class RoleIndex:
+    """Exact alias map plus trigram inverted index over all titles and aliases"""
+
+    def __init__(self, roles: Iterable[dict] = (), min_confidence: float = 0.55, cache_size: int = 4096):
+        self.min_confidence = min_confidence
+        self._titles: List[str] = []              # canonical id -> display title
+        self._alias_keys: List[str] = []          # alias id -> normalized alias key
+        self._alias_role: List[int] = []          # alias id -> canonical id
+        self._alias_grams: List[frozenset] = []   # alias id -> trigram set
+        self._alias_words: List[frozenset] = []   # alias id -> word set
+        self._exact: Dict[str, int] = {}          # normalized alias key -> canonical id
+        self._bags: Dict[str, int] = {}           # sorted-words alias key -> canonical id
+        self._vocab: Dict[str, frozenset] = {}    # title word -> its trigram set
+        self._word_postings: Dict[str, List[str]] = {}  # trigram -> title words
+        self._postings: Dict[str, List[int]] = {}  # trigram -> alias ids
+        for role in roles:
+            self.add(role["title"], role.get("aliases", []))
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "RoleIndex":
+        """Load the taxonomy from ROLE_TAXONOMY_PATH or the bundled data/roles.json"""
+        path = path or os.getenv("ROLE_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["roles"] if isinstance(data, dict) else data,
+                   min_confidence=float(os.getenv("ROLE_MATCH_MIN_CONFIDENCE", 0.55)))
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, title: str, aliases: Iterable[str] = ()):
+        """Register a canonical title and its aliases (existing aliases are not reassigned)"""
+        role_id = len(self._titles)
+        self._titles.append(title)
+        for alias in [title, *aliases]:
+            key = normalize_title(alias)
+            if not key or key in self._exact:
+                continue
+            alias_id = len(self._alias_keys)
+            self._exact[key] = role_id
+            self._bags.setdefault(_bag(key), role_id)
+            for word in key.split():
+                if word not in self._vocab:
+                    self._vocab[word] = frozenset(trigrams(word))
+                    for gram in self._vocab[word]:
+                        self._word_postings.setdefault(gram, []).append(word)
+            self._alias_keys.append(key)
+            self._alias_role.append(role_id)
+            grams = frozenset(trigrams(key))
+            self._alias_grams.append(grams)
+            self._alias_words.append(frozenset(key.split()))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(alias_id)
+        if hasattr(self, "lookup"):
+            self.lookup.cache_clear()
+
+    def _match(self, role_id: int, confidence: float, method: str) -> RoleMatch:
+        title = self._titles[role_id]
+        return RoleMatch(title, normalize_title(title), round(confidence, 3), method)
+
+    def _lookup(self, query: str) -> Optional[RoleMatch]:
+        """Best canonical role for a free-text title, or None below min_confidence"""
+        key = normalize_title(query)
+        if not key:
+            return None
+
+        role_id = self._exact.get(key)
+        if role_id is not None:
+            return self._match(role_id, 1.0, "exact")
+
+        role_id = self._bags.get(_bag(key))
+        if role_id is not None:
+            return self._match(role_id, 1.0, "exact")
+
+        corrected = self._correct_words(key)
+        if corrected is not None:
+            role_id = self._bags.get(_bag(corrected[0]))
+            if role_id is not None:
+                return self._match(role_id, corrected[1], "fuzzy")
+
+        # Whole-title trigram similarity against aliases sharing a word with the query.
+        # One word that missed every tier above is generic ("Engineer") - no guess.
+        words = set(key.split())
+        if len(words) < 2:
+            return None
+        grams = set(trigrams(key))
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        if not shared:
+            return None
+
+        best_id, best_score = -1, 0.0
+        for alias_id, count in shared.items():
+            if words.isdisjoint(self._alias_words[alias_id]):
+                continue
+            score = 2 * count / (len(grams) + len(self._alias_grams[alias_id]))
+            if score > best_score:
+                best_id, best_score = alias_id, score
+
+        if best_score < self.min_confidence:
+            return None
+        return self._match(self._alias_role[best_id], best_score, "fuzzy")
+
+    def _correct_words(self, key: str):
+        """Replace unknown words with their closest vocabulary word; returns (key, confidence)"""
+        words = []
+        confidence = 1.0
+        for word in key.split():
+            if word in self._vocab:
+                words.append(word)
+                continue
+            grams = set(trigrams(word))
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._word_postings.get(gram, ()))
+            best_word, best_score = None, 0.0
+            for candidate, count in shared.items():
+                score = 2 * count / (len(grams) + len(self._vocab[candidate]))
+                if score > best_score:
+                    best_word, best_score = candidate, score
+            if best_word is None or best_score < self.min_confidence:
+                return None
+            words.append(best_word)
+            confidence = min(confidence, best_score)
+        return " ".join(words), confidence
+
+    def canonical_key(self, title: str) -> str:
+        """Market-data index key for a title: its canonical role if known, else its own normalized form"""
+        match = self.lookup(title)
+        return match.key if match else normalize_title(title)
@@ -0,0 +1,288 @@
+"""
+Skill-gap analysis over a canonical skill graph
+data/skills.json lists canonical skills with aliases and prerequisites. Skills
+are interned to integer ids in prerequisite (topological) order, and profiles
+and careers become packed NumPy bitsets over those ids. Overlap and gap for
+every career are then a few bitwise operations on one (careers x bytes)
+matrix, and the set bits of a gap, read in id order, are already a
+prerequisite-ordered learning roadmap.
+"""
+
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_SKILLS_PATH = os.path.join(os.path.dirname(__file__), "data", "skills.json")
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_KEY_RE = re.compile(r"[^a-z0-9+#]")
+
+# SWAR popcount constants (bit counts of every 64-bit word at once)
+_M1, _M2, _M4, _H01 = (np.uint64(mask) for mask in (
+    0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F, 0x0101010101010101))
+
+
+def skill_key(text: str) -> str:
+    """Spelling-insensitive lookup key ("Node.js", "nodejs" and "node js" agree)"""
+    return _KEY_RE.sub("", text.casefold())
+
+
+def pack(bits: np.ndarray) -> np.ndarray:
+    """Pack a boolean (rows x skills) matrix into bytes, padded to whole 64-bit words"""
+    packed = np.packbits(bits, axis=-1)
+    padding = -packed.shape[-1] % 8
+    return np.pad(packed, [(0, 0)] * (packed.ndim - 1) + [(0, padding)])
+
+
+def popcount(bitsets: np.ndarray) -> np.ndarray:
+    """Set bits per row of a packed (rows x bytes) matrix"""
+    x = np.ascontiguousarray(bitsets).view(np.uint64)
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    x = (x * _H01) >> np.uint64(56)
+    # Rows are only a few words wide - adding columns beats a reduction along the short axis
+    total = x[..., 0].astype(np.int32)
+    for word in range(1, x.shape[-1]):
+        total += x[..., word].astype(np.int32)
+    return total
+
+
+class SkillGraph:
+    """Canonical skills with aliases and prerequisites, interned in topological order"""
+
+    def __init__(self, skills: Sequence[dict], extra: Sequence[str] = ()):
+        entries = {skill["name"]: skill for skill in skills}
+        # Skills only a career catalog mentions join the graph as leaves
+        spellings = {skill_key(alias) for skill in skills for alias in [skill["name"], *skill.get("aliases", [])]}
+        for name in extra:
+            if skill_key(name) not in spellings:
+                spellings.add(skill_key(name))
+                entries[name] = {"name": name}
+
+        for name, skill in entries.items():
+            unknown = [p for p in skill.get("prerequisites", []) if p not in entries]
+            if unknown:
+                raise ValueError(f"Skill {name!r} has unknown prerequisites: {unknown}")
+
+        # Kahn's algorithm; ties broken by name so ids are stable across processes
+        pending = {name: set(skill.get("prerequisites", [])) for name, skill in entries.items()}
+        self.names: List[str] = []
+        while pending:
+            ready = sorted(name for name, prereqs in pending.items() if not prereqs)
+            if not ready:
+                raise ValueError(f"Prerequisite cycle among skills: {sorted(pending)}")
+            for name in ready:
+                del pending[name]
+                self.names.append(name)
+            for prereqs in pending.values():
+                prereqs.difference_update(ready)
+
+        ids = {name: i for i, name in enumerate(self.names)}
+        self.prerequisites: List[Tuple[int, ...]] = [
+            tuple(sorted(ids[p] for p in entries[name].get("prerequisites", []))) for name in self.names
+        ]
+        self.aliases: Dict[str, int] = {}
+        for name in self.names:
+            for alias in [name, *entries[name].get("aliases", [])]:
+                key = skill_key(alias)
+                if self.aliases.setdefault(key, ids[name]) != ids[name]:
+                    raise ValueError(f"Alias {alias!r} maps to two skills")
+        self.max_words = max(len(_WORD_RE.findall(alias.casefold()))
+                             for skill in entries.values() for alias in [skill["name"], *skill.get("aliases", [])])
+
+        # Row i: skill i plus everything it transitively requires (ids are topological,
+        # so each prerequisite's row is complete before it is needed)
+        closure = np.zeros((len(self.names), len(self.names)), dtype=bool)
+        for i, prereqs in enumerate(self.prerequisites):
+            closure[i, i] = True
+            for p in prereqs:
+                closure[i] |= closure[p]
+        self.closure = pack(closure)
+
+    @classmethod
+    def from_file(cls, path: str = None, extra: Sequence[str] = ()) -> "SkillGraph":
+        """Build from SKILLS_PATH or the bundled data/skills.json"""
+        path = path or os.getenv("SKILLS_PATH", DEFAULT_SKILLS_PATH)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["skills"] if isinstance(data, dict) else data, extra=extra)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, text: str) -> List[int]:
+        """Skill ids named in one free-text item: an exact alias, else the longest alias phrases in it"""
+        exact = self.aliases.get(skill_key(text))
+        if exact is not None:
+            return [exact]
+        words = _WORD_RE.findall(text.casefold())
+        found = []
+        i = 0
+        while i < len(words):
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                hit = self.aliases.get(skill_key("".join(words[i:i + n])))
+                if hit is not None:
+                    found.append(hit)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def expand(self, ids: Sequence[int]) -> np.ndarray:
+        """Bitset of the skills plus all their prerequisites"""
+        if not len(ids):
+            return np.zeros(self.closure.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.closure[list(ids)], axis=0)
+
+    def members(self, bitset: np.ndarray) -> np.ndarray:
+        """Ids set in a packed bitset, in prerequisite order"""
+        return np.flatnonzero(np.unpackbits(bitset, count=len(self.names)))
+
+
+class SkillGapEngine:
+    """Gap, overlap and learning roadmaps for a profile against every career at once"""
+
+    def __init__(self, graph: SkillGraph, careers: Sequence[dict]):
+        self.graph = graph
+        self.careers = list(careers)
+        self._titles = {career["title"].casefold(): i for i, career in enumerate(self.careers)}
+        self.required, self.needed = self._matrices([career["required_skills"] for career in self.careers])
+        self.required_counts = popcount(self.required)
+        self.queries = 0
+        self.total_ms = 0.0
+
+    @classmethod
+    def from_file(cls, careers: Sequence[dict], path: str = None) -> "SkillGapEngine":
+        extra = [skill for career in careers for skill in career["required_skills"]]
+        return cls(SkillGraph.from_file(path, extra=extra), careers)
+
+    def _matrices(self, skill_lists: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(required, needed) bitset matrices - needed adds every missing prerequisite"""
+        rows = [sorted({i for skill in skills for i in self.graph.resolve(skill)}) for skills in skill_lists]
+        required = np.zeros((len(rows), len(self.graph)), dtype=bool)
+        needed = np.zeros((len(rows), self.graph.closure.shape[1]), dtype=np.uint8)
+        for r, ids in enumerate(rows):
+            required[r, ids] = True
+            needed[r] = self.graph.expand(ids)
+        return pack(required), needed
+
+    def analyze(self, skills: Sequence[str], careers: Optional[Sequence[str]] = None,
+                targets: Optional[Sequence[dict]] = None, top: int = 5) -> dict:
+        """Skill gap of a profile against catalog careers (all, or the named ones) or ad-hoc targets
+
+        Raises KeyError for career titles that are not in the catalog.
+        """
+        start = time.perf_counter()
+        graph = self.graph
+        known, unrecognized = [], []
+        for skill in skills:
+            ids = graph.resolve(skill)
+            known.extend(ids)
+            if not ids:
+                unrecognized.append(skill)
+        known = sorted(set(known))
+        have = graph.expand(known)
+
+        if targets is not None:
+            entries = list(targets)
+            required, needed = self._matrices([target["required_skills"] for target in entries])
+            required_counts = popcount(required)
+        elif careers:
+            missing = [title for title in careers if title.casefold() not in self._titles]
+            if missing:
+                raise KeyError(", ".join(missing))
+            rows = [self._titles[title.casefold()] for title in careers]
+            entries = [self.careers[row] for row in rows]
+            required, needed, required_counts = self.required[rows], self.needed[rows], self.required_counts[rows]
+        else:
+            entries = self.careers
+            required, needed, required_counts = self.required, self.needed, self.required_counts
+
+        # One pass over every candidate career
+        overlap = required & have
+        gap = needed & ~have
+        coverage = np.where(required_counts > 0, popcount(overlap) / np.maximum(required_counts, 1), 1.0)
+        gap_counts = popcount(gap)
+        if targets is None and not careers:
+            order = self._top(coverage, gap_counts, top)
+        else:
+            order = np.arange(len(entries))
+
+        results = []
+        for row in order:
+            results.append(self._career_gap(entries[row], required[row], overlap[row], gap[row], coverage[row],
+                                            unrecognized if targets is not None else None))
+
+        direct = set(known)
+        implied = [graph.names[i] for i in graph.members(have) if i not in direct]
+        self.queries += 1
+        self.total_ms += (time.perf_counter() - start) * 1000
+        return {
+            "recognized_skills": [graph.names[i] for i in known],
+            "implied_skills": implied,
+            "unrecognized_skills": unrecognized,
+            "careers": results,
+        }
+
+    @staticmethod
+    def _top(coverage: np.ndarray, gap_counts: np.ndarray, top: int) -> np.ndarray:
+        """Rows of the best `top` careers: highest coverage, then smallest gap, then catalog order"""
+        if top <= 0:
+            return np.zeros(0, dtype=np.intp)
+        candidates = np.arange(len(coverage))
+        if top < len(coverage):
+            # Partition first - only careers tied with the k-th best reach the full sort
+            threshold = -np.partition(-coverage, top - 1)[top - 1]
+            candidates = np.flatnonzero(coverage >= threshold)
+        order = np.lexsort((candidates, gap_counts[candidates], -coverage[candidates]))
+        return candidates[order][:top]
+
+    def _career_gap(self, career: dict, required: np.ndarray, overlap: np.ndarray, gap: np.ndarray,
+                    coverage: float, unrecognized: Optional[Sequence[str]]) -> dict:
+        graph = self.graph
+        gap_ids = graph.members(gap)
+        in_gap = set(gap_ids.tolist())
+        roadmap = [
+            {"skill": graph.names[i], "prerequisites": [graph.names[p] for p in graph.prerequisites[i] if p in in_gap]}
+            for i in gap_ids
+        ]
+        matched = [graph.names[i] for i in graph.members(overlap)]
+        missing = [graph.names[i] for i in graph.members(required & ~overlap)]
+
+        # Ad-hoc targets (e.g. model recommendations) may name skills outside the graph:
+        # compared by spelling only, and any still missing go last in the roadmap
+        if unrecognized is not None:
+            profile_keys = {skill_key(skill) for skill in unrecognized}
+            for skill in career["required_skills"]:
+                if graph.resolve(skill):
+                    continue
+                if skill_key(skill) in profile_keys:
+                    matched.append(skill)
+                else:
+                    missing.append(skill)
+                    roadmap.append({"skill": skill, "prerequisites": []})
+            total = len(matched) + len(missing)
+            coverage = len(matched) / total if total else 1.0
+
+        return {
+            "title": career["title"],
+            "coverage": round(100 * coverage),
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "roadmap": [{"step": step, **entry} for step, entry in enumerate(roadmap, 1)],
+        }
+
+    def stats(self) -> dict:
+        return {
+            "skills": len(self.graph),
+            "aliases": len(self.graph.aliases),
+            "careers": len(self.careers),
+            "queries": self.queries,
+            "avg_ms": round(self.total_ms / self.queries, 3) if self.queries else 0.0,
+        }
@@ -3,11 +3,13 @@ Quick test script to verify the AI Career Guidance API works
 Run this after starting the server to confirm everything is functional
 """
 
+import os
 import requests
 import json
 from time import sleep
 
-API_URL = "http://localhost:8000"
+# Point at a server backed by the local stub to avoid spending API credits (see TESTING.md)
+API_URL = os.getenv("API_URL", "http://localhost:8000")
 
 def test_health_check():
     """Test if server is running"""
@@ -103,6 +105,112 @@ def test_chat_endpoint():
         print(f"❌ Chat endpoint test failed: {e}")
         return False
 
+def test_chat_session():
+    """Test multi-turn chat sessions"""
+    print("\n🔍 Testing chat session follow-ups...")
+    try:
+        first = requests.post(
+            f"{API_URL}/api/chat",
+            json={
+                "message": "I need career guidance",
+                "profile": {
+                    "name": "Sam Lee",
+                    "education": "Computer Science",
+                    "interests": ["AI", "data"],
+                    "skills": ["Python"],
+                    "experience_years": 2
+                }
+            }
+        ).json()
+        session_id = first["session_id"]
+        assert session_id and first["recommendations"]
+
+        followup = requests.post(
+            f"{API_URL}/api/chat",
+            json={"message": "Which of these pays best?", "session_id": session_id}
+        )
+
+        assert followup.status_code == 200
+        data = followup.json()
+        assert data["session_id"] == session_id
+        assert data["recommendations"] is None
+        assert data["message"]
+        print(f"✅ Follow-up answered in session {session_id[:8]}: {data['message'][:60]}...")
+        return True
+    except Exception as e:
+        print(f"❌ Chat session test failed: {e}")
+        return False
+
+def test_batch_analysis():
+    """Test batch profile analysis"""
+    print("\n🔍 Testing batch analysis...")
+    try:
+        profiles = [
+            {"name": "Student A", "education": "Computer Science", "interests": ["programming", "AI"], "skills": ["Python"]},
+            {"name": "Student B", "education": "Computer Science", "interests": ["AI", "programming"], "skills": ["python"]},
+            {"name": "Student C", "education": "Design", "interests": ["design", "art"], "skills": ["Figma"]}
+        ]
+
+        response = requests.post(
+            f"{API_URL}/api/analyze-profiles/batch",
+            json={"profiles": profiles, "concurrency": 2}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert data["unique_profiles"] == 2
+        assert [item["index"] for item in data["results"]] == [0, 1, 2]
+        assert all(len(item["recommendations"]) > 0 for item in data["results"])
+        print(f"✅ Batch: {data['total']} profiles, {data['unique_profiles']} unique")
+        return True
+    except Exception as e:
+        print(f"❌ Batch analysis test failed: {e}")
+        return False
+
+def test_skill_gap():
+    """Test skill-gap analysis against the career catalog"""
+    print("\n🔍 Testing skill gap...")
+    try:
+        profile = {"name": "Gap User", "education": "Statistics", "interests": ["data"], "skills": ["Python", "pandas"]}
+        response = requests.post(f"{API_URL}/api/skill-gap", json={"profile": profile, "careers": ["Data Analyst"]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "Python" in data["recognized_skills"]
+        gap = data["careers"][0]
+        assert gap["title"] == "Data Analyst"
+        roadmap = [step["skill"] for step in gap["roadmap"]]
+        assert roadmap.index("Data Visualization") < roadmap.index("Tableau")
+        print(f"✅ Skill gap: {gap['coverage']}% coverage, next: {', '.join(roadmap[:3])}")
+        return True
+    except Exception as e:
+        print(f"❌ Skill gap test failed: {e}")
+        return False
+
+def test_async_job():
+    """Test background analysis job submit + poll"""
+    print("\n🔍 Testing background analysis job...")
+    try:
+        profile = {"name": "Job User", "education": "Computer Science", "interests": ["AI"], "skills": ["Python"]}
+        response = requests.post(f"{API_URL}/api/jobs", json={"profile": profile, "priority": "high"})
+
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        for _ in range(60):
+            data = requests.get(f"{API_URL}/api/jobs/{job_id}").json()
+            if data["status"] in ("completed", "failed"):
+                break
+            sleep(0.5)
+
+        assert data["status"] == "completed"
+        assert len(data["result"]) > 0
+        print(f"✅ Job {job_id[:8]} completed after {data['attempts']} attempt(s)")
+        return True
+    except Exception as e:
+        print(f"❌ Background job test failed: {e}")
+        return False
+
 def run_all_tests():
     """Run complete test suite"""
     print("=" * 60)
@@ -113,7 +221,11 @@ def run_all_tests():
         test_health_check,
         test_trending_skills,
         test_career_recommendations,
-        test_chat_endpoint
+        test_chat_endpoint,
+        test_chat_session,
+        test_batch_analysis,
+        test_skill_gap,
+        test_async_job
     ]
 
     passed = 0
@@ -0,0 +1,50 @@
+"""
+Startup warm-up and readiness
+The app lifespan runs the warm-up steps (market snapshot, upstream connections,
+first pass through the indexes) before the worker accepts traffic and records
+how long each took. /ready answers 503 until they have run, so a load balancer
+only routes to warm workers; `/` stays a plain liveness check.
+"""
+
+import inspect
+import os
+import time
+from typing import Callable, Dict
+
+# Imported at the top of main.py, so startup_ms includes importing the app itself
+PROCESS_STARTED = time.monotonic()
+
+
+class Warmup:
+    """Runs named warm-up steps once and tracks readiness"""
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        self.startup_ms = 0.0
+
+    async def run(self, steps: Dict[str, Callable]):
+        """Run each step in order (sync or async); a failed step is logged, not fatal"""
+        for name, step in steps.items():
+            start = time.perf_counter()
+            try:
+                result = step()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                # A cold cache only costs latency - still take traffic
+                print(f"Warm-up step '{name}' failed: {e}")
+                self.failed[name] = str(e)
+            self.steps[name] = round((time.perf_counter() - start) * 1000, 1)
+        self.startup_ms = round((time.monotonic() - PROCESS_STARTED) * 1000, 1)
+        self.ready = True
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "pid": os.getpid(),
+            "startup_ms": self.startup_ms,
+            "steps_ms": self.steps,
+            "failed_steps": len(self.failed),
+        }